@@ -6,6 +6,9 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from bson import ObjectId
 from app.auth.jwt_handler import verify_token
+from app.auth.principal_cache import principal_cache
+from app.auth.token_versions import token_versions
+from app.config import settings
 from app.database import get_database
 from app.models.user import UserResponse
 
@@ -45,6 +48,37 @@ async def get_current_user(
             detail="Invalid token payload"
         )
 
+    if payload.get("typ") == "refresh":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh tokens cannot be used for authentication"
+        )
+
+    # Self-contained tokens carry the user's claims; only the version is checked.
+    # The version table only holds active users, so a deactivated user loses
+    # access once every worker's table has refreshed
+    if settings.self_contained_tokens and "ver" in payload:
+        if not await token_versions.check(get_database(), user_id, payload["ver"]):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        return UserResponse(
+            id=user_id,
+            name=payload["name"],
+            email=payload["email"],
+            role=payload["role"],
+            created_at=payload["created_at"],
+            is_active=True
+        )
+
+    # Serve from the principal cache when possible
+    cached_user = principal_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
+
     # Fetch user from database
     db = get_database()
     user = await db.users.find_one({"_id": ObjectId(user_id)})
@@ -60,7 +94,10 @@ async def get_current_user(
     del user["_id"]
     del user["password_hash"]
 
-    return UserResponse(**user)
+    current_user = UserResponse(**user)
+    principal_cache.set(user_id, current_user)
+
+    return current_user
 
 
 def require_role(*allowed_roles: str):
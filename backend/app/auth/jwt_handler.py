@@ -1,24 +1,30 @@
 """
 JWT token creation and verification.
 """
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, Tuple
 from jose import JWTError, jwt
 from app.config import settings
+from app.models.user import UserResponse
 
 
-def create_access_token(data: Dict[str, str]) -> str:
+def create_access_token(
+    data: Dict[str, Any],
+    expires_delta: Optional[timedelta] = None
+) -> str:
     """
     Create a JWT access token.
 
     Args:
         data: Dictionary containing user_id and role
+        expires_delta: Optional lifetime override
 
     Returns:
         Encoded JWT token string
     """
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=settings.access_token_expire_days)
+    expire = datetime.utcnow() + (expires_delta or timedelta(days=settings.access_token_expire_days))
     to_encode.update({"exp": expire})
 
     encoded_jwt = jwt.encode(
@@ -29,7 +35,65 @@ def create_access_token(data: Dict[str, str]) -> str:
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[Dict[str, str]]:
+def create_refresh_token(user_id: str, token_version: int) -> str:
+    """
+    Create a long-lived refresh token for self-contained token mode.
+
+    Each token carries a unique ``jti`` so it can be used only once.
+
+    Args:
+        user_id: User ID
+        token_version: User's current token version
+
+    Returns:
+        Encoded JWT refresh token string
+    """
+    return create_access_token(
+        {"user_id": user_id, "ver": token_version, "typ": "refresh", "jti": uuid.uuid4().hex},
+        expires_delta=timedelta(days=settings.refresh_token_expire_days)
+    )
+
+
+def create_user_tokens(
+    user: UserResponse,
+    token_version: int = 0
+) -> Tuple[str, Optional[str]]:
+    """
+    Create the tokens handed to a client after login, registration or refresh.
+
+    In self-contained mode the access token carries the user's claims and
+    token version so requests can be authenticated without a database read.
+
+    Args:
+        user: Authenticated user
+        token_version: User's current token version
+
+    Returns:
+        Tuple of (access token, refresh token or None)
+    """
+    if not settings.self_contained_tokens:
+        access_token = create_access_token({
+            "user_id": user.id,
+            "role": user.role
+        })
+        return access_token, None
+
+    access_token = create_access_token(
+        {
+            "user_id": user.id,
+            "role": user.role,
+            "name": user.name,
+            "email": user.email,
+            "created_at": user.created_at.isoformat(),
+            "ver": token_version,
+            "typ": "access"
+        },
+        expires_delta=timedelta(minutes=settings.self_contained_token_expire_minutes)
+    )
+    return access_token, create_refresh_token(user.id, token_version)
+
+
+def verify_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Verify and decode a JWT token.
 
@@ -1,7 +1,16 @@
 """
 Password hashing and verification utilities using bcrypt.
+
+Bcrypt is deliberately slow, so async route handlers must use the
+``*_async`` helpers, which run the work on a bounded worker pool instead
+of blocking the event loop.
 """
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from app.config import settings
 
 # Password hashing context - using bcrypt with truncate_error=False to avoid validation errors
 pwd_context = CryptContext(
@@ -10,6 +19,10 @@ pwd_context = CryptContext(
     bcrypt__truncate_error=False
 )
 
+# Worker pool for bcrypt (created lazily on first use)
+_executor: Optional[Executor] = None
+_pending_jobs = 0
+
 
 def hash_password(password: str) -> str:
     """
@@ -36,3 +49,117 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         True if password matches, False otherwise
     """
     return pwd_context.verify(plain_password, hashed_password)
+
+
+def _get_executor() -> Executor:
+    """Get the bcrypt worker pool, creating it on first use."""
+    global _executor
+
+    if _executor is None:
+        if settings.password_hash_executor == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.password_hash_workers)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                thread_name_prefix="bcrypt"
+            )
+
+    return _executor
+
+
+def _job_finished() -> None:
+    """Free a pool queue slot."""
+    global _pending_jobs
+
+    _pending_jobs -= 1
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback) -> None:
+    """Schedule a callback on the event loop from a worker thread."""
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        # Event loop already closed (shutdown)
+        pass
+
+
+async def _run_in_pool(func, *args):
+    """
+    Run a bcrypt function on the worker pool.
+
+    Raises:
+        HTTPException: 503 if the pool queue is full
+    """
+    global _pending_jobs
+
+    if _pending_jobs >= settings.password_hash_max_pending:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+    loop = asyncio.get_running_loop()
+    job = _get_executor().submit(func, *args)
+    _pending_jobs += 1
+    # A cancelled request does not stop bcrypt already running, so the slot is
+    # only freed once the job itself finishes (back on the event loop thread)
+    job.add_done_callback(lambda _: _call_soon(loop, _job_finished))
+    return await asyncio.wrap_future(job)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a plain text password without blocking the event loop.
+
+    Args:
+        password: Plain text password
+
+    Returns:
+        Hashed password string
+
+    Raises:
+        HTTPException: 503 if the hashing pool is saturated
+    """
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against its hash without blocking the event loop.
+
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password to compare against
+
+    Returns:
+        True if password matches, False otherwise
+
+    Raises:
+        HTTPException: 503 if the hashing pool is saturated
+    """
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
+
+
+def get_password_pool_stats() -> dict:
+    """
+    Get bcrypt worker pool counters.
+
+    Returns:
+        Dictionary with executor type, worker count and queue usage
+    """
+    return {
+        "executor": settings.password_hash_executor,
+        "workers": settings.password_hash_workers,
+        "pending": _pending_jobs,
+        "max_pending": settings.password_hash_max_pending
+    }
+
+
+def shutdown_password_pool() -> None:
+    """Shut down the bcrypt worker pool."""
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
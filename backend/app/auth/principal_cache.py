@@ -0,0 +1,101 @@
+"""
+Bounded in-process cache of authenticated principals.
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from app.config import settings
+from app.models.user import UserResponse
+
+
+class PrincipalCache:
+    """LRU cache of UserResponse objects keyed by user ID with a TTL."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, UserResponse]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: str) -> Optional[UserResponse]:
+        """
+        Get a cached principal.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Cached UserResponse or None if missing or expired
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return user
+
+    def set(self, user_id: str, user: UserResponse) -> None:
+        """
+        Store a principal, evicting the least recently used entry when full.
+
+        Args:
+            user_id: User ID
+            user: User to cache
+        """
+        if self.max_size <= 0:
+            return
+
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user_id)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: str) -> None:
+        """
+        Drop a principal from the cache.
+
+        Args:
+            user_id: User ID
+        """
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Drop all cached principals."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache counters for sizing.
+
+        Returns:
+            Dictionary with size, capacity, hits, misses, evictions and hit ratio
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache(
+    max_size=settings.principal_cache_size,
+    ttl_seconds=settings.principal_cache_ttl_seconds
+)
@@ -0,0 +1,209 @@
+"""
+Login admission control using per-IP and per-account token buckets.
+
+Buckets live in process memory by default. Multi-worker deployments can
+set ``LOGIN_RATE_LIMIT_BACKEND=mongo`` to share buckets through the
+``login_buckets`` collection instead.
+"""
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+from fastapi import HTTPException, Request, status
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.database import get_database
+
+
+class MemoryBucketStore:
+    """Token buckets kept in an LRU-bounded dictionary."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> Tuple[bool, float]:
+        """
+        Take one token from a bucket.
+
+        Args:
+            key: Bucket key
+            capacity: Maximum number of tokens (burst size)
+            refill_per_second: Tokens added per second
+
+        Returns:
+            Tuple of (allowed, seconds until a token is available)
+        """
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return allowed, _retry_after(tokens, refill_per_second)
+
+
+class MongoBucketStore:
+    """Token buckets shared between workers through MongoDB."""
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> Tuple[bool, float]:
+        """
+        Take one token from a bucket with a single atomic update.
+
+        Args:
+            key: Bucket key
+            capacity: Maximum number of tokens (burst size)
+            refill_per_second: Tokens added per second
+
+        Returns:
+            Tuple of (allowed, seconds until a token is available)
+        """
+        db = get_database()
+        now = datetime.utcnow()
+        idle_seconds = {
+            "$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]
+        }
+
+        pipeline = [
+            {"$set": {
+                "tokens": {"$min": [
+                    capacity,
+                    {"$add": [
+                        {"$ifNull": ["$tokens", capacity]},
+                        {"$multiply": [idle_seconds, refill_per_second]}
+                    ]}
+                ]},
+                "updated_at": now
+            }},
+            {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+            {"$set": {
+                "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                # Buckets idle long enough to be full again can be dropped by a TTL index
+                "expires_at": now + timedelta(seconds=capacity / refill_per_second)
+            }}
+        ]
+
+        while True:
+            try:
+                bucket = await db.login_buckets.find_one_and_update(
+                    {"_id": key},
+                    pipeline,
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                break
+            except DuplicateKeyError:
+                # Two first requests raced to insert the bucket; retrying updates the winner's
+                continue
+
+        return bucket["allowed"], _retry_after(bucket["tokens"], refill_per_second)
+
+
+def _retry_after(tokens: float, refill_per_second: float) -> float:
+    """Seconds until a bucket holds at least one token."""
+    if tokens >= 1 or refill_per_second <= 0:
+        return 0.0
+    return (1 - tokens) / refill_per_second
+
+
+class LoginRateLimiter:
+    """Admission control applied before any password verification."""
+
+    def __init__(self):
+        self.memory_store = MemoryBucketStore(settings.login_rate_limit_max_keys)
+        self.mongo_store = MongoBucketStore()
+        self.allowed = 0
+        self.rejections: Dict[str, int] = {"ip": 0, "account": 0}
+
+    def _store(self):
+        """Get the configured bucket store."""
+        if settings.login_rate_limit_backend == "mongo":
+            return self.mongo_store
+        return self.memory_store
+
+    async def check(self, client_ip: str, email: str) -> None:
+        """
+        Admit or reject a login attempt.
+
+        The IP bucket is checked first so a flood from one address does
+        not drain the buckets of the accounts it targets.
+
+        Args:
+            client_ip: Client IP address
+            email: Email address being logged into
+
+        Raises:
+            HTTPException: 429 if either bucket is empty
+        """
+        if not settings.login_rate_limit_enabled:
+            return
+
+        store = self._store()
+        limits = [
+            ("ip", f"ip:{client_ip}", settings.login_ip_burst, settings.login_ip_refill_per_minute),
+            ("account", f"account:{email.lower()}", settings.login_account_burst, settings.login_account_refill_per_minute),
+        ]
+
+        for scope, key, capacity, refill_per_minute in limits:
+            allowed, retry_after = await store.take(key, capacity, refill_per_minute / 60)
+            if not allowed:
+                self.rejections[scope] += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many login attempts, please try again later",
+                    headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+                )
+
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        """
+        Get admission counters.
+
+        Returns:
+            Dictionary with backend, admitted attempts and rejections per scope
+        """
+        return {
+            "backend": settings.login_rate_limit_backend,
+            "allowed": self.allowed,
+            "rejected": dict(self.rejections),
+            "tracked_keys": len(self.memory_store)
+        }
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Get the client IP address for a request.
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        Client IP, taken from X-Forwarded-For only when configured to trust it
+    """
+    if settings.trust_forwarded_for:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            # Clients can prepend anything; only the entries appended by our
+            # own proxies (the rightmost ones) can be trusted
+            entries = [entry.strip() for entry in forwarded_for.split(",") if entry.strip()]
+            if entries:
+                hops = max(1, settings.forwarded_for_trusted_hops)
+                return entries[-min(hops, len(entries))]
+
+    return request.client.host if request.client else "unknown"
+
+
+# Global login rate limiter
+login_rate_limiter = LoginRateLimiter()
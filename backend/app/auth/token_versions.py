@@ -0,0 +1,186 @@
+"""
+In-memory token version table for self-contained JWT mode.
+
+Each active user maps to the ``token_version`` stored on their user
+document. Bumping the version (or deactivating/deleting the user) revokes
+every token issued before: immediately in the worker that made the change,
+and in other workers once their table has refreshed (at most
+TOKEN_VERSION_REFRESH_SECONDS later). A token newer than the table, or
+for a user the table does not know yet, is checked against the database,
+so new users and fresh tokens work on every worker straight away.
+
+Refresh tokens are single use: the ``jti`` of each one exchanged is kept
+in ``used_refresh_tokens`` until it expires, and presenting it again
+revokes all of the user's tokens.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.database import get_database
+
+
+class TokenVersionTable:
+    """Compact user_id -> token_version map refreshed from MongoDB."""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self.loaded_at: Optional[datetime] = None
+        self.refreshes = 0
+
+    async def refresh(self, db) -> None:
+        """
+        Reload versions for all active users.
+
+        Args:
+            db: Database instance
+        """
+        versions = {}
+        cursor = db.users.find(
+            {"is_active": {"$ne": False}},
+            {"_id": 1, "token_version": 1}
+        )
+        async for user in cursor:
+            versions[str(user["_id"])] = user.get("token_version", 0)
+
+        self._versions = versions
+        self.loaded_at = datetime.utcnow()
+        self.refreshes += 1
+
+    async def check(self, db, user_id: str, token_version: int) -> bool:
+        """
+        Check a token version, consulting the database when the table may be behind.
+
+        Versions older than the known one are rejected without a query.
+        Unknown users and newer versions (issued by another worker since the
+        last refresh) are looked up and recorded.
+
+        Args:
+            db: Database instance
+            user_id: User ID
+            token_version: Version embedded in the token
+
+        Returns:
+            True if the user is active and the version matches
+        """
+        known = self._versions.get(user_id)
+        if known is not None and token_version <= known:
+            return token_version == known
+
+        try:
+            user = await db.users.find_one(
+                {"_id": ObjectId(user_id)},
+                {"token_version": 1, "is_active": 1}
+            )
+        except InvalidId:
+            return False
+        if not user or user.get("is_active") is False:
+            self.remove(user_id)
+            return False
+
+        current = user.get("token_version", 0)
+        self.set(user_id, current)
+        return token_version == current
+
+    def set(self, user_id: str, token_version: int) -> None:
+        """Record a new version for a user in this process immediately."""
+        self._versions[user_id] = token_version
+
+    def remove(self, user_id: str) -> None:
+        """Revoke all tokens for a user in this process immediately."""
+        self._versions.pop(user_id, None)
+
+    def stats(self) -> dict:
+        """
+        Get table counters.
+
+        Returns:
+            Dictionary with size, refresh count and last load time
+        """
+        return {
+            "size": len(self._versions),
+            "refreshes": self.refreshes,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None
+        }
+
+
+# Global token version table
+token_versions = TokenVersionTable()
+_refresh_task: Optional[asyncio.Task] = None
+
+
+async def consume_refresh_token(db, jti: str, user_id: str, expires_at: datetime) -> bool:
+    """
+    Mark a refresh token as used.
+
+    The unique ``_id`` makes this atomic, so concurrent exchanges of the
+    same token cannot both succeed.
+
+    Args:
+        db: Database instance
+        jti: Token ID
+        user_id: User the token was issued to
+        expires_at: Token expiry (UTC); the record is dropped after it
+
+    Returns:
+        True if the token had not been used before
+    """
+    try:
+        await db.used_refresh_tokens.insert_one({
+            "_id": jti,
+            "user_id": user_id,
+            "expires_at": expires_at,
+            "used_at": datetime.utcnow()
+        })
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+async def revoke_user_tokens(db, user_id: str) -> None:
+    """
+    Revoke every token issued to a user by bumping their token version.
+
+    Args:
+        db: Database instance
+        user_id: User ID
+    """
+    user = await db.users.find_one_and_update(
+        {"_id": ObjectId(user_id)},
+        {"$inc": {"token_version": 1}},
+        projection={"token_version": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if user:
+        token_versions.set(user_id, user["token_version"])
+
+
+async def _refresh_loop() -> None:
+    """Periodically reload the token version table."""
+    while True:
+        await asyncio.sleep(settings.token_version_refresh_seconds)
+        try:
+            await token_versions.refresh(get_database())
+        except Exception as exc:
+            print(f"⚠️ Token version refresh failed: {exc}")
+
+
+async def start_token_version_refresh() -> None:
+    """Load the token version table and start the background refresh."""
+    global _refresh_task
+
+    await token_versions.refresh(get_database())
+    _refresh_task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_token_version_refresh() -> None:
+    """Stop the background refresh."""
+    global _refresh_task
+
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        _refresh_task = None
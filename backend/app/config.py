@@ -1,6 +1,7 @@
 """
 Configuration settings for the Design Approval Workflow System.
 """
+from typing import Dict
 from pydantic_settings import BaseSettings
 
 
@@ -10,12 +11,80 @@ class Settings(BaseSettings):
     # MongoDB Configuration
     mongodb_uri: str = "mongodb://localhost:27017"
     database_name: str = "design_approval_system"
+    ensure_indexes_on_startup: bool = True
+
+    # Keyset pagination for list endpoints
+    default_page_size: int = 50
+    max_page_size: int = 200
+
+    # Skip re-validation of database-sourced list responses and encode with orjson.
+    # Off by default: when on, legacy or partial documents are sent as stored rather
+    # than coerced or rejected. Opt in per deployment (see bench_serialization.py)
+    trusted_serialization: bool = False
+
+    # Documents fetched and encoded per batch by the streaming /export endpoints
+    export_batch_size: int = 500
+
+    # File storage backend ("gridfs" or "local"); local files live under
+    # storage_local_root and are sent with sendfile
+    storage_backend: str = "gridfs"
+    storage_local_root: str = "storage"
+
+    # File uploads: streamed into GridFS in chunks, size-limited by MIME type
+    # (exact type or "major/*"; others use upload_max_bytes)
+    upload_chunk_size: int = 1024 * 1024
+    upload_max_bytes: int = 100 * 1024 * 1024
+    upload_max_bytes_by_type: Dict[str, int] = {
+        "video/*": 2 * 1024 * 1024 * 1024,
+        "image/*": 50 * 1024 * 1024,
+        "application/pdf": 200 * 1024 * 1024
+    }
+
+    # Preview derivatives (longest side in pixels per size name), rendered on a
+    # process pool; needs the optional Pillow and PyMuPDF packages
+    thumbnails_enabled: bool = True
+    thumbnail_sizes: Dict[str, int] = {"small": 320, "large": 1280}
+    thumbnail_workers: int = 2
+    thumbnail_max_source_bytes: int = 100 * 1024 * 1024
+    thumbnail_webp_quality: int = 80
 
     # JWT Configuration
     secret_key: str = "your-secret-key-change-this-in-production"
     algorithm: str = "HS256"
     access_token_expire_days: int = 7
 
+    # Self-contained token mode (claims in the JWT, no user lookup per request)
+    self_contained_tokens: bool = False
+    self_contained_token_expire_minutes: int = 15
+    refresh_token_expire_days: int = 7
+    token_version_refresh_seconds: int = 30
+
+    # Principal cache (authenticated users kept in memory between requests)
+    principal_cache_size: int = 1024
+    principal_cache_ttl_seconds: int = 60
+
+    # Analytics result cache (0 TTL disables; stale entries served while refreshing)
+    analytics_cache_ttl_seconds: int = 30
+    analytics_cache_stale_seconds: int = 300
+    analytics_cache_max_entries: int = 256
+
+    # Password hashing pool ("thread" or "process")
+    password_hash_executor: str = "thread"
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64
+
+    # Login admission control ("memory" or "mongo" bucket store)
+    login_rate_limit_enabled: bool = True
+    login_rate_limit_backend: str = "memory"
+    login_rate_limit_max_keys: int = 100000
+    login_ip_burst: int = 20
+    login_ip_refill_per_minute: float = 10
+    login_account_burst: int = 5
+    login_account_refill_per_minute: float = 1
+    trust_forwarded_for: bool = False
+    # Proxies in front of the app that each append to X-Forwarded-For
+    forwarded_for_trusted_hops: int = 1
+
     # Application Settings
     app_title: str = "Design Approval Workflow System"
     app_version: str = "1.0.0"
@@ -1,24 +1,58 @@
 """
-Database connection and GridFS configuration for MongoDB.
+Database connection and file storage configuration for MongoDB.
 """
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
 from app.config import settings
+from app.storage.base import StorageBackend
+from app.storage.gridfs_backend import GridFSStorage
+from app.storage.local_backend import LocalStorage
+from app.utils.indexes import ensure_indexes
+from app.utils.stats import ensure_stats
 
 # MongoDB client (will be initialized on startup)
 motor_client: AsyncIOMotorClient = None
 database = None
 gridfs_bucket: AsyncIOMotorGridFSBucket = None
+storage: StorageBackend = None
+
+
+def create_storage(backend: str, db) -> StorageBackend:
+    """
+    Create a file storage backend.
+
+    Args:
+        backend: "gridfs" or "local"
+        db: Database instance
+
+    Returns:
+        Storage backend
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if backend == "gridfs":
+        return GridFSStorage(AsyncIOMotorGridFSBucket(db), db["fs.files"])
+    if backend == "local":
+        return LocalStorage(settings.storage_local_root, db.stored_files, db.stored_objects)
+    raise ValueError(f"Unknown storage backend: {backend}")
 
 
 async def connect_to_mongo():
-    """Connect to MongoDB and initialize GridFS bucket."""
-    global motor_client, database, gridfs_bucket
+    """Connect to MongoDB and initialize GridFS bucket and file storage."""
+    global motor_client, database, gridfs_bucket, storage
 
     motor_client = AsyncIOMotorClient(settings.mongodb_uri)
     database = motor_client[settings.database_name]
     gridfs_bucket = AsyncIOMotorGridFSBucket(database)
+    storage = create_storage(settings.storage_backend, database)
 
-    print(f"✅ Connected to MongoDB: {settings.database_name}")
+    print(f"✅ Connected to MongoDB: {settings.database_name} (file storage: {storage.name})")
+
+    if settings.ensure_indexes_on_startup:
+        await ensure_indexes(database)
+
+    # Dashboard counters are only incremented once they have been seeded
+    await ensure_stats(database)
 
 
 async def close_mongo_connection():
@@ -38,3 +72,8 @@ def get_database():
 def get_gridfs_bucket():
     """Get GridFS bucket instance."""
     return gridfs_bucket
+
+
+def get_storage() -> StorageBackend:
+    """Get file storage backend instance."""
+    return storage
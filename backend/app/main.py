@@ -5,7 +5,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import connect_to_mongo, close_mongo_connection
-from app.routers import auth, projects, uploads, remarks, users, tasks, analytics
+from app.auth.password import shutdown_password_pool
+from app.utils.thumbnails import shutdown_thumbnail_pool
+from app.auth.token_versions import start_token_version_refresh, stop_token_version_refresh
+from app.routers import auth, projects, uploads, remarks, users, tasks, analytics, metrics, calendar, export
 
 # Create FastAPI application
 app = FastAPI(
@@ -30,13 +33,18 @@ app.add_middleware(
 async def startup_event():
     """Connect to MongoDB on startup."""
     await connect_to_mongo()
+    if settings.self_contained_tokens:
+        await start_token_version_refresh()
     print(f"🚀 {settings.app_title} v{settings.app_version} started successfully!")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Close MongoDB connection on shutdown."""
+    """Close MongoDB connection and worker pools on shutdown."""
+    await stop_token_version_refresh()
     await close_mongo_connection()
+    shutdown_password_pool()
+    shutdown_thumbnail_pool()
 
 
 # Health check endpoint
@@ -58,6 +66,9 @@ app.include_router(remarks.router)
 app.include_router(users.router)
 app.include_router(tasks.router)
 app.include_router(analytics.router)
+app.include_router(calendar.router)
+app.include_router(export.router)
+app.include_router(metrics.router)
 
 
 if __name__ == "__main__":
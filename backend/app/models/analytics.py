@@ -0,0 +1,22 @@
+"""
+Analytics models and schemas.
+"""
+from typing import Optional
+from pydantic import BaseModel
+
+
+class TaskStatusCounts(BaseModel):
+    """Schema for task counts by status."""
+    total: int = 0
+    completed: int = 0
+    pending: int = 0
+    in_progress: int = 0
+    overdue: int = 0
+
+
+class UserPerformance(BaseModel):
+    """Schema for one user's row in the team performance leaderboard."""
+    user_id: str
+    name: str
+    role: Optional[str] = None
+    tasks: TaskStatusCounts
@@ -0,0 +1,22 @@
+"""
+Calendar event models and schemas.
+"""
+from datetime import datetime
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+
+CalendarEventType = Literal["task", "project"]
+
+
+class CalendarEvent(BaseModel):
+    """Schema for a task due date or project deadline in a calendar window."""
+    type: CalendarEventType
+    id: str
+    title: str
+    date: datetime
+    status: str  # Task status or project stage
+    priority: Optional[str] = None
+    project_id: Optional[str] = None
+    project_name: Optional[str] = None
+    assigned_to_names: List[str] = []
+    design_type: Optional[str] = None
@@ -0,0 +1,13 @@
+"""
+Pagination models and schemas.
+"""
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Schema for one page of a keyset-paginated listing."""
+    items: List[T]
+    next_cursor: Optional[str] = None
@@ -65,6 +65,7 @@ class TaskResponse(BaseModel):
     created_by_name: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
     design_type: Optional[str] = None
     checkpoints: List[Checkpoint] = []
     # Timer fields
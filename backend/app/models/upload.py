@@ -18,6 +18,7 @@ class UploadResponse(BaseModel):
     filename: str
     content_type: str
     file_size: int
+    sha256: Optional[str] = None
     version: int
     upload_type: str
     design_type: Optional[str] = None
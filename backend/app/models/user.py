@@ -72,4 +72,10 @@ class TokenResponse(BaseModel):
     """Schema for JWT token response."""
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
     user: UserResponse
+
+
+class RefreshRequest(BaseModel):
+    """Schema for exchanging a refresh token."""
+    refresh_token: str
@@ -1,13 +1,28 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from typing import Dict, Any, List, Optional
+from datetime import date, datetime
 from bson import ObjectId
+from ..config import settings
 from ..database import get_database
 from ..auth.dependencies import get_current_user
 from ..models.user import UserResponse
+from ..models.analytics import UserPerformance
+from ..models.pagination import Page
+from ..utils.analytics_queries import compute_dashboard
+from ..utils.performance_queries import find_user_performance
+from ..utils.serialization import build_model, list_response
+from ..utils.task_filters import date_range_query
+from ..utils.result_cache import analytics_cache
+from ..utils.stats import read_dashboard, reconcile_stats
+from ..utils.stage_analytics import rebuild_stage_dwell, stage_report
+from ..utils.time_tracking import TimeGrouping, time_report
+from ..utils.timeline import TIMELINE_SERIES, Granularity, build_timeline
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+# About five years of daily buckets
+MAX_TIMELINE_DAYS = 1830
+
 
 @router.get("/dashboard", response_model=Dict[str, Any])
 async def get_dashboard_analytics(
@@ -21,101 +36,57 @@ async def get_dashboard_analytics(
             detail="Only Admin, Manager, or Python Developer can view analytics"
         )
     
-    projects_collection = db.projects
-    users_collection = db.users
-    tasks_collection = db.tasks
+    return await analytics_cache.get_or_compute(("dashboard",), lambda: _dashboard(db))
+
+
+async def _dashboard(db) -> Dict[str, Any]:
+    """Counters from the rollup document; full recount until it is seeded"""
+    dashboard = await read_dashboard(db)
+    if dashboard is None:
+        dashboard = await compute_dashboard(db)
+    return dashboard
+
+
+@router.post("/stats/reconcile")
+async def reconcile_dashboard_stats(
+    apply: bool = True,
+    current_user: UserResponse = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """Recount the dashboard rollup counters and report drift (Admin only)"""
+    if current_user.role != "Admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only Admin can reconcile analytics counters"
+        )
     
-    # Total counts
-    total_projects = await projects_collection.count_documents({})
-    total_users = await users_collection.count_documents({})
-    total_tasks = await tasks_collection.count_documents({})
-    
-    # Project status breakdown
-    projects_by_status = {}
-    all_projects = await projects_collection.find().to_list(length=None)
-    
-    for project in all_projects:
-        stage = project.get("current_stage", "unknown")
-        projects_by_status[stage] = projects_by_status.get(stage, 0) + 1
-    
-    # Projects by status
-    completed_projects = projects_by_status.get("completed", 0)
-    active_projects = total_projects - completed_projects
-    
-    # Posted projects
-    posted_projects = await projects_collection.count_documents({"is_posted": True})
-    
-    # Recent projects (last 7 days)
-    seven_days_ago = datetime.now() - timedelta(days=7)
-    recent_projects = await projects_collection.count_documents({
-        "created_at": {"$gte": seven_days_ago}
-    })
-    
-    # Tasks statistics
-    pending_tasks = await tasks_collection.count_documents({"status": "pending"})
-    in_progress_tasks = await tasks_collection.count_documents({"status": "in_progress"})
-    completed_tasks = await tasks_collection.count_documents({"status": "completed"})
-    overdue_tasks = await tasks_collection.count_documents({
-        "status": {"$in": ["pending", "in_progress"]},
-        "due_date": {"$lt": datetime.now()}
-    })
-    
-    # User role distribution
-    users_by_role = {}
-    all_users = await users_collection.find().to_list(length=None)
-    for user in all_users:
-        role = user.get("role", "Unknown")
-        users_by_role[role] = users_by_role.get(role, 0) + 1
-    
-    # Projects by design type
-    projects_by_type = {}
-    for project in all_projects:
-        design_type = project.get("design_type", "Not specified")
-        if design_type and design_type != "Not specified":
-            projects_by_type[design_type] = projects_by_type.get(design_type, 0) + 1
-    
-    # Average approval time (days from creation to completion)
-    completed = [p for p in all_projects if p.get("current_stage") == "completed"]
-    avg_approval_time = 0
-    if completed:
-        total_days = 0
-        for project in completed:
-            if project.get("created_at") and project.get("updated_at"):
-                delta = project["updated_at"] - project["created_at"]
-                total_days += delta.days
-        avg_approval_time = round(total_days / len(completed), 1) if completed else 0
+    report = await reconcile_stats(db, apply=apply)
+    if apply:
+        analytics_cache.purge("dashboard")
+    return report
+
+
+@router.delete("/cache")
+async def purge_analytics_cache(
+    endpoint: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Drop cached analytics results, optionally for one endpoint only (Admin only)"""
+    if current_user.role != "Admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only Admin can purge the analytics cache"
+        )
     
-    return {
-        "overview": {
-            "total_projects": total_projects,
-            "active_projects": active_projects,
-            "completed_projects": completed_projects,
-            "posted_projects": posted_projects,
-            "total_users": total_users,
-            "total_tasks": total_tasks,
-            "recent_projects_7days": recent_projects
-        },
-        "projects": {
-            "by_status": projects_by_status,
-            "by_type": projects_by_type,
-            "average_approval_days": avg_approval_time
-        },
-        "tasks": {
-            "pending": pending_tasks,
-            "in_progress": in_progress_tasks,
-            "completed": completed_tasks,
-            "overdue": overdue_tasks
-        },
-        "users": {
-            "by_role": users_by_role
-        }
-    }
+    return {"purged": analytics_cache.purge(endpoint)}
 
 
 @router.get("/projects/timeline")
 async def get_projects_timeline(
     current_user: UserResponse = Depends(get_current_user),
-    days: int = 30,
+    days: int = Query(30, ge=1, le=MAX_TIMELINE_DAYS),
+    granularity: Granularity = "day",
+    tz: str = "UTC",
     db=Depends(get_database)
 ):
     """Get project creation timeline for charts"""
@@ -125,32 +96,120 @@ async def get_projects_timeline(
             detail="Only Admin, Manager, or Python Developer can view analytics"
         )
     
-    projects_collection = db.projects
+    timeline = await analytics_cache.get_or_compute(
+        ("projects_timeline", days, granularity, tz),
+        lambda: build_timeline(db, ["projects_created"], days, granularity, tz)
+    )
+    return [{"date": bucket["date"], "count": bucket["projects_created"]} for bucket in timeline]
+
+
+@router.get("/timeline")
+async def get_activity_timeline(
+    current_user: UserResponse = Depends(get_current_user),
+    days: int = Query(30, ge=1, le=MAX_TIMELINE_DAYS),
+    granularity: Granularity = "day",
+    tz: str = "UTC",
+    db=Depends(get_database)
+):
+    """Get projects created, tasks created and tasks completed per day, week or month"""
+    if current_user.role not in ["Admin", "Manager", "Python Developer"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only Admin, Manager, or Python Developer can view analytics"
+        )
+    
+    return await analytics_cache.get_or_compute(
+        ("timeline", days, granularity, tz),
+        lambda: build_timeline(db, list(TIMELINE_SERIES), days, granularity, tz)
+    )
+
+
+@router.get("/stages")
+async def get_stage_analytics(
+    current_user: UserResponse = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """Get median/p90 time spent per workflow stage and rejection loop counts"""
+    if current_user.role not in ["Admin", "Manager", "Python Developer"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only Admin, Manager, or Python Developer can view analytics"
+        )
+    
+    return await stage_report(db)
+
+
+@router.post("/stages/rebuild")
+async def rebuild_stage_analytics(
+    current_user: UserResponse = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """Recompute stage histograms and rejection counts from the approvals (Admin only)"""
+    if current_user.role != "Admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only Admin can rebuild stage analytics"
+        )
+    
+    return await rebuild_stage_dwell(db)
+
+
+@router.get("/time")
+async def get_time_analytics(
+    group_by: TimeGrouping = "user",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    user_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """Get tracked timer hours per user, project, day or week from the daily rollups
+    Optional inclusive [date_from, date_to] range; user and project rows include allocated hours.
+    Users other than Admin and Manager only see their own time.
+    """
+    if current_user.role not in ["Admin", "Manager"]:
+        if user_id and user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only view your own time"
+            )
+        user_id = current_user.id
+    
+    if date_from and date_to and date_to < date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must not be before date_from"
+        )
+    
+    return await time_report(db, group_by, date_from, date_to, user_id, project_id)
+
+
+@router.get("/performance/users", response_model=Page[UserPerformance])
+async def get_team_performance(
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """Get task counts for every assignee, most completed first (Admin, Manager)
+    Optional [due_from, due_to) range on task due dates.
+    """
+    if current_user.role not in ["Admin", "Manager"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only Admin or Manager can view team performance"
+        )
+    
+    match = {}
+    due_range = date_range_query(due_from, due_to)
+    if due_range:
+        match["due_date"] = due_range
     
-    # Get projects from last N days
-    start_date = datetime.now() - timedelta(days=days)
-    projects = await projects_collection.find({
-        "created_at": {"$gte": start_date}
-    }).to_list(length=None)
-    
-    # Group by date
-    timeline = {}
-    for project in projects:
-        date_str = project["created_at"].strftime("%Y-%m-%d")
-        timeline[date_str] = timeline.get(date_str, 0) + 1
-    
-    # Fill missing dates with 0
-    current = start_date
-    result = []
-    while current <= datetime.now():
-        date_str = current.strftime("%Y-%m-%d")
-        result.append({
-            "date": date_str,
-            "count": timeline.get(date_str, 0)
-        })
-        current += timedelta(days=1)
-    
-    return result
+    items, next_cursor = await find_user_performance(db, match, cursor, limit)
+    return list_response(build_model(Page[UserPerformance], items=items, next_cursor=next_cursor))
 
 
 @router.get("/performance/user/{user_id}")
@@ -2,12 +2,16 @@
 Authentication routes: registration, login, and user info.
 """
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, status, Depends
-from app.models.user import UserRegister, UserLogin, UserResponse, TokenResponse
-from app.auth.password import hash_password, verify_password
-from app.auth.jwt_handler import create_access_token
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from app.models.user import UserRegister, UserLogin, UserResponse, TokenResponse, RefreshRequest
+from app.auth.password import hash_password_async, verify_password_async
+from app.auth.jwt_handler import create_user_tokens, verify_token
 from app.auth.dependencies import get_current_user
+from app.auth.token_versions import consume_refresh_token, revoke_user_tokens, token_versions
+from app.auth.rate_limit import login_rate_limiter, get_client_ip
 from app.database import get_database
+from app.utils.stats import counter, record
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -40,21 +44,18 @@ async def register(user_data: UserRegister):
     user_doc = {
         "name": user_data.name,
         "email": user_data.email,
-        "password_hash": hash_password(user_data.password),
+        "password_hash": await hash_password_async(user_data.password),
         "role": user_data.role,
         "created_at": datetime.utcnow(),
-        "is_active": True
+        "is_active": True,
+        "token_version": 0
     }
 
     # Insert user
     result = await db.users.insert_one(user_doc)
     user_id = str(result.inserted_id)
-
-    # Create JWT token
-    token = create_access_token({
-        "user_id": user_id,
-        "role": user_data.role
-    })
+    token_versions.set(user_id, 0)
+    await record(db, (counter("users", "total"), 1), (counter("users", "by_role", user_data.role), 1))
 
     # Prepare user response
     user_response = UserResponse(
@@ -66,26 +67,34 @@ async def register(user_data: UserRegister):
         is_active=True
     )
 
+    # Create JWT tokens
+    access_token, refresh_token = create_user_tokens(user_response, 0)
+
     return TokenResponse(
-        access_token=token,
+        access_token=access_token,
+        refresh_token=refresh_token,
         user=user_response
     )
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin):
+async def login(credentials: UserLogin, request: Request):
     """
     Login user and return JWT token.
 
     Args:
         credentials: Login credentials
+        request: Incoming request (used for the client IP)
 
     Returns:
         JWT token and user information
 
     Raises:
-        HTTPException: If credentials are invalid
+        HTTPException: If credentials are invalid or too many attempts were made
     """
+    # Reject floods before any database or bcrypt work
+    await login_rate_limiter.check(get_client_ip(request), credentials.email)
+
     db = get_database()
 
     # Find user by email
@@ -97,7 +106,7 @@ async def login(credentials: UserLogin):
         )
 
     # Verify password
-    if not verify_password(credentials.password, user["password_hash"]):
+    if not await verify_password_async(credentials.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -110,14 +119,8 @@ async def login(credentials: UserLogin):
             detail="Account is deactivated"
         )
 
-    # Create JWT token
-    user_id = str(user["_id"])
-    token = create_access_token({
-        "user_id": user_id,
-        "role": user["role"]
-    })
-
     # Prepare user response
+    user_id = str(user["_id"])
     user_response = UserResponse(
         id=user_id,
         name=user["name"],
@@ -127,8 +130,76 @@ async def login(credentials: UserLogin):
         is_active=user["is_active"]
     )
 
+    # Create JWT tokens
+    access_token, refresh_token = create_user_tokens(
+        user_response,
+        user.get("token_version", 0)
+    )
+
+    return TokenResponse(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        user=user_response
+    )
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh_tokens(refresh_data: RefreshRequest):
+    """
+    Exchange a refresh token for a new access and refresh token.
+
+    Each refresh token can be exchanged once. Presenting one again means
+    it was copied, so every token of the user is revoked.
+
+    Args:
+        refresh_data: Refresh token issued at login or by a previous refresh
+
+    Returns:
+        New JWT tokens and user information
+
+    Raises:
+        HTTPException: If the refresh token is invalid, revoked or reused
+    """
+    payload = verify_token(refresh_data.refresh_token)
+    # Tokens issued before rotation was enforced have no jti and cannot be tracked
+    if payload is None or payload.get("typ") != "refresh" or not payload.get("jti"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+
+    db = get_database()
+    user = await db.users.find_one({"_id": ObjectId(payload["user_id"])})
+
+    token_version = user.get("token_version", 0) if user else None
+    if not user or not user.get("is_active", True) or token_version != payload.get("ver"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked"
+        )
+
+    expires_at = datetime.utcfromtimestamp(payload["exp"])
+    if not await consume_refresh_token(db, payload["jti"], payload["user_id"], expires_at):
+        await revoke_user_tokens(db, payload["user_id"])
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has already been used"
+        )
+
+    user_response = UserResponse(
+        id=str(user["_id"]),
+        name=user["name"],
+        email=user["email"],
+        role=user["role"],
+        created_at=user["created_at"],
+        is_active=user.get("is_active", True)
+    )
+
+    access_token, refresh_token = create_user_tokens(user_response, token_version)
+
     return TokenResponse(
-        access_token=token,
+        access_token=access_token,
+        refresh_token=refresh_token,
         user=user_response
     )
 
@@ -0,0 +1,106 @@
+"""
+Calendar routes: task due dates and project deadlines for a date window.
+"""
+from datetime import datetime, timedelta
+from typing import List
+from fastapi import APIRouter, HTTPException, Query, status, Depends
+from app.models.user import UserResponse
+from app.models.calendar import CalendarEvent
+from app.auth.dependencies import get_current_user
+from app.database import get_database
+from app.utils.resolvers import BatchResolver
+from app.utils.task_filters import build_task_query, date_range_query
+
+router = APIRouter(prefix="/calendar", tags=["Calendar"])
+
+# Widest window a single calendar request may cover
+MAX_WINDOW_DAYS = 366
+
+
+@router.get("", response_model=List[CalendarEvent])
+async def get_calendar_events(
+    date_from: datetime = Query(..., alias="from"),
+    date_to: datetime = Query(..., alias="to"),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Get task due dates and project deadlines within [from, to).
+
+    Args:
+        date_from: Inclusive window start
+        date_to: Exclusive window end
+        current_user: Current authenticated user
+
+    Returns:
+        Events sorted by date
+
+    Raises:
+        HTTPException: If the window is empty or too wide
+    """
+    if date_to <= date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must be after 'from'"
+        )
+    if date_to - date_from > timedelta(days=MAX_WINDOW_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Calendar window cannot exceed {MAX_WINDOW_DAYS} days"
+        )
+
+    db = get_database()
+
+    # Tasks visible to the user that are due in the window
+    tasks = await db.tasks.find(
+        build_task_query(current_user, due_from=date_from, due_to=date_to),
+        {"title": 1, "due_date": 1, "status": 1, "priority": 1, "project_id": 1,
+         "assigned_to": 1, "design_type": 1}
+    ).to_list(length=None)
+
+    # All users can view all projects
+    projects = await db.projects.find(
+        {"expected_completion_date": date_range_query(date_from, date_to)},
+        {"project_name": 1, "expected_completion_date": 1, "current_stage": 1, "design_type": 1}
+    ).to_list(length=None)
+
+    users = BatchResolver(db.users, ["name"])
+    project_names = BatchResolver(db.projects, ["project_name"])
+    for task in tasks:
+        assigned_to = task.get("assigned_to", [])
+        task["assigned_to"] = [assigned_to] if isinstance(assigned_to, str) else assigned_to
+        users.add(*task["assigned_to"])
+        project_names.add(task.get("project_id"))
+    await users.load()
+    await project_names.load()
+
+    events = [
+        CalendarEvent(
+            type="task",
+            id=str(task["_id"]),
+            title=task["title"],
+            date=task["due_date"],
+            status=task.get("status", "pending"),
+            priority=task.get("priority"),
+            project_id=task.get("project_id"),
+            project_name=project_names.value(task.get("project_id"), "project_name"),
+            assigned_to_names=[users.value(uid, "name", "Unknown") for uid in task["assigned_to"]],
+            design_type=task.get("design_type")
+        )
+        for task in tasks
+    ]
+    events.extend(
+        CalendarEvent(
+            type="project",
+            id=str(project["_id"]),
+            title=project["project_name"],
+            date=project["expected_completion_date"],
+            status=project["current_stage"],
+            project_id=str(project["_id"]),
+            project_name=project["project_name"],
+            design_type=project.get("design_type")
+        )
+        for project in projects
+    )
+
+    events.sort(key=lambda event: event.date)
+    return events
@@ -0,0 +1,225 @@
+"""
+Streaming export routes for BI tools: tasks, projects and team performance.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, status, Depends
+from app.config import settings
+from app.models.user import UserResponse
+from app.models.task import TaskPriority, TaskStatus
+from app.auth.dependencies import get_current_user
+from app.database import get_database
+from app.utils.export import ExportFormat, export_response
+from app.utils.pagination import keyset_sort
+from app.utils.performance_queries import performance_pipeline
+from app.utils.project_queries import project_response_pipeline
+from app.utils.resolvers import BatchResolver
+from app.utils.task_filters import build_task_query, date_range_query
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+TASK_COLUMNS = [
+    "id", "title", "description", "status", "priority", "project_id", "project_name",
+    "assigned_to", "assigned_to_names", "created_by", "created_by_name", "due_date",
+    "created_at", "updated_at", "completed_at", "design_type", "allocated_hours",
+    "time_spent_ms", "is_timer_running", "filename"
+]
+
+PROJECT_COLUMNS = [
+    "id", "project_name", "digital_marketer_id", "digital_marketer_name", "content_description",
+    "expected_completion_date", "actual_completion_date", "current_stage", "design_type",
+    "posted", "created_at", "updated_at"
+]
+
+PERFORMANCE_COLUMNS = ["user_id", "name", "role", "total", "completed", "pending", "in_progress", "overdue"]
+
+
+async def _task_rows(tasks: List[dict]) -> List[Dict[str, Any]]:
+    """
+    Shape one batch of tasks, resolving names with one query per collection.
+
+    Args:
+        tasks: Task documents
+
+    Returns:
+        Rows keyed by TASK_COLUMNS
+    """
+    db = get_database()
+    users = BatchResolver(db.users, ["name"])
+    projects = BatchResolver(db.projects, ["project_name"])
+    for task in tasks:
+        assigned_to = task.get("assigned_to", [])
+        task["assigned_to"] = [assigned_to] if isinstance(assigned_to, str) else assigned_to
+        users.add(*task["assigned_to"], task.get("created_by"))
+        projects.add(task.get("project_id"))
+    await users.load()
+    await projects.load()
+
+    return [
+        {
+            "id": str(task["_id"]),
+            "title": task.get("title"),
+            "description": task.get("description"),
+            "status": task.get("status", "pending"),
+            "priority": task.get("priority"),
+            "project_id": task.get("project_id"),
+            "project_name": projects.value(task.get("project_id"), "project_name"),
+            "assigned_to": task["assigned_to"],
+            "assigned_to_names": [users.value(uid, "name", "Unknown") for uid in task["assigned_to"]],
+            "created_by": task.get("created_by"),
+            "created_by_name": users.value(task.get("created_by"), "name", "Unknown"),
+            "due_date": task.get("due_date"),
+            "created_at": task.get("created_at"),
+            "updated_at": task.get("updated_at"),
+            "completed_at": task.get("completed_at"),
+            "design_type": task.get("design_type"),
+            "allocated_hours": task.get("allocated_hours"),
+            "time_spent_ms": task.get("time_spent_ms", 0),
+            "is_timer_running": task.get("is_timer_running", False),
+            "filename": task.get("filename")
+        }
+        for task in tasks
+    ]
+
+
+async def _project_rows(projects: List[dict]) -> List[Dict[str, Any]]:
+    """Projects already come shaped (and named) by the aggregation."""
+    return projects
+
+
+async def _performance_rows(rows: List[dict]) -> List[Dict[str, Any]]:
+    """Flatten the per-assignee task counts into one level."""
+    return [
+        {"user_id": row["user_id"], "name": row["name"], "role": row.get("role"), **row["tasks"]}
+        for row in rows
+    ]
+
+
+@router.get("/tasks")
+async def export_tasks(
+    request: Request,
+    export_format: ExportFormat = Query("csv", alias="format"),
+    task_status: Optional[TaskStatus] = Query(None, alias="status"),
+    priority: Optional[TaskPriority] = None,
+    project_id: Optional[str] = None,
+    assignee: Optional[str] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Stream tasks visible to the user as CSV or NDJSON, newest first.
+
+    Accepts the same filters as GET /tasks/.
+
+    Args:
+        request: Incoming request
+        export_format: "csv" or "ndjson"
+        task_status: Optional task status
+        priority: Optional task priority
+        project_id: Optional linked project ID
+        assignee: Optional assigned user ID
+        due_from: Optional inclusive lower bound on due_date
+        due_to: Optional exclusive upper bound on due_date
+        current_user: Current authenticated user
+
+    Returns:
+        Streaming file download
+    """
+    db = get_database()
+    query = build_task_query(
+        current_user,
+        task_status=task_status,
+        priority=priority,
+        project_id=project_id,
+        assignee=assignee,
+        due_from=due_from,
+        due_to=due_to
+    )
+    cursor = db.tasks.find(query).sort(keyset_sort()).batch_size(settings.export_batch_size)
+    return export_response(
+        request, cursor, _task_rows, export_format, TASK_COLUMNS, "tasks", settings.export_batch_size
+    )
+
+
+@router.get("/projects")
+async def export_projects(
+    request: Request,
+    export_format: ExportFormat = Query("csv", alias="format"),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Stream all projects as CSV or NDJSON, newest first.
+
+    Marketer names are joined by the same aggregation as GET /projects.
+
+    Args:
+        request: Incoming request
+        export_format: "csv" or "ndjson"
+        current_user: Current authenticated user
+
+    Returns:
+        Streaming file download
+    """
+    db = get_database()
+
+    # All users can view all projects
+    cursor = db.projects.aggregate(
+        project_response_pipeline({}, sort=keyset_sort()),
+        batchSize=settings.export_batch_size,
+        allowDiskUse=True
+    )
+    return export_response(
+        request, cursor, _project_rows, export_format, PROJECT_COLUMNS, "projects", settings.export_batch_size
+    )
+
+
+@router.get("/performance")
+async def export_performance(
+    request: Request,
+    export_format: ExportFormat = Query("csv", alias="format"),
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Stream task counts for every assignee, most completed first (Admin, Manager).
+
+    Accepts the same filters as GET /analytics/performance/users.
+
+    Args:
+        request: Incoming request
+        export_format: "csv" or "ndjson"
+        due_from: Optional inclusive lower bound on due_date
+        due_to: Optional exclusive upper bound on due_date
+        current_user: Current authenticated user
+
+    Returns:
+        Streaming file download
+
+    Raises:
+        HTTPException: If the user is not an Admin or Manager
+    """
+    if current_user.role not in ["Admin", "Manager"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only Admin or Manager can export team performance"
+        )
+
+    db = get_database()
+    match = {}
+    due_range = date_range_query(due_from, due_to)
+    if due_range:
+        match["due_date"] = due_range
+
+    # Grouping every task can pass the 100 MB stage limit; spill to disk
+    # rather than fail after the response has started
+    cursor = db.tasks.aggregate(
+        performance_pipeline(match, datetime.now()),
+        batchSize=settings.export_batch_size,
+        allowDiskUse=True
+    )
+    return export_response(
+        request, cursor, _performance_rows, export_format, PERFORMANCE_COLUMNS, "performance",
+        settings.export_batch_size
+    )
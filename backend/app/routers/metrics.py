@@ -0,0 +1,42 @@
+"""
+Operational metrics routes.
+"""
+from typing import Any, Dict
+from fastapi import APIRouter, Depends
+from app.models.user import UserResponse
+from app.auth.dependencies import require_role
+from app.auth.principal_cache import principal_cache
+from app.auth.password import get_password_pool_stats
+from app.auth.token_versions import token_versions
+from app.auth.rate_limit import login_rate_limiter
+from app.database import get_database
+from app.utils.blobs import blob_stats
+from app.utils.result_cache import analytics_cache
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("", response_model=Dict[str, Any])
+async def get_metrics(
+    current_user: UserResponse = Depends(require_role("Admin"))
+):
+    """
+    Get in-process cache and admission counters (Admin only).
+
+    Counters are per worker process and reset on restart, except file
+    deduplication totals, which are read from the database.
+
+    Args:
+        current_user: Current authenticated admin
+
+    Returns:
+        Dictionary of metric groups
+    """
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_pool": get_password_pool_stats(),
+        "token_versions": token_versions.stats(),
+        "login_admission": login_rate_limiter.stats(),
+        "analytics_cache": analytics_cache.stats(),
+        "file_dedup": await blob_stats(get_database())
+    }
@@ -2,10 +2,13 @@
 Project management and workflow routes.
 """
 from datetime import datetime
-from typing import List, Optional
-from fastapi import APIRouter, File, Form, UploadFile, HTTPException, status, Depends
+from typing import List, Optional, Union
+from fastapi import APIRouter, BackgroundTasks, File, Form, UploadFile, HTTPException, Query, status, Depends
 from bson import ObjectId
+from pymongo import ReturnDocument
+from app.config import settings
 from app.models.user import UserResponse
+from app.models.pagination import Page
 from app.models.project import (
     ProjectCreate,
     ProjectResponse,
@@ -21,7 +24,13 @@ from app.utils.permissions import (
     can_create_project,
     can_upload_design
 )
-from app.utils.gridfs_handler import upload_file_to_gridfs
+from app.utils.blobs import store_upload
+from app.utils.thumbnails import schedule_derivatives
+from app.utils.project_queries import find_project_response, find_project_responses
+from app.utils.pagination import encode_cursor, keyset_query, keyset_sort
+from app.utils.serialization import build_model, list_response
+from app.utils.stats import approval_days, counter, design_type_bucket, record, transition
+from app.utils.stage_analytics import dwell_ms_between, record_stage_dwell, stage_entry_time
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
@@ -63,10 +72,17 @@ async def create_project(
         "design_type": None,
         "posted": False,
         "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
+        "updated_at": datetime.utcnow(),
+        "rejection_count": 0
     }
+    project_doc["stage_entered_at"] = project_doc["created_at"]
 
     result = await db.projects.insert_one(project_doc)
+    await record(
+        db,
+        (counter("projects", "total"), 1),
+        (counter("projects", "by_status", "digital_marketer"), 1)
+    )
 
     return ProjectResponse(
         id=str(result.inserted_id),
@@ -87,6 +103,7 @@ async def create_project(
 @router.post("/{project_id}/upload-content")
 async def upload_content(
     project_id: str,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: UserResponse = Depends(get_current_user)
 ):
@@ -95,6 +112,7 @@ async def upload_content(
 
     Args:
         project_id: Project ID
+        background_tasks: Preview generation queue
         file: Content file
         current_user: Current authenticated user
 
@@ -129,13 +147,10 @@ async def upload_content(
             detail="Only the project creator can upload content"
         )
 
-    # Upload file to GridFS
-    file_data = await file.read()
-    file_id = await upload_file_to_gridfs(
-        file_data,
-        file.filename,
-        file.content_type or "application/octet-stream"
-    )
+    # Store file in GridFS, reusing an identical earlier upload
+    stored = await store_upload(db, file)
+    file_id = stored["file_id"]
+    schedule_derivatives(background_tasks, db, file_id, stored["content_type"])
 
     # Get current version number
     max_version = await db.uploads.find_one(
@@ -155,9 +170,10 @@ async def upload_content(
         "project_id": obj_id,
         "uploaded_by": ObjectId(current_user.id),
         "file_id": file_id,
-        "filename": file.filename,
-        "content_type": file.content_type or "application/octet-stream",
-        "file_size": len(file_data),
+        "filename": stored["filename"],
+        "content_type": stored["content_type"],
+        "file_size": stored["file_size"],
+        "sha256": stored["sha256"],
         "version": next_version,
         "upload_type": "content",
         "design_type": None,
@@ -168,15 +184,20 @@ async def upload_content(
     await db.uploads.insert_one(upload_doc)
 
     # Update project stage to designer
-    await db.projects.update_one(
+    previous = await db.projects.find_one_and_update(
         {"_id": obj_id},
         {
             "$set": {
                 "current_stage": "designer",
+                "stage_entered_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow()
             }
-        }
+        },
+        projection={"current_stage": 1},
+        return_document=ReturnDocument.BEFORE
     )
+    if previous:
+        await record(db, *transition("projects", "by_status", previous.get("current_stage") or "unknown", "designer"))
 
     return {"message": "Content uploaded successfully", "file_id": str(file_id)}
 
@@ -184,6 +205,7 @@ async def upload_content(
 @router.post("/{project_id}/upload-design")
 async def upload_design(
     project_id: str,
+    background_tasks: BackgroundTasks,
     design_type: str = Form(...),
     file: UploadFile = File(...),
     current_user: UserResponse = Depends(get_current_user)
@@ -193,6 +215,7 @@ async def upload_design(
 
     Args:
         project_id: Project ID
+        background_tasks: Preview generation queue
         design_type: Type of design
         file: Design file
         current_user: Current authenticated user
@@ -234,13 +257,10 @@ async def upload_design(
             detail=f"Project is not in designer stage. Current stage: {project['current_stage']}"
         )
 
-    # Upload file to GridFS
-    file_data = await file.read()
-    file_id = await upload_file_to_gridfs(
-        file_data,
-        file.filename,
-        file.content_type or "application/octet-stream"
-    )
+    # Store file in GridFS, reusing an identical earlier upload
+    stored = await store_upload(db, file)
+    file_id = stored["file_id"]
+    schedule_derivatives(background_tasks, db, file_id, stored["content_type"])
 
     # Get current version number
     max_version = await db.uploads.find_one(
@@ -260,9 +280,10 @@ async def upload_design(
         "project_id": obj_id,
         "uploaded_by": ObjectId(current_user.id),
         "file_id": file_id,
-        "filename": file.filename,
-        "content_type": file.content_type or "application/octet-stream",
-        "file_size": len(file_data),
+        "filename": stored["filename"],
+        "content_type": stored["content_type"],
+        "file_size": stored["file_size"],
+        "sha256": stored["sha256"],
         "version": next_version,
         "upload_type": "design",
         "design_type": design_type,
@@ -273,32 +294,50 @@ async def upload_design(
     await db.uploads.insert_one(upload_doc)
 
     # Update project with design type and move to graphic_designer stage
-    await db.projects.update_one(
+    previous = await db.projects.find_one_and_update(
         {"_id": obj_id},
         {
             "$set": {
                 "design_type": design_type,
                 "current_stage": "graphic_designer",
+                "stage_entered_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow()
             }
-        }
+        },
+        projection={"current_stage": 1, "design_type": 1},
+        return_document=ReturnDocument.BEFORE
     )
+    if previous:
+        await record(
+            db,
+            *transition("projects", "by_status", previous.get("current_stage") or "unknown", "graphic_designer"),
+            *transition(
+                "projects", "by_type",
+                design_type_bucket(previous.get("design_type")), design_type_bucket(design_type)
+            )
+        )
 
     return {"message": "Design uploaded successfully", "file_id": str(file_id)}
 
 
-@router.get("", response_model=List[ProjectResponse])
+@router.get("", response_model=Union[Page[ProjectResponse], List[ProjectResponse]])
 async def get_projects(
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    unpaged: bool = False,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """
-    Get all projects accessible to the current user.
+    Get projects accessible to the current user, newest first.
 
     Args:
+        limit: Page size
+        cursor: next_cursor from the previous page
+        unpaged: Return a plain list of up to 1000 projects (legacy behavior)
         current_user: Current authenticated user
 
     Returns:
-        List of projects
+        Page of projects, or a list when unpaged is set
     """
     db = get_database()
 
@@ -306,32 +345,29 @@ async def get_projects(
     # Allow all users to view all projects
     query = {}
 
+    if unpaged:
+        # Get projects with marketer names in a single aggregation
+        return list_response(await find_project_responses(
+            db,
+            query,
+            sort=[("created_at", -1)],
+            limit=1000
+        ))
+
+    # Fetch one extra project to know whether another page exists
+    projects = await find_project_responses(
+        db,
+        keyset_query(query, cursor),
+        sort=keyset_sort(),
+        limit=limit + 1
+    )
 
-    # Get projects
-    projects = await db.projects.find(query).sort("created_at", -1).to_list(length=1000)
-
-    # Populate digital marketer names
-    result = []
-    for project in projects:
-        marketer = await db.users.find_one({"_id": project["digital_marketer_id"]})
-        result.append(
-            ProjectResponse(
-                id=str(project["_id"]),
-                project_name=project["project_name"],
-                digital_marketer_id=str(project["digital_marketer_id"]),
-                digital_marketer_name=marketer["name"] if marketer else "Unknown",
-                content_description=project["content_description"],
-                expected_completion_date=project["expected_completion_date"],
-                actual_completion_date=project.get("actual_completion_date"),
-                current_stage=project["current_stage"],
-                design_type=project.get("design_type"),
-                posted=project.get("posted", False),
-                created_at=project["created_at"],
-                updated_at=project["updated_at"]
-            )
-        )
+    next_cursor = None
+    if len(projects) > limit:
+        projects = projects[:limit]
+        next_cursor = encode_cursor(projects[-1].created_at, projects[-1].id)
 
-    return result
+    return list_response(build_model(Page[ProjectResponse], items=projects, next_cursor=next_cursor))
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
@@ -359,30 +395,14 @@ async def get_project(
             detail="Invalid project ID"
         )
 
-    project = await db.projects.find_one({"_id": obj_id})
+    project = await find_project_response(db, obj_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
 
-    # Get digital marketer info
-    marketer = await db.users.find_one({"_id": project["digital_marketer_id"]})
-
-    return ProjectResponse(
-        id=str(project["_id"]),
-        project_name=project["project_name"],
-        digital_marketer_id=str(project["digital_marketer_id"]),
-        digital_marketer_name=marketer["name"] if marketer else "Unknown",
-        content_description=project["content_description"],
-        expected_completion_date=project["expected_completion_date"],
-        actual_completion_date=project.get("actual_completion_date"),
-        current_stage=project["current_stage"],
-        design_type=project.get("design_type"),
-        posted=project.get("posted", False),
-        created_at=project["created_at"],
-        updated_at=project["updated_at"]
-    )
+    return project
 
 
 @router.post("/{project_id}/approve-reject")
@@ -431,16 +451,21 @@ async def approve_or_reject_project(
     # Get next stage
     next_stage = get_next_stage(current_stage, action_data.action)
 
-    # Create approval record
+    # Create approval record with the time spent in the reviewed stage
+    reviewed_at = datetime.utcnow()
+    approved = action_data.action == "approve"
+    dwell_ms = dwell_ms_between(stage_entry_time(project), reviewed_at)
     approval_doc = {
         "project_id": obj_id,
         "stage": current_stage,
         "reviewer_id": ObjectId(current_user.id),
-        "status": "approved" if action_data.action == "approve" else "rejected",
-        "reviewed_at": datetime.utcnow(),
-        "created_at": datetime.utcnow()
+        "status": "approved" if approved else "rejected",
+        "dwell_ms": dwell_ms,
+        "reviewed_at": reviewed_at,
+        "created_at": reviewed_at
     }
     await db.approvals.insert_one(approval_doc)
+    await record_stage_dwell(db, current_stage, approved, dwell_ms)
 
     # Add remark if provided
     if action_data.remark:
@@ -462,16 +487,31 @@ async def approve_or_reject_project(
     # Update project stage and completion date if approved to completed
     update_data = {
         "current_stage": next_stage,
+        "stage_entered_at": reviewed_at,
         "updated_at": datetime.utcnow()
     }
 
     if next_stage == "completed":
         update_data["actual_completion_date"] = datetime.utcnow()
 
-    await db.projects.update_one(
+    project_update = {"$set": update_data}
+    if not approved:
+        project_update["$inc"] = {"rejection_count": 1}
+
+    previous = await db.projects.find_one_and_update(
         {"_id": obj_id},
-        {"$set": update_data}
+        project_update,
+        return_document=ReturnDocument.BEFORE
     )
+    if previous:
+        previous_stage = previous.get("current_stage") or "unknown"
+        changes = list(transition("projects", "by_status", previous_stage, next_stage or "unknown"))
+        # Keep the approval-time total in step with the completed bucket
+        if previous_stage == "completed" and next_stage != "completed":
+            changes.append((counter("projects", "approval_days_total"), -approval_days(previous)))
+        if next_stage == "completed" and previous_stage != "completed":
+            changes.append((counter("projects", "approval_days_total"), approval_days({**previous, **update_data})))
+        await record(db, *changes)
 
     return {
         "message": f"Project {action_data.action}ed successfully",
@@ -525,31 +565,19 @@ async def update_posting_status(
         )
 
     # Update posting status
-    await db.projects.update_one(
+    previous = await db.projects.find_one_and_update(
         {"_id": obj_id},
         {
             "$set": {
                 "posted": posting_data.posted,
                 "updated_at": datetime.utcnow()
             }
-        }
+        },
+        projection={"posted": 1},
+        return_document=ReturnDocument.BEFORE
     )
+    if previous and bool(previous.get("posted")) != posting_data.posted:
+        await record(db, (counter("projects", "posted"), 1 if posting_data.posted else -1))
 
     # Get updated project
-    updated_project = await db.projects.find_one({"_id": obj_id})
-    marketer = await db.users.find_one({"_id": updated_project["digital_marketer_id"]})
-
-    return ProjectResponse(
-        id=str(updated_project["_id"]),
-        project_name=updated_project["project_name"],
-        digital_marketer_id=str(updated_project["digital_marketer_id"]),
-        digital_marketer_name=marketer["name"] if marketer else "Unknown",
-        content_description=updated_project["content_description"],
-        expected_completion_date=updated_project["expected_completion_date"],
-        actual_completion_date=updated_project.get("actual_completion_date"),
-        current_stage=updated_project["current_stage"],
-        design_type=updated_project.get("design_type"),
-        posted=updated_project.get("posted", False),
-        created_at=updated_project["created_at"],
-        updated_at=updated_project["updated_at"]
-    )
+    return await find_project_response(db, obj_id)
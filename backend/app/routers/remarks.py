@@ -2,13 +2,17 @@
 Remarks and feedback routes.
 """
 from datetime import datetime
-from typing import List
-from fastapi import APIRouter, HTTPException, status, Depends
+from typing import List, Optional, Union
+from fastapi import APIRouter, HTTPException, Query, status, Depends
 from bson import ObjectId
+from app.config import settings
 from app.models.user import UserResponse
+from app.models.pagination import Page
 from app.models.remark import RemarkCreate, RemarkResponse
 from app.auth.dependencies import get_current_user
 from app.database import get_database
+from app.utils.pagination import encode_cursor, keyset_query, keyset_sort
+from app.utils.serialization import build_model, list_response
 
 router = APIRouter(prefix="/remarks", tags=["Remarks"])
 
@@ -80,20 +84,26 @@ async def add_remark(
     )
 
 
-@router.get("/project/{project_id}", response_model=List[RemarkResponse])
+@router.get("/project/{project_id}", response_model=Union[Page[RemarkResponse], List[RemarkResponse]])
 async def get_project_remarks(
     project_id: str,
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    unpaged: bool = False,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """
-    Get all remarks for a project.
+    Get remarks for a project, oldest first.
 
     Args:
         project_id: Project ID
+        limit: Page size
+        cursor: next_cursor from the previous page
+        unpaged: Return a plain list of up to 1000 remarks (legacy behavior)
         current_user: Current authenticated user
 
     Returns:
-        List of remarks
+        Page of remarks, or a list when unpaged is set
     """
     db = get_database()
 
@@ -105,17 +115,29 @@ async def get_project_remarks(
             detail="Invalid project ID"
         )
 
-    # Get all remarks for this project
-    remarks = await db.remarks.find(
-        {"project_id": obj_id}
-    ).sort("created_at", 1).to_list(length=1000)
+    next_cursor = None
+    if unpaged:
+        # Get all remarks for this project
+        remarks = await db.remarks.find(
+            {"project_id": obj_id}
+        ).sort("created_at", 1).to_list(length=1000)
+    else:
+        # Fetch one extra remark to know whether another page exists
+        remarks = await db.remarks.find(
+            keyset_query({"project_id": obj_id}, cursor, descending=False)
+        ).sort(keyset_sort(descending=False)).limit(limit + 1).to_list(length=limit + 1)
+
+        if len(remarks) > limit:
+            remarks = remarks[:limit]
+            next_cursor = encode_cursor(remarks[-1]["created_at"], remarks[-1]["_id"])
 
     # Populate user details
     result = []
     for remark in remarks:
         user = await db.users.find_one({"_id": remark["user_id"]})
         result.append(
-            RemarkResponse(
+            build_model(
+                RemarkResponse,
                 id=str(remark["_id"]),
                 project_id=str(remark["project_id"]),
                 user_id=str(remark["user_id"]),
@@ -128,4 +150,6 @@ async def get_project_remarks(
             )
         )
 
-    return result
+    if unpaged:
+        return list_response(result)
+    return list_response(build_model(Page[RemarkResponse], items=result, next_cursor=next_cursor))
@@ -1,99 +1,155 @@
-from fastapi import APIRouter, HTTPException, Depends, status, File, UploadFile
-from typing import List, Optional
-from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query, status, File, UploadFile
+from typing import List, Optional, Union
+from datetime import datetime, timezone
 from bson import ObjectId
-from ..models.task import TaskCreate, TaskUpdate, TaskResponse
+from pymongo import ReturnDocument
+from ..models.task import Checkpoint, TaskCreate, TaskUpdate, TaskResponse, TaskStatus, TaskPriority
+from ..config import settings
 from ..database import get_database
 from ..auth.dependencies import get_current_user
 from ..models.user import UserResponse
-from ..utils.gridfs_handler import upload_file_to_gridfs
+from ..models.pagination import Page
+from ..utils.blobs import release_blob, store_upload
+from ..utils.thumbnails import schedule_derivatives
+from ..utils.resolvers import BatchResolver
+from ..utils.pagination import encode_cursor, keyset_query, keyset_sort
+from ..utils.task_filters import build_task_query
+from ..utils.serialization import build_model, list_response
+from ..utils.stats import counter, record, transition
+from ..utils.time_tracking import record_time_entry
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
-@router.get("/", response_model=List[TaskResponse])
-async def get_tasks(
-    current_user: UserResponse = Depends(get_current_user),
-    db=Depends(get_database)
-):
-    """Get all tasks (filtered by role)"""
-    tasks_collection = db.tasks
-    
-    # Admin and Manager can see all tasks
-    if current_user.role in ["Admin", "Manager"]:
-        tasks = await tasks_collection.find().to_list(length=None)
-    else:
-        # Others see tasks where they are assigned or tasks they created
-        tasks = await tasks_collection.find({
-            "$or": [
-                {"assigned_to": {"$in": [current_user.id]}},
-                {"created_by": current_user.id}
-            ]
-        }).to_list(length=None)
-    
-    # Populate user and project names
-    result = []
+def _assigned_list(task: dict) -> List[str]:
+    """Get a task's assignees, handling legacy single assignment"""
+    assigned_to_list = task.get("assigned_to", [])
+    if isinstance(assigned_to_list, str):
+        assigned_to_list = [assigned_to_list]
+    return assigned_to_list
+
+
+def _timer_start(task: dict) -> Optional[datetime]:
+    """Get a task's timer start in UTC, converting legacy server local values"""
+    start_time = task.get("start_time")
+    if start_time is None or task.get("start_time_utc"):
+        return start_time
+    # Naive datetimes are taken as local time by astimezone
+    return start_time.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Mark a stored naive UTC datetime as UTC so it is sent with an offset"""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+async def _build_task_responses(tasks: List[dict], db) -> List[TaskResponse]:
+    """Build TaskResponses, resolving user and project names with one query per collection"""
+    users = BatchResolver(db.users, ["name"])
+    projects = BatchResolver(db.projects, ["project_name"])
     for task in tasks:
-        # Get assigned users' names
-        assigned_to_list = task.get("assigned_to", [])
-        if isinstance(assigned_to_list, str):
-            # Handle legacy single assignment
-            assigned_to_list = [assigned_to_list]
-        
-        assigned_names = []
-        for user_id in assigned_to_list:
-            try:
-                assigned_user = await db.users.find_one({"_id": ObjectId(user_id)})
-                if assigned_user:
-                    assigned_names.append(assigned_user["name"])
-                else:
-                    assigned_names.append("Unknown")
-            except:
-                assigned_names.append("Unknown")
-        
-        # Get creator name
-        try:
-            created_user = await db.users.find_one({"_id": ObjectId(task["created_by"])})
-            created_name = created_user["name"] if created_user else "Unknown"
-        except:
-            created_name = "Unknown"
-        
-        # Get project name if linked
-        project_name = None
-        if task.get("project_id"):
-            try:
-                project = await db.projects.find_one({"_id": ObjectId(task["project_id"])})
-                project_name = project["project_name"] if project else None
-            except:
-                project_name = None
-        
-        result.append(TaskResponse(
+        users.add(*_assigned_list(task), task.get("created_by"))
+        projects.add(task.get("project_id"))
+
+    await users.load()
+    await projects.load()
+
+    return [
+        build_model(
+            TaskResponse,
             id=str(task["_id"]),
             title=task["title"],
             description=task.get("description"),
-            assigned_to=assigned_to_list,
-            assigned_to_names=assigned_names,
+            assigned_to=_assigned_list(task),
+            assigned_to_names=[users.value(uid, "name", "Unknown") for uid in _assigned_list(task)],
             project_id=task.get("project_id"),
-            project_name=project_name,
-            due_date=task["due_date"],
+            project_name=projects.value(task.get("project_id"), "project_name"),
+            due_date=_as_utc(task["due_date"]),
             priority=task["priority"],
             status=task.get("status", "pending"),
             created_by=task["created_by"],
-            created_by_name=created_name,
-            created_at=task["created_at"],
-            updated_at=task.get("updated_at"),
+            created_by_name=users.value(task["created_by"], "name", "Unknown"),
+            created_at=_as_utc(task["created_at"]),
+            updated_at=_as_utc(task.get("updated_at")),
+            completed_at=_as_utc(task.get("completed_at")),
             design_type=task.get("design_type"),
-            checkpoints=task.get("checkpoints", []),
+            checkpoints=[build_model(Checkpoint, **cp) for cp in task.get("checkpoints", [])],
             allocated_hours=task.get("allocated_hours"),
-            start_time=task.get("start_time"),
+            start_time=_as_utc(_timer_start(task)),
             time_spent_ms=task.get("time_spent_ms", 0),
             is_timer_running=task.get("is_timer_running", False),
             file_id=task.get("file_id"),
             filename=task.get("filename"),
-            uploaded_at=task.get("uploaded_at")
-        ))
+            uploaded_at=_as_utc(task.get("uploaded_at"))
+        )
+        for task in tasks
+    ]
+
+
+async def _find_missing_user(user_ids: List[str], db) -> Optional[str]:
+    """Return the first user ID that does not exist, checked with a single query"""
+    users = BatchResolver(db.users, ["_id"])
+    users.add(*user_ids)
+    await users.load()
+    for user_id in user_ids:
+        if users.get(user_id) is None:
+            return user_id
+    return None
+
+
+@router.get("/", response_model=Union[Page[TaskResponse], List[TaskResponse]])
+async def get_tasks(
+    task_status: Optional[TaskStatus] = Query(None, alias="status"),
+    priority: Optional[TaskPriority] = None,
+    project_id: Optional[str] = None,
+    assignee: Optional[str] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    unpaged: bool = False,
+    current_user: UserResponse = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """Get tasks (filtered by role), newest first, one page at a time.
+    Optional filters: status, priority, project_id, assignee and a [due_from, due_to) range.
+    Pass unpaged=true for the legacy unbounded list.
+    """
+    tasks_collection = db.tasks
     
-    return result
+    # Admin and Manager can see all tasks; others only assigned or created ones
+    query = build_task_query(
+        current_user,
+        task_status=task_status,
+        priority=priority,
+        project_id=project_id,
+        assignee=assignee,
+        due_from=due_from,
+        due_to=due_to
+    )
+    
+    if unpaged:
+        tasks = await tasks_collection.find(query).to_list(length=None)
+        # Populate user and project names
+        return list_response(await _build_task_responses(tasks, db))
+    
+    # Fetch one extra task to know whether another page exists
+    tasks = await tasks_collection.find(
+        keyset_query(query, cursor)
+    ).sort(keyset_sort()).limit(limit + 1).to_list(length=limit + 1)
+    
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        next_cursor = encode_cursor(tasks[-1].get("created_at"), tasks[-1]["_id"])
+    
+    return list_response(build_model(
+        Page[TaskResponse],
+        items=await _build_task_responses(tasks, db),
+        next_cursor=next_cursor
+    ))
 
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
@@ -123,9 +179,13 @@ async def create_task(
             detail="At least one user must be assigned to the task"
         )
     
+    users = BatchResolver(db.users, ["name"])
+    users.add(*task_data.assigned_to)
+    await users.load()
+    
     assigned_names = []
     for user_id in task_data.assigned_to:
-        assigned_user = await db.users.find_one({"_id": ObjectId(user_id)})
+        assigned_user = users.get(user_id)
         if not assigned_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -154,8 +214,9 @@ async def create_task(
         "priority": task_data.priority,
         "status": "pending",
         "created_by": current_user.id,
-        "created_at": datetime.now(),
+        "created_at": datetime.utcnow(),
         "updated_at": None,
+        "completed_at": None,
         "design_type": task_data.design_type,
         "checkpoints": [cp.dict() for cp in task_data.checkpoints] if task_data.checkpoints else [],
         "allocated_hours": task_data.allocated_hours,
@@ -169,6 +230,7 @@ async def create_task(
     
     result = await tasks_collection.insert_one(task_dict)
     task_dict["_id"] = result.inserted_id
+    await record(db, (counter("tasks", "total"), 1), (counter("tasks", "by_status", "pending"), 1))
     
     return TaskResponse(
         id=str(task_dict["_id"]),
@@ -185,6 +247,7 @@ async def create_task(
         created_by_name=current_user.name,
         created_at=task_dict["created_at"],
         updated_at=task_dict["updated_at"],
+        completed_at=task_dict["completed_at"],
         design_type=task_dict["design_type"],
         checkpoints=task_dict.get("checkpoints", []),
         allocated_hours=task_dict["allocated_hours"],
@@ -228,20 +291,19 @@ async def update_task(
             )
     
     # Build update data
-    update_data = {"updated_at": datetime.now()}
+    update_data = {"updated_at": datetime.utcnow()}
     if task_data.title:
         update_data["title"] = task_data.title
     if task_data.description is not None:
         update_data["description"] = task_data.description
     if task_data.assigned_to:
         # Verify all users exist
-        for user_id in task_data.assigned_to:
-            user = await db.users.find_one({"_id": ObjectId(user_id)})
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"User with ID {user_id} not found"
-                )
+        missing_user_id = await _find_missing_user(task_data.assigned_to, db)
+        if missing_user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User with ID {missing_user_id} not found"
+            )
         update_data["assigned_to"] = task_data.assigned_to
     if task_data.due_date:
         update_data["due_date"] = task_data.due_date
@@ -249,10 +311,16 @@ async def update_task(
         update_data["priority"] = task_data.priority
     if task_data.status:
         update_data["status"] = task_data.status
+        # Completion time feeds the tasks-completed timeline
+        if task_data.status == "completed" and task.get("status") != "completed":
+            update_data["completed_at"] = update_data["updated_at"]
+        elif task_data.status != "completed":
+            update_data["completed_at"] = None
     if task_data.allocated_hours is not None:
         update_data["allocated_hours"] = task_data.allocated_hours
     if task_data.start_time:
         update_data["start_time"] = task_data.start_time
+        update_data["start_time_utc"] = True
     if task_data.time_spent_ms is not None:
         update_data["time_spent_ms"] = task_data.time_spent_ms
     if task_data.is_timer_running is not None:
@@ -262,59 +330,22 @@ async def update_task(
     if task_data.checkpoints is not None:
         update_data["checkpoints"] = [cp.dict() for cp in task_data.checkpoints]
     
-    # Update task
-    result = await tasks_collection.find_one_and_update(
+    # Update task, reading the previous status atomically for the rollup counters
+    previous = await tasks_collection.find_one_and_update(
         {"_id": ObjectId(task_id)},
         {"$set": update_data},
-        return_document=True
+        return_document=ReturnDocument.BEFORE
     )
+    if not previous:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    new_status = update_data.get("status", previous.get("status"))
+    await record(db, *transition("tasks", "by_status", previous.get("status"), new_status))
+    result = {**previous, **update_data}
     
-    # Get assigned users' names
-    assigned_to_list = result.get("assigned_to", [])
-    if isinstance(assigned_to_list, str):
-        assigned_to_list = [assigned_to_list]
-    
-    assigned_names = []
-    for user_id in assigned_to_list:
-        try:
-            user = await db.users.find_one({"_id": ObjectId(user_id)})
-            assigned_names.append(user["name"] if user else "Unknown")
-        except:
-            assigned_names.append("Unknown")
-    
-    # Get creator name
-    created_user = await db.users.find_one({"_id": ObjectId(result["created_by"])})
-    
-    # Get project name if linked
-    project_name = None
-    if result.get("project_id"):
-        try:
-            project = await db.projects.find_one({"_id": ObjectId(result["project_id"])})
-            project_name = project["project_name"] if project else None
-        except:
-            project_name = None
-    
-    return TaskResponse(
-        id=str(result["_id"]),
-        title=result["title"],
-        description=result.get("description"),
-        assigned_to=assigned_to_list,
-        assigned_to_names=assigned_names,
-        project_id=result.get("project_id"),
-        project_name=project_name,
-        due_date=result["due_date"],
-        priority=result["priority"],
-        status=result["status"],
-        created_by=result["created_by"],
-        created_by_name=created_user["name"] if created_user else "Unknown",
-        created_at=result["created_at"],
-        updated_at=result.get("updated_at"),
-        allocated_hours=result.get("allocated_hours"),
-        start_time=result.get("start_time"),
-        file_id=result.get("file_id"),
-        filename=result.get("filename"),
-        uploaded_at=result.get("uploaded_at")
-    )
+    return (await _build_task_responses([result], db))[0]
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -331,20 +362,31 @@ async def delete_task(
         )
     
     tasks_collection = db.tasks
-    result = await tasks_collection.delete_one({"_id": ObjectId(task_id)})
+    deleted = await tasks_collection.find_one_and_delete(
+        {"_id": ObjectId(task_id)},
+        projection={"status": 1, "file_id": 1}
+    )
     
-    if result.deleted_count == 0:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
+    await record(
+        db,
+        (counter("tasks", "total"), -1),
+        *transition("tasks", "by_status", deleted.get("status"), None)
+    )
+    await release_blob(db, deleted.get("file_id"))
+    
     return None
 
 
 @router.post("/{task_id}/upload", response_model=TaskResponse)
 async def upload_task_file(
     task_id: str,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: UserResponse = Depends(get_current_user),
     db=Depends(get_database)
@@ -372,78 +414,35 @@ async def upload_task_file(
                 detail="You can only upload files for tasks you are assigned to or created"
             )
     
-    # Upload file to GridFS
-    file_data = await file.read()
-    file_id = await upload_file_to_gridfs(
-        file_data,
-        file.filename,
-        file.content_type or "application/octet-stream"
-    )
+    # Store file in GridFS, reusing an identical earlier upload
+    stored = await store_upload(db, file)
     
     # Update task with file info
     update_data = {
-        "file_id": str(file_id),
-        "filename": file.filename,
-        "uploaded_at": datetime.now(),
-        "updated_at": datetime.now()
+        "file_id": str(stored["file_id"]),
+        "filename": stored["filename"],
+        "file_size": stored["file_size"],
+        "file_sha256": stored["sha256"],
+        "uploaded_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
     }
     
-    result = await tasks_collection.find_one_and_update(
+    # Previous state tells us which file this upload replaces
+    previous = await tasks_collection.find_one_and_update(
         {"_id": ObjectId(task_id)},
         {"$set": update_data},
-        return_document=True
+        return_document=ReturnDocument.BEFORE
     )
-   
-    # Get assigned users' names
-    assigned_to_list = result.get("assigned_to", [])
-    if isinstance(assigned_to_list, str):
-        assigned_to_list = [assigned_to_list]
-    
-    assigned_names = []
-    for user_id in assigned_to_list:
-        try:
-            user = await db.users.find_one({"_id": ObjectId(user_id)})
-            assigned_names.append(user["name"] if user else "Unknown")
-        except:
-            assigned_names.append("Unknown")
-    
-    # Get creator name
-    created_user = await db.users.find_one({"_id": ObjectId(result["created_by"])})
-    
-    # Get project name if linked
-    project_name = None
-    if result.get("project_id"):
-        try:
-            project = await db.projects.find_one({"_id": ObjectId(result["project_id"])})
-            project_name = project["project_name"] if project else None
-        except:
-            project_name = None
+    if not previous:
+        await release_blob(db, stored["file_id"])
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    await release_blob(db, previous.get("file_id"))
+    schedule_derivatives(background_tasks, db, stored["file_id"], stored["content_type"])
     
-    return TaskResponse(
-        id=str(result["_id"]),
-        title=result["title"],
-        description=result.get("description"),
-        assigned_to=assigned_to_list,
-        assigned_to_names=assigned_names,
-        project_id=result.get("project_id"),
-        project_name=project_name,
-        due_date=result["due_date"],
-        priority=result["priority"],
-        status=result["status"],
-        created_by=result["created_by"],
-        created_by_name=created_user["name"] if created_user else "Unknown",
-        created_at=result["created_at"],
-        updated_at=result.get("updated_at"),
-        design_type=result.get("design_type"),
-        checkpoints=result.get("checkpoints", []),
-        allocated_hours=result.get("allocated_hours"),
-        start_time=result.get("start_time"),
-        time_spent_ms=result.get("time_spent_ms", 0),
-        is_timer_running=result.get("is_timer_running", False),
-        file_id=result.get("file_id"),
-        filename=result.get("filename"),
-        uploaded_at=result.get("uploaded_at")
-    )
+    return (await _build_task_responses([{**previous, **update_data}], db))[0]
 
 
 @router.post("/{task_id}/timer", response_model=TaskResponse)
@@ -461,7 +460,7 @@ async def toggle_task_timer(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
         
-    now = datetime.now()
+    now = datetime.utcnow()
     
     # Check permissions: Admin/Manager can update any, others only their own or assigned
     assigned_to_list = task.get("assigned_to", [])
@@ -492,51 +491,61 @@ async def toggle_task_timer(
                 continue
             
             # Calculate elapsed and pause it
-            last_start = rt.get("start_time")
+            last_start = _timer_start(rt)
             if last_start:
                 session_duration = int((now - last_start).total_seconds() * 1000)
                 new_total = rt.get("time_spent_ms", 0) + session_duration
-                await tasks_collection.update_one(
-                    {"_id": rt["_id"]},
+                paused = await tasks_collection.update_one(
+                    {"_id": rt["_id"], "is_timer_running": True},
                     {"$set": {
                         "is_timer_running": False,
                         "time_spent_ms": new_total,
                         "updated_at": now
                     }}
                 )
+                if paused.modified_count:
+                    await record_time_entry(db, rt, rt.get("timer_started_by", current_user.id), last_start, now)
         
         # 2. Start this task's timer
-        update_result = await tasks_collection.find_one_and_update(
+        previous = await tasks_collection.find_one_and_update(
             {"_id": ObjectId(task_id)},
             {"$set": {
                 "is_timer_running": True,
                 "start_time": now,
+                "start_time_utc": True,
+                "timer_started_by": current_user.id,
                 "status": "in_progress",
+                "completed_at": None,
                 "updated_at": now
             }},
-            return_document=True
+            projection={"status": 1},
+            return_document=ReturnDocument.BEFORE
         )
+        if previous:
+            await record(db, *transition("tasks", "by_status", previous.get("status"), "in_progress"))
         
     elif action == "pause":
         if not task.get("is_timer_running"):
             return await get_task_response(task_id, db)
             
-        last_start = task.get("start_time")
+        last_start = _timer_start(task)
         session_duration = 0
         if last_start:
             session_duration = int((now - last_start).total_seconds() * 1000)
             
         new_total = task.get("time_spent_ms", 0) + session_duration
         
-        update_result = await tasks_collection.find_one_and_update(
-            {"_id": ObjectId(task_id)},
+        # Only the request that actually stops the timer records the session
+        paused = await tasks_collection.update_one(
+            {"_id": ObjectId(task_id), "is_timer_running": True},
             {"$set": {
                 "is_timer_running": False,
                 "time_spent_ms": new_total,
                 "updated_at": now
-            }},
-            return_document=True
+            }}
         )
+        if paused.modified_count:
+            await record_time_entry(db, task, task.get("timer_started_by", current_user.id), last_start, now)
     else:
         raise HTTPException(status_code=400, detail="Invalid action. Use 'start' or 'pause'")
 
@@ -545,45 +554,4 @@ async def toggle_task_timer(
 async def get_task_response(task_id: str, db):
     """Helper to get a full TaskResponse for a task ID"""
     task = await db.tasks.find_one({"_id": ObjectId(task_id)})
-    
-    # Refresh assigned names
-    assigned_to_list = task.get("assigned_to", [])
-    if isinstance(assigned_to_list, str): assigned_to_list = [assigned_to_list]
-    
-    assigned_names = []
-    for uid in assigned_to_list:
-        u = await db.users.find_one({"_id": ObjectId(uid)})
-        assigned_names.append(u["name"] if u else "Unknown")
-        
-    created_user = await db.users.find_one({"_id": ObjectId(task["created_by"])})
-    
-    project_name = None
-    if task.get("project_id"):
-        p = await db.projects.find_one({"_id": ObjectId(task["project_id"])})
-        project_name = p["project_name"] if p else None
-        
-    return TaskResponse(
-        id=str(task["_id"]),
-        title=task["title"],
-        description=task.get("description"),
-        assigned_to=assigned_to_list,
-        assigned_to_names=assigned_names,
-        project_id=task.get("project_id"),
-        project_name=project_name,
-        due_date=task["due_date"],
-        priority=task["priority"],
-        status=task.get("status", "pending"),
-        created_by=task["created_by"],
-        created_by_name=created_user["name"] if created_user else "Unknown",
-        created_at=task["created_at"],
-        updated_at=task.get("updated_at"),
-        design_type=task.get("design_type"),
-        checkpoints=task.get("checkpoints", []),
-        allocated_hours=task.get("allocated_hours"),
-        start_time=task.get("start_time"),
-        time_spent_ms=task.get("time_spent_ms", 0),
-        is_timer_running=task.get("is_timer_running", False),
-        file_id=task.get("file_id"),
-        filename=task.get("filename"),
-        uploaded_at=task.get("uploaded_at")
-    )
+    return (await _build_task_responses([task], db))[0]
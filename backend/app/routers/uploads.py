@@ -1,117 +1,330 @@
 """
-File upload and download routes using GridFS.
+File download, preview and version history routes.
 """
+import os
 from datetime import datetime
-from typing import List
-from fastapi import APIRouter, File, UploadFile, HTTPException, status, Depends
-from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, File, UploadFile, HTTPException, Request, status, Depends
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from bson import ObjectId
+from app.config import settings
 from app.models.user import UserResponse
 from app.models.upload import UploadResponse
 from app.auth.dependencies import get_current_user
 from app.database import get_database
-from app.utils.gridfs_handler import (
-    upload_file_to_gridfs,
-    download_file_from_gridfs,
-    get_file_metadata
+from app.utils.serialization import build_model, list_response
+from app.storage.base import StoredFile
+from app.utils.file_storage import open_stored_file, stored_file_exists
+from app.utils.http_files import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    content_disposition,
+    file_etag,
+    file_last_modified,
+    http_date,
+    if_range_matches,
+    is_not_modified,
+    not_modified_response,
+    parse_range
 )
-import io
+from app.utils.thumbnails import find_derivative, schedule_derivatives
 
 router = APIRouter(prefix="/uploads", tags=["Uploads"])
 
 
-@router.get("/{file_id}")
-async def download_file(
-    file_id: str,
-    current_user: UserResponse = Depends(get_current_user)
-):
+def _file_object_id(file_id: str) -> ObjectId:
     """
-    Download a file from GridFS.
-
-    Args:
-        file_id: File ID in GridFS
-        current_user: Current authenticated user
-
-    Returns:
-        File stream
+    Parse a file ID.
 
     Raises:
-        HTTPException: If file not found
+        HTTPException: If the ID is invalid
     """
     try:
-        obj_id = ObjectId(file_id)
+        return ObjectId(file_id)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid file ID"
         )
 
-    # Get file metadata
-    metadata = await get_file_metadata(obj_id)
-    if not metadata:
+
+async def _open_file(file_id: str) -> StoredFile:
+    """
+    Open a stored file for streaming.
+
+    Args:
+        file_id: File ID
+
+    Returns:
+        Open file
+
+    Raises:
+        HTTPException: If the ID is invalid or the file does not exist
+    """
+    stored = await open_stored_file(_file_object_id(file_id))
+    if stored is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found"
         )
 
-    # Download file
-    file_data = await download_file_from_gridfs(obj_id)
+    return stored
 
-    # Return as streaming response with download
+
+async def _reference_filename(
+    db,
+    file_id: ObjectId,
+    upload_id: Optional[str],
+    task_id: Optional[str]
+) -> Optional[str]:
+    """
+    Get the name a stored file was uploaded under by the record referencing it.
+
+    Identical uploads share one stored file, whose own name is that of the
+    first upload (possibly in another project), so it is never shown. The
+    name comes from the given upload version or task, or else from the
+    references if they all use the same name.
+
+    Args:
+        db: Database instance
+        file_id: Stored file ObjectId
+        upload_id: Optional ID of the upload version referencing the file
+        task_id: Optional ID of the task referencing the file
+
+    Returns:
+        Filename, or None if unknown or ambiguous
+    """
+    if upload_id and ObjectId.is_valid(upload_id):
+        upload = await db.uploads.find_one({"_id": ObjectId(upload_id), "file_id": file_id}, {"filename": 1})
+        if upload:
+            return upload["filename"]
+    if task_id and ObjectId.is_valid(task_id):
+        task = await db.tasks.find_one({"_id": ObjectId(task_id), "file_id": str(file_id)}, {"filename": 1})
+        if task:
+            return task["filename"]
+
+    names = set(await db.uploads.distinct("filename", {"file_id": file_id}))
+    names.update(await db.tasks.distinct("filename", {"file_id": str(file_id)}))
+    names.discard(None)
+    return names.pop() if len(names) == 1 else None
+
+
+def _anonymous_filename(stored: StoredFile) -> str:
+    """Name a file by its ID, keeping only the extension of its stored name."""
+    return f"{stored.file_id}{os.path.splitext(stored.filename or '')[1]}"
+
+
+async def _not_modified(file_id, request: Request, cache_control: str) -> Optional[Response]:
+    """
+    Answer a conditional request from the file ID alone.
+
+    The validators depend only on the ID, so a client's cached copy is
+    confirmed from the file's metadata without opening it. A file that no
+    longer exists is never confirmed, so the caller answers 404.
+
+    Args:
+        file_id: File ObjectId
+        request: Incoming request (If-None-Match and If-Modified-Since headers)
+        cache_control: Cache-Control header value
+
+    Returns:
+        304 response, or None if the file must be sent
+    """
+    etag = file_etag(file_id)
+    last_modified = file_last_modified(file_id)
+    if is_not_modified(
+        request.headers.get("if-none-match"),
+        request.headers.get("if-modified-since"),
+        etag,
+        last_modified
+    ) and await stored_file_exists(file_id):
+        return not_modified_response(etag, http_date(last_modified), cache_control)
+    return None
+
+
+def _file_response(
+    stored: StoredFile,
+    disposition: str,
+    request: Request,
+    filename: str,
+    cache_control: str = IMMUTABLE_CACHE_CONTROL
+) -> Response:
+    """
+    Send an open stored file, or the single byte range requested.
+
+    Whole files on local storage are sent with sendfile; everything else
+    is streamed in bounded chunks.
+
+    Args:
+        stored: Open file
+        disposition: "attachment" or "inline"
+        request: Incoming request (Range and If-Range headers)
+        filename: Name for the Content-Disposition header
+        cache_control: Cache-Control header value
+
+    Returns:
+        200 response with the whole file, or 206 with the requested range
+
+    Raises:
+        HTTPException: 416 if the range cannot be served
+    """
+    length = stored.length
+    etag = file_etag(stored.file_id)
+    last_modified = http_date(file_last_modified(stored.file_id))
+    headers = {
+        "Content-Disposition": content_disposition(disposition, filename),
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": cache_control
+    }
+
+    byte_range = None
+    # A stale If-Range means the client's partial copy is outdated: send everything
+    if if_range_matches(request.headers.get("if-range"), etag, last_modified):
+        byte_range = parse_range(request.headers.get("range"), length)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(length)
+        if stored.path:
+            return FileResponse(stored.path, media_type=stored.content_type, headers=headers)
+        return StreamingResponse(
+            stored.iter_range(),
+            media_type=stored.content_type,
+            headers=headers
+        )
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+    headers["Content-Length"] = str(end - start + 1)
     return StreamingResponse(
-        io.BytesIO(file_data),
-        media_type=metadata["content_type"],
-        headers={
-            "Content-Disposition": f'attachment; filename="{metadata["filename"]}"'
-        }
+        stored.iter_range(start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=stored.content_type,
+        headers=headers
     )
 
 
+@router.get("/{file_id}")
+async def download_file(
+    file_id: str,
+    request: Request,
+    upload_id: Optional[str] = None,
+    task_id: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Download a stored file.
+
+    The file is streamed in bounded chunks (or sent with sendfile from
+    local storage) rather than read into memory first. A single Range is
+    honored with 206 Partial Content. Files never change, so responses are
+    cached as immutable and revalidation gets 304 without reading the file.
+
+    The download is named after the upload version or task it belongs to
+    (pass upload_id or task_id when several reference the same file).
+
+    Args:
+        file_id: File ID
+        request: Incoming request
+        upload_id: Optional upload version the file is downloaded from
+        task_id: Optional task the file is downloaded from
+        current_user: Current authenticated user
+
+    Returns:
+        File stream, or 304 if the client's copy is current
+
+    Raises:
+        HTTPException: If file not found
+    """
+    not_modified = await _not_modified(_file_object_id(file_id), request, IMMUTABLE_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+
+    stored = await _open_file(file_id)
+    filename = await _reference_filename(get_database(), stored.file_id, upload_id, task_id)
+
+    # Return as streaming response with download
+    return _file_response(stored, "attachment", request, filename or _anonymous_filename(stored))
+
+
 @router.get("/preview/{file_id}")
 async def preview_file(
     file_id: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    size: Optional[str] = None,
+    upload_id: Optional[str] = None,
+    task_id: Optional[str] = None,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """
     Preview a file in browser (inline).
 
+    Supports Range requests so browsers can seek in videos and large PDFs.
+    With a size, a downscaled image or first-page render is served once it
+    has been generated; until then the original is, marked for
+    revalidation so the preview replaces it once ready.
+
     Args:
-        file_id: File ID in GridFS
+        file_id: File ID
+        request: Incoming request
+        background_tasks: Preview generation queue
+        size: Optional preview size name (see THUMBNAIL_SIZES)
+        upload_id: Optional upload version the file is previewed from
+        task_id: Optional task the file is previewed from
         current_user: Current authenticated user
 
     Returns:
-        File stream for preview
+        File stream for preview, or 304 if the client's copy is current
 
     Raises:
-        HTTPException: If file not found
+        HTTPException: If file not found or the size is unknown
     """
-    try:
-        obj_id = ObjectId(file_id)
-    except Exception:
+    if size is not None and size not in settings.thumbnail_sizes:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file ID"
+            detail=f"Unknown preview size. Available sizes: {', '.join(settings.thumbnail_sizes)}"
         )
 
-    # Get file metadata
-    metadata = await get_file_metadata(obj_id)
-    if not metadata:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found"
-        )
+    db = get_database()
+    object_id = _file_object_id(file_id)
+    cache_control = IMMUTABLE_CACHE_CONTROL
+    stored = None
+    if size:
+        derivative = await find_derivative(db, object_id, size)
+        if derivative and derivative["status"] == "ready":
+            not_modified = await _not_modified(derivative["file_id"], request, IMMUTABLE_CACHE_CONTROL)
+            if not_modified is not None:
+                return not_modified
+            preview = await open_stored_file(derivative["file_id"])
+            if preview is not None:
+                filename = await _reference_filename(db, object_id, upload_id, task_id)
+                extension = os.path.splitext(preview.filename or "")[1]
+                return _file_response(
+                    preview,
+                    "inline",
+                    request,
+                    f"{filename}.{size}{extension}" if filename else _anonymous_filename(preview)
+                )
+
+        # The original stands in for the preview at this URL until it is ready
+        cache_control = REVALIDATE_CACHE_CONTROL
+        if derivative is None:
+            # Files uploaded before previews existed get them on first request
+            stored = await _open_file(file_id)
+            schedule_derivatives(background_tasks, db, stored.file_id, stored.content_type)
+
+    not_modified = await _not_modified(object_id, request, cache_control)
+    if not_modified is not None:
+        return not_modified
 
-    # Download file
-    file_data = await download_file_from_gridfs(obj_id)
+    if stored is None:
+        stored = await _open_file(file_id)
+    filename = await _reference_filename(db, object_id, upload_id, task_id)
 
     # Return as streaming response with inline display
-    return StreamingResponse(
-        io.BytesIO(file_data),
-        media_type=metadata["content_type"],
-        headers={
-            "Content-Disposition": f'inline; filename="{metadata["filename"]}"'
-        }
-    )
+    return _file_response(stored, "inline", request, filename or _anonymous_filename(stored), cache_control)
 
 
 @router.get("/project/{project_id}/versions", response_model=List[UploadResponse])
@@ -149,7 +362,8 @@ async def get_project_versions(
     for upload in uploads:
         uploader = await db.users.find_one({"_id": upload["uploaded_by"]})
         result.append(
-            UploadResponse(
+            build_model(
+                UploadResponse,
                 id=str(upload["_id"]),
                 project_id=str(upload["project_id"]),
                 uploaded_by=str(upload["uploaded_by"]),
@@ -158,6 +372,7 @@ async def get_project_versions(
                 filename=upload["filename"],
                 content_type=upload["content_type"],
                 file_size=upload["file_size"],
+                sha256=upload.get("sha256"),
                 version=upload["version"],
                 upload_type=upload["upload_type"],
                 design_type=upload.get("design_type"),
@@ -166,4 +381,4 @@ async def get_project_versions(
             )
         )
 
-    return result
+    return list_response(result)
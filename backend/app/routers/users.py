@@ -1,27 +1,54 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from typing import List, Optional, Union
 from datetime import datetime
+from pymongo import ReturnDocument
+from ..config import settings
 from ..models.user import UserCreate, UserUpdate, UserResponse
+from ..models.pagination import Page
 from ..database import get_database
 from ..auth.dependencies import get_current_user
-from ..auth.password import hash_password
+from ..auth.password import hash_password_async
+from ..auth.principal_cache import principal_cache
+from ..auth.token_versions import token_versions
+from ..utils.pagination import encode_cursor, keyset_query, keyset_sort
+from ..utils.serialization import build_model, list_response
+from ..utils.stats import counter, record, transition
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-@router.get("/", response_model=List[UserResponse])
+@router.get("/", response_model=Union[Page[UserResponse], List[UserResponse]])
 async def get_all_users(
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    unpaged: bool = False,
     current_user: UserResponse = Depends(get_current_user),
     db=Depends(get_database)
 ):
-    """Get all users (Accessible to all authenticated users)"""
+    """Get users, newest first, one page at a time (Accessible to all authenticated users).
+    Pass unpaged=true for the legacy unbounded list.
+    """
     # Permission check removed to allow task assignment by any user
 
     
     users_collection = db.users
-    users = await users_collection.find().to_list(length=None)
     
-    return [
-        UserResponse(
+    if unpaged:
+        users = await users_collection.find().to_list(length=None)
+        next_cursor = None
+    else:
+        # Fetch one extra user to know whether another page exists
+        users = await users_collection.find(
+            keyset_query({}, cursor)
+        ).sort(keyset_sort()).limit(limit + 1).to_list(length=limit + 1)
+        
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor(users[-1].get("created_at"), users[-1]["_id"])
+    
+    items = [
+        build_model(
+            UserResponse,
             id=str(user["_id"]),
             name=user["name"],
             email=user["email"],
@@ -30,6 +57,10 @@ async def get_all_users(
         )
         for user in users
     ]
+    
+    if unpaged:
+        return list_response(items)
+    return list_response(build_model(Page[UserResponse], items=items, next_cursor=next_cursor))
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
@@ -58,14 +89,17 @@ async def create_user(
     user_dict = {
         "name": user_data.name,
         "email": user_data.email,
-        "password_hash": hash_password(user_data.password),
+        "password_hash": await hash_password_async(user_data.password),
         "role": user_data.role,
         "created_at": datetime.now(),
-        "is_active": True
+        "is_active": True,
+        "token_version": 0
     }
     
     result = await users_collection.insert_one(user_dict)
     user_dict["_id"] = result.inserted_id
+    token_versions.set(str(result.inserted_id), 0)
+    await record(db, (counter("users", "total"), 1), (counter("users", "by_role", user_dict["role"]), 1))
     
     return UserResponse(
         id=str(user_dict["_id"]),
@@ -109,7 +143,7 @@ async def update_user(
     if user_data.role:
         update_data["role"] = user_data.role
     if user_data.password:
-        update_data["password_hash"] = hash_password(user_data.password)
+        update_data["password_hash"] = await hash_password_async(user_data.password)
     
     if not update_data:
         raise HTTPException(
@@ -117,19 +151,28 @@ async def update_user(
             detail="No fields to update"
         )
     
-    # Update user
-    result = await users_collection.find_one_and_update(
+    # Update user and bump its token version so tokens with stale claims are revoked
+    previous = await users_collection.find_one_and_update(
         {"_id": ObjectId(user_id)},
-        {"$set": update_data},
-        return_document=True
+        {"$set": update_data, "$inc": {"token_version": 1}},
+        return_document=ReturnDocument.BEFORE
     )
     
-    if not result:
+    if not previous:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
+    result = {**previous, **update_data, "token_version": previous.get("token_version", 0) + 1}
+    await record(
+        db,
+        *transition("users", "by_role", previous.get("role", "Unknown"), result.get("role", "Unknown"))
+    )
+    
+    principal_cache.invalidate(user_id)
+    token_versions.set(user_id, result["token_version"])
+    
     return UserResponse(
         id=str(result["_id"]),
         name=result["name"],
@@ -161,12 +204,23 @@ async def delete_user(
         )
     
     users_collection = db.users
-    result = await users_collection.delete_one({"_id": ObjectId(user_id)})
+    deleted = await users_collection.find_one_and_delete(
+        {"_id": ObjectId(user_id)},
+        projection={"role": 1}
+    )
     
-    if result.deleted_count == 0:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
+    await record(
+        db,
+        (counter("users", "total"), -1),
+        *transition("users", "by_role", deleted.get("role", "Unknown"), None)
+    )
+    principal_cache.invalidate(user_id)
+    token_versions.remove(user_id)
+    
     return None
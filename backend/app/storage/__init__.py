@@ -0,0 +1 @@
+"""Blob storage backends for uploaded files."""
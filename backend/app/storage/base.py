@@ -0,0 +1,170 @@
+"""
+Storage backend interface.
+
+Files are identified by ObjectIds whichever backend holds them, so the
+IDs stored in ``uploads``, ``tasks``, ``blobs`` and ``derivatives`` (and
+used in download URLs) do not depend on where the bytes live.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from bson import ObjectId
+
+
+class StoredFile(ABC):
+    """An open stored file: its metadata plus ranged reads."""
+
+    def __init__(
+        self,
+        file_id: ObjectId,
+        filename: str,
+        content_type: Optional[str],
+        length: int,
+        upload_date: Optional[datetime],
+        sha256: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        path: Optional[str] = None
+    ):
+        """
+        Args:
+            file_id: File ObjectId
+            filename: Original filename
+            content_type: MIME content type
+            length: Size in bytes
+            upload_date: When the file was stored (UTC)
+            sha256: Hex SHA-256 of the contents, if recorded
+            metadata: Extra metadata stored with the file
+            path: Local filesystem path, for backends that can send it directly
+        """
+        self.file_id = file_id
+        self.filename = filename
+        self.content_type = content_type
+        self.length = length
+        self.upload_date = upload_date
+        self.sha256 = sha256
+        self.metadata = metadata or {}
+        self.path = path
+
+    @abstractmethod
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """
+        Read the file (or one byte range of it) in bounded chunks.
+
+        Args:
+            start: First byte to read
+            end: Last byte to read (inclusive), or None for the end of the file
+
+        Yields:
+            File chunks in order
+        """
+
+    async def read(self) -> bytes:
+        """
+        Read the whole file into memory (only for small files).
+
+        Returns:
+            File contents
+        """
+        return b"".join([chunk async for chunk in self.iter_range()])
+
+
+class FileWriter(ABC):
+    """A file being written to a backend."""
+
+    file_id: ObjectId
+
+    @abstractmethod
+    async def write(self, chunk: bytes) -> None:
+        """
+        Append data to the file.
+
+        Args:
+            chunk: Bytes to append
+        """
+
+    @abstractmethod
+    async def close(self, sha256: str) -> None:
+        """
+        Finish the file and make it readable.
+
+        Args:
+            sha256: Hex SHA-256 of everything written
+        """
+
+    @abstractmethod
+    async def abort(self) -> None:
+        """Discard everything written so far."""
+
+
+class StorageBackend(ABC):
+    """Where uploaded file bytes are kept."""
+
+    name: str
+
+    @abstractmethod
+    async def open(self, file_id: ObjectId) -> Optional[StoredFile]:
+        """
+        Open a file without reading its contents.
+
+        Args:
+            file_id: File ObjectId
+
+        Returns:
+            Open file, or None if it does not exist
+        """
+
+    @abstractmethod
+    async def exists(self, file_id: ObjectId) -> bool:
+        """
+        Check whether a file exists from its metadata alone.
+
+        Args:
+            file_id: File ObjectId
+
+        Returns:
+            True if the file exists
+        """
+
+    @abstractmethod
+    def open_writer(
+        self,
+        filename: str,
+        content_type: str,
+        metadata: Optional[dict] = None,
+        file_id: Optional[ObjectId] = None,
+        upload_date: Optional[datetime] = None
+    ) -> FileWriter:
+        """
+        Start writing a new file.
+
+        Args:
+            filename: Original filename
+            content_type: MIME content type
+            metadata: Extra metadata stored with the file
+            file_id: ID to store the file under (a new one by default)
+            upload_date: Original upload time when copying from another backend
+
+        Returns:
+            Writer for the file
+        """
+
+    @abstractmethod
+    async def delete(self, file_id: ObjectId) -> bool:
+        """
+        Delete a file.
+
+        Args:
+            file_id: File ObjectId
+
+        Returns:
+            True if the file existed and was deleted
+        """
+
+    @abstractmethod
+    def file_ids(self) -> AsyncIterator[ObjectId]:
+        """
+        List every stored file.
+
+        Yields:
+            File ObjectIds
+        """
@@ -0,0 +1,124 @@
+"""
+GridFS storage backend: file bytes in MongoDB chunks.
+"""
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from bson import ObjectId
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket, AsyncIOMotorGridIn, AsyncIOMotorGridOut
+from app.storage.base import FileWriter, StorageBackend, StoredFile
+
+
+class GridFSFile(StoredFile):
+    """A GridFS file opened as a download stream."""
+
+    def __init__(self, grid_out: AsyncIOMotorGridOut):
+        """
+        Args:
+            grid_out: Open download stream
+        """
+        metadata = grid_out.metadata or {}
+        super().__init__(
+            file_id=grid_out._id,
+            filename=grid_out.filename,
+            content_type=metadata.get("content_type"),
+            length=grid_out.length,
+            upload_date=grid_out.upload_date,
+            sha256=getattr(grid_out, "sha256", None),
+            metadata=metadata
+        )
+        self.grid_out = grid_out
+
+    async def iter_range(self, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """
+        Read the file one GridFS chunk at a time.
+
+        Only one chunk (``chunk_size`` bytes, 255 KB by default) is held in
+        memory at once. For a byte range the stream seeks straight to the
+        chunk holding ``start``; earlier chunks are never fetched.
+        """
+        remaining = (self.length if end is None else end + 1) - start
+        if start:
+            self.grid_out.seek(start)
+        while remaining > 0:
+            chunk = await self.grid_out.readchunk()
+            if not chunk:
+                break
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+            remaining -= len(chunk)
+            yield chunk
+
+
+class GridFSWriter(FileWriter):
+    """A GridFS upload stream."""
+
+    def __init__(self, grid_in: AsyncIOMotorGridIn):
+        """
+        Args:
+            grid_in: Open upload stream
+        """
+        self.grid_in = grid_in
+        self.file_id = grid_in._id
+
+    async def write(self, chunk: bytes) -> None:
+        await self.grid_in.write(chunk)
+
+    async def close(self, sha256: str) -> None:
+        # Recorded on the files document so the checksum travels with the file
+        await self.grid_in.set("sha256", sha256)
+        await self.grid_in.close()
+
+    async def abort(self) -> None:
+        await self.grid_in.abort()
+
+
+class GridFSStorage(StorageBackend):
+    """Store files in a GridFS bucket."""
+
+    name = "gridfs"
+
+    def __init__(self, bucket: AsyncIOMotorGridFSBucket, files_collection):
+        """
+        Args:
+            bucket: GridFS bucket
+            files_collection: The bucket's files collection (``fs.files``)
+        """
+        self.bucket = bucket
+        self.files_collection = files_collection
+
+    async def open(self, file_id: ObjectId) -> Optional[StoredFile]:
+        try:
+            return GridFSFile(await self.bucket.open_download_stream(file_id))
+        except NoFile:
+            return None
+
+    async def exists(self, file_id: ObjectId) -> bool:
+        return await self.files_collection.count_documents({"_id": file_id}, limit=1) > 0
+
+    def open_writer(
+        self,
+        filename: str,
+        content_type: str,
+        metadata: Optional[dict] = None,
+        file_id: Optional[ObjectId] = None,
+        upload_date: Optional[datetime] = None
+    ) -> FileWriter:
+        # GridFS always sets uploadDate itself when the file is closed
+        metadata = {**(metadata or {}), "content_type": content_type}
+        if file_id is None:
+            grid_in = self.bucket.open_upload_stream(filename, metadata=metadata)
+        else:
+            grid_in = self.bucket.open_upload_stream_with_id(file_id, filename, metadata=metadata)
+        return GridFSWriter(grid_in)
+
+    async def delete(self, file_id: ObjectId) -> bool:
+        try:
+            await self.bucket.delete(file_id)
+            return True
+        except NoFile:
+            return False
+
+    async def file_ids(self) -> AsyncIterator[ObjectId]:
+        async for document in self.files_collection.find({}, {"_id": 1}):
+            yield document["_id"]
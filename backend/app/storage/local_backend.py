@@ -0,0 +1,240 @@
+"""
+Local filesystem storage backend with content-addressed paths.
+
+File bytes live under ``<root>/objects/<sha[0:2]>/<sha[2:4]>/<sha256>``,
+so identical contents share one file on disk. A ``stored_files`` document
+per file keeps its ObjectId, name, type, size and path, and a
+``stored_objects`` document per path counts the files using it; the bytes
+are removed with the last one. Downloads can hand the path to
+``FileResponse`` and be sent with sendfile, without passing through Python.
+
+Filesystem calls run in worker threads so they never block the event loop.
+"""
+import asyncio
+import os
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Optional
+import anyio
+from bson import ObjectId
+from pymongo import ReturnDocument
+from app.storage.base import FileWriter, StorageBackend, StoredFile
+
+READ_CHUNK_SIZE = 256 * 1024
+
+
+class LocalFile(StoredFile):
+    """A file on the local disk."""
+
+    async def iter_range(self, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Read the file in fixed-size chunks, starting with a seek to ``start``."""
+        remaining = (self.length if end is None else end + 1) - start
+        async with await anyio.open_file(self.path, "rb") as handle:
+            if start:
+                await handle.seek(start)
+            while remaining > 0:
+                chunk = await handle.read(min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+def _remove_if_exists(path: str) -> None:
+    """Remove a file, ignoring one that is already gone."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class LocalWriter(FileWriter):
+    """A file being written to a temporary path, moved into place on close."""
+
+    def __init__(self, storage: "LocalStorage", document: dict):
+        """
+        Args:
+            storage: Owning backend
+            document: stored_files document to insert on close (without path)
+        """
+        self.storage = storage
+        self.document = document
+        self.file_id = document["_id"]
+        self.temp_path = os.path.join(storage.temp_dir, f"{self.file_id}-{uuid.uuid4().hex}")
+        self.handle = None
+
+    async def write(self, chunk: bytes) -> None:
+        if self.handle is None:
+            await asyncio.to_thread(os.makedirs, self.storage.temp_dir, exist_ok=True)
+            self.handle = await anyio.open_file(self.temp_path, "wb")
+        await self.handle.write(chunk)
+        self.document["length"] += len(chunk)
+
+    async def close(self, sha256: str) -> None:
+        if self.handle is None:
+            # Empty file
+            await self.write(b"")
+        await self.handle.aclose()
+
+        # Reference the path before the bytes land so a concurrent delete of
+        # another file with the same contents keeps them
+        relative_path = self.storage.object_path(sha256)
+        await self.storage.acquire_object(relative_path)
+        try:
+            await self.storage.files_collection.insert_one({
+                **self.document,
+                "sha256": sha256,
+                "path": relative_path
+            })
+        except Exception:
+            await self.storage.release_object(relative_path)
+            await self.abort()
+            raise
+
+        # Renaming over an existing copy is atomic and leaves identical bytes
+        await asyncio.to_thread(self.storage.place_object, self.temp_path, relative_path)
+
+    async def abort(self) -> None:
+        if self.handle is not None:
+            await self.handle.aclose()
+        await asyncio.to_thread(_remove_if_exists, self.temp_path)
+
+
+class LocalStorage(StorageBackend):
+    """Store files on the local disk."""
+
+    name = "local"
+
+    def __init__(self, root: str, files_collection, objects_collection):
+        """
+        Args:
+            root: Storage directory
+            files_collection: Collection holding one document per file
+            objects_collection: Collection holding a reference count per path
+        """
+        self.root = os.path.abspath(root)
+        self.temp_dir = os.path.join(self.root, "tmp")
+        self.files_collection = files_collection
+        self.objects_collection = objects_collection
+
+    @staticmethod
+    def object_path(sha256: str) -> str:
+        """
+        Get the content-addressed path of a file, relative to the root.
+
+        Args:
+            sha256: Hex SHA-256 of the contents
+
+        Returns:
+            Relative path
+        """
+        return os.path.join("objects", sha256[:2], sha256[2:4], sha256)
+
+    def place_object(self, source_path: str, relative_path: str) -> None:
+        """
+        Move a finished file to its content-addressed path (blocking).
+
+        Args:
+            source_path: Temporary file
+            relative_path: Destination, relative to the root
+        """
+        final_path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(source_path, final_path)
+
+    async def acquire_object(self, relative_path: str) -> None:
+        """
+        Add a reference to a content-addressed path.
+
+        Args:
+            relative_path: Path relative to the root
+        """
+        await self.objects_collection.update_one(
+            {"_id": relative_path},
+            {"$inc": {"refcount": 1}},
+            upsert=True
+        )
+
+    async def release_object(self, relative_path: str) -> None:
+        """
+        Drop a reference to a content-addressed path, removing its bytes
+        with the last one.
+
+        The bytes are moved aside before the count is deleted. If a writer
+        of the same contents took a reference meanwhile, the conditional
+        delete fails and the (identical) bytes are moved back, so a file
+        committed concurrently is never lost.
+
+        Args:
+            relative_path: Path relative to the root
+        """
+        document = await self.objects_collection.find_one_and_update(
+            {"_id": relative_path, "refcount": {"$gt": 0}},
+            {"$inc": {"refcount": -1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if not document or document["refcount"] > 0:
+            return
+
+        final_path = os.path.join(self.root, relative_path)
+        doomed_path = f"{final_path}.{uuid.uuid4().hex}.deleting"
+        try:
+            await asyncio.to_thread(os.rename, final_path, doomed_path)
+        except FileNotFoundError:
+            doomed_path = None
+
+        deleted = await self.objects_collection.delete_one({"_id": relative_path, "refcount": {"$lte": 0}})
+        if doomed_path is None:
+            return
+        if deleted.deleted_count:
+            await asyncio.to_thread(_remove_if_exists, doomed_path)
+        else:
+            await asyncio.to_thread(os.replace, doomed_path, final_path)
+
+    async def open(self, file_id: ObjectId) -> Optional[StoredFile]:
+        document = await self.files_collection.find_one({"_id": file_id})
+        if not document:
+            return None
+        return LocalFile(
+            file_id=document["_id"],
+            filename=document["filename"],
+            content_type=document.get("content_type"),
+            length=document["length"],
+            upload_date=document.get("upload_date"),
+            sha256=document.get("sha256"),
+            metadata=document.get("metadata"),
+            path=os.path.join(self.root, document["path"])
+        )
+
+    async def exists(self, file_id: ObjectId) -> bool:
+        return await self.files_collection.count_documents({"_id": file_id}, limit=1) > 0
+
+    def open_writer(
+        self,
+        filename: str,
+        content_type: str,
+        metadata: Optional[dict] = None,
+        file_id: Optional[ObjectId] = None,
+        upload_date: Optional[datetime] = None
+    ) -> FileWriter:
+        return LocalWriter(self, {
+            "_id": file_id or ObjectId(),
+            "filename": filename,
+            "content_type": content_type,
+            "length": 0,
+            "upload_date": upload_date or datetime.utcnow(),
+            "metadata": {**(metadata or {}), "content_type": content_type}
+        })
+
+    async def delete(self, file_id: ObjectId) -> bool:
+        document = await self.files_collection.find_one_and_delete({"_id": file_id})
+        if not document:
+            return False
+
+        # Other files with the same contents share the path
+        await self.release_object(document["path"])
+        return True
+
+    async def file_ids(self) -> AsyncIterator[ObjectId]:
+        async for document in self.files_collection.find({}, {"_id": 1}):
+            yield document["_id"]
@@ -0,0 +1,236 @@
+"""
+Aggregation pipelines for dashboard analytics.
+
+Each collection is summarised by a single ``$facet`` aggregation, so a full
+recount costs three round trips and never loads documents into Python. The
+same summaries seed and reconcile the incremental rollup in ``app.utils.stats``.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+
+def _count(stage_filter: dict) -> List[dict]:
+    """Facet branch counting documents matching a filter."""
+    return [{"$match": stage_filter}, {"$count": "n"}]
+
+
+def _group_count(expression: Any) -> List[dict]:
+    """Facet branch counting documents per value of an expression."""
+    return [{"$group": {"_id": expression, "n": {"$sum": 1}}}]
+
+
+def project_facet_pipeline(now: datetime) -> List[dict]:
+    """
+    Build the projects summary aggregation.
+
+    Args:
+        now: Reference time for the "recent" window
+
+    Returns:
+        Aggregation pipeline producing one document of facets
+    """
+    return [{"$facet": {
+        "total": [{"$count": "n"}],
+        "by_status": _group_count({"$ifNull": ["$current_stage", "unknown"]}),
+        "by_type": [
+            {"$match": {"design_type": {"$nin": [None, "", "Not specified"]}}},
+            *_group_count("$design_type")
+        ],
+        "posted": _count({"posted": True}),
+        "recent": _count({"created_at": {"$gte": now - timedelta(days=7)}}),
+        # Whole days from creation to completion, per completed project
+        "approval_days": [
+            {"$match": {"current_stage": "completed"}},
+            {"$project": {"completed_at": {"$ifNull": ["$actual_completion_date", "$updated_at"]}, "created_at": 1}},
+            {"$group": {
+                "_id": None,
+                "total_days": {"$sum": {"$cond": [
+                    {"$and": ["$created_at", "$completed_at"]},
+                    {"$floor": {"$divide": [{"$subtract": ["$completed_at", "$created_at"]}, MS_PER_DAY]}},
+                    0
+                ]}},
+                "n": {"$sum": 1}
+            }}
+        ]
+    }}]
+
+
+def task_facet_pipeline(now: datetime) -> List[dict]:
+    """
+    Build the tasks summary aggregation.
+
+    Args:
+        now: Reference time for overdue tasks
+
+    Returns:
+        Aggregation pipeline producing one document of facets
+    """
+    return [{"$facet": {
+        "total": [{"$count": "n"}],
+        "by_status": _group_count("$status"),
+        "overdue": _count({
+            "status": {"$in": ["pending", "in_progress"]},
+            "due_date": {"$lt": now}
+        })
+    }}]
+
+
+def user_facet_pipeline() -> List[dict]:
+    """
+    Build the users summary aggregation.
+
+    Returns:
+        Aggregation pipeline producing one document of facets
+    """
+    return [{"$facet": {
+        "total": [{"$count": "n"}],
+        "by_role": _group_count({"$ifNull": ["$role", "Unknown"]})
+    }}]
+
+
+def _facet_total(facet: List[dict]) -> int:
+    """Read a $count facet branch."""
+    return facet[0]["n"] if facet else 0
+
+
+def _facet_groups(facet: List[dict]) -> Dict[str, int]:
+    """Read a grouped facet branch into a dictionary."""
+    return {group["_id"]: group["n"] for group in facet}
+
+
+async def _run_facets(collection, pipeline: List[dict]) -> dict:
+    """Run a $facet pipeline and return its single result document."""
+    results = await collection.aggregate(pipeline).to_list(length=1)
+    return results[0]
+
+
+async def compute_collection_summaries(db, now: datetime) -> Dict[str, dict]:
+    """
+    Run the projects, tasks and users facet aggregations concurrently.
+
+    Args:
+        db: Database instance
+        now: Reference time for time-relative counts
+
+    Returns:
+        Dictionary of raw facet documents keyed by collection
+    """
+    projects, tasks, users = await asyncio.gather(
+        _run_facets(db.projects, project_facet_pipeline(now)),
+        _run_facets(db.tasks, task_facet_pipeline(now)),
+        _run_facets(db.users, user_facet_pipeline())
+    )
+    return {"projects": projects, "tasks": tasks, "users": users}
+
+
+def summaries_to_counters(summaries: Dict[str, dict]) -> Dict[str, dict]:
+    """
+    Convert raw facet documents into rollup counters.
+
+    Args:
+        summaries: Output of compute_collection_summaries
+
+    Returns:
+        Nested counters in the layout of the stats rollup document
+    """
+    projects = summaries["projects"]
+    tasks = summaries["tasks"]
+    users = summaries["users"]
+    approval = projects["approval_days"][0] if projects["approval_days"] else {"total_days": 0}
+
+    return {
+        "projects": {
+            "total": _facet_total(projects["total"]),
+            "posted": _facet_total(projects["posted"]),
+            "approval_days_total": approval["total_days"],
+            "by_status": _facet_groups(projects["by_status"]),
+            "by_type": _facet_groups(projects["by_type"])
+        },
+        "tasks": {
+            "total": _facet_total(tasks["total"]),
+            "by_status": {
+                key: value for key, value in _facet_groups(tasks["by_status"]).items()
+                if key is not None
+            }
+        },
+        "users": {
+            "total": _facet_total(users["total"]),
+            "by_role": _facet_groups(users["by_role"])
+        }
+    }
+
+
+def _nonzero(counts: Dict[str, int]) -> Dict[str, int]:
+    """Drop buckets whose counter has dropped back to zero."""
+    return {key: value for key, value in counts.items() if value}
+
+
+def dashboard_response(counters: Dict[str, dict], recent_projects: int, overdue_tasks: int) -> Dict[str, Any]:
+    """
+    Shape rollup counters and time-relative counts into the dashboard response.
+
+    Args:
+        counters: Nested counters (see summaries_to_counters)
+        recent_projects: Projects created in the last 7 days
+        overdue_tasks: Open tasks past their due date
+
+    Returns:
+        Dashboard analytics dictionary
+    """
+    projects = counters["projects"]
+    tasks_by_status = counters["tasks"]["by_status"]
+
+    total_projects = projects["total"]
+    projects_by_status = _nonzero(projects["by_status"])
+    completed_projects = projects_by_status.get("completed", 0)
+
+    avg_approval_time = 0
+    if completed_projects:
+        avg_approval_time = round(projects["approval_days_total"] / completed_projects, 1)
+
+    return {
+        "overview": {
+            "total_projects": total_projects,
+            "active_projects": total_projects - completed_projects,
+            "completed_projects": completed_projects,
+            "posted_projects": projects["posted"],
+            "total_users": counters["users"]["total"],
+            "total_tasks": counters["tasks"]["total"],
+            "recent_projects_7days": recent_projects
+        },
+        "projects": {
+            "by_status": projects_by_status,
+            "by_type": _nonzero(projects["by_type"]),
+            "average_approval_days": avg_approval_time
+        },
+        "tasks": {
+            "pending": tasks_by_status.get("pending", 0),
+            "in_progress": tasks_by_status.get("in_progress", 0),
+            "completed": tasks_by_status.get("completed", 0),
+            "overdue": overdue_tasks
+        },
+        "users": {
+            "by_role": _nonzero(counters["users"]["by_role"])
+        }
+    }
+
+
+async def compute_dashboard(db) -> Dict[str, Any]:
+    """
+    Compute the dashboard analytics response by scanning the collections.
+
+    Args:
+        db: Database instance
+
+    Returns:
+        Dashboard analytics dictionary
+    """
+    summaries = await compute_collection_summaries(db, datetime.now())
+    return dashboard_response(
+        summaries_to_counters(summaries),
+        _facet_total(summaries["projects"]["recent"]),
+        _facet_total(summaries["tasks"]["overdue"])
+    )
@@ -0,0 +1,162 @@
+"""
+Content-addressed deduplication of stored files.
+
+Every upload is hashed before it is stored. The ``blobs`` collection maps
+a SHA-256 (its ``_id``) to the one stored file holding those bytes and
+counts the records (``uploads`` versions, task files) referencing it.
+Uploading identical bytes again adds a reference instead of a copy, and
+the stored file is deleted only when its last reference is released.
+
+Files stored before deduplication have no blob and are never deleted by
+``release_blob``.
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import UploadFile
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.utils.file_storage import DEFAULT_CONTENT_TYPE, delete_stored_file, digest_upload, stream_upload
+from app.utils.thumbnails import delete_derivatives
+
+
+async def _acquire_blob(db, sha256: str) -> Optional[dict]:
+    """
+    Add a reference to an existing blob.
+
+    A blob whose count just dropped to zero is revived rather than
+    skipped: its releaser only deletes it while the count is still zero.
+
+    Args:
+        db: Database instance
+        sha256: Content hash
+
+    Returns:
+        Blob document, or None if no blob has this hash
+    """
+    return await db.blobs.find_one_and_update(
+        {"_id": sha256},
+        {"$inc": {"refcount": 1}},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def _stored(upload: UploadFile, blob: dict, deduplicated: bool) -> Dict[str, Any]:
+    """Describe a stored upload the way stream_upload does."""
+    return {
+        "file_id": blob["file_id"],
+        "filename": upload.filename,
+        "content_type": upload.content_type or DEFAULT_CONTENT_TYPE,
+        "file_size": blob["size"],
+        "sha256": blob["_id"],
+        "deduplicated": deduplicated
+    }
+
+
+async def store_upload(db, upload: UploadFile, metadata: Optional[dict] = None) -> Dict[str, Any]:
+    """
+    Store an upload once per distinct content and take a reference to it.
+
+    Args:
+        db: Database instance
+        upload: Uploaded file
+        metadata: Optional metadata for newly stored files
+
+    Returns:
+        Dictionary with file_id, filename, content_type, file_size, sha256
+        and whether an existing blob was reused (deduplicated)
+
+    Raises:
+        HTTPException: 413 if the file exceeds the limit for its type
+    """
+    size, sha256 = await digest_upload(upload)
+
+    blob = await _acquire_blob(db, sha256)
+    if blob:
+        return _stored(upload, blob, True)
+
+    stored = await stream_upload(upload, metadata)
+    blob = {
+        "_id": stored["sha256"],
+        "file_id": stored["file_id"],
+        "size": stored["file_size"],
+        "content_type": stored["content_type"],
+        "refcount": 1,
+        "created_at": datetime.utcnow()
+    }
+    while True:
+        try:
+            await db.blobs.insert_one(blob)
+            return {**stored, "deduplicated": False}
+        except DuplicateKeyError:
+            # An identical upload finished first: use its copy instead
+            existing = await _acquire_blob(db, blob["_id"])
+            if existing:
+                await delete_stored_file(stored["file_id"])
+                return _stored(upload, existing, True)
+
+
+async def release_blob(db, file_id: Any) -> bool:
+    """
+    Drop one reference to a stored file, deleting it with the last one.
+
+    Args:
+        db: Database instance
+        file_id: Stored file ObjectId or ID string
+
+    Returns:
+        True if the file itself was deleted
+    """
+    if not file_id:
+        return False
+    try:
+        file_id = ObjectId(file_id)
+    except (InvalidId, TypeError):
+        return False
+
+    blob = await db.blobs.find_one_and_update(
+        {"file_id": file_id, "refcount": {"$gt": 0}},
+        {"$inc": {"refcount": -1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if not blob or blob["refcount"] > 0:
+        return False
+
+    # Only delete while still unreferenced; a concurrent upload may have revived it
+    deleted = await db.blobs.delete_one({"_id": blob["_id"], "refcount": {"$lte": 0}})
+    if not deleted.deleted_count:
+        return False
+    await delete_derivatives(db, file_id)
+    return await delete_stored_file(file_id)
+
+
+async def blob_stats(db) -> Dict[str, int]:
+    """
+    Summarize deduplicated storage.
+
+    Args:
+        db: Database instance
+
+    Returns:
+        Dictionary with blob and reference counts, bytes stored, bytes
+        referenced and bytes saved by deduplication
+    """
+    pipeline = [
+        {"$group": {
+            "_id": None,
+            "blobs": {"$sum": 1},
+            "references": {"$sum": "$refcount"},
+            "stored_bytes": {"$sum": "$size"},
+            "referenced_bytes": {"$sum": {"$multiply": ["$size", "$refcount"]}}
+        }}
+    ]
+    rows = await db.blobs.aggregate(pipeline).to_list(length=1)
+    totals = rows[0] if rows else {"blobs": 0, "references": 0, "stored_bytes": 0, "referenced_bytes": 0}
+    return {
+        "blobs": totals["blobs"],
+        "references": totals["references"],
+        "stored_bytes": totals["stored_bytes"],
+        "referenced_bytes": totals["referenced_bytes"],
+        "saved_bytes": totals["referenced_bytes"] - totals["stored_bytes"]
+    }
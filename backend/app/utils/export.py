@@ -0,0 +1,147 @@
+"""
+Streaming CSV and NDJSON export.
+
+Rows are read from a Motor cursor one batch at a time, shaped (with any
+name lookups done once per batch) and encoded before the next batch is
+fetched, so memory per request is bounded by the batch size rather than
+the size of the collection. The stream stops as soon as the client
+disconnects.
+"""
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Literal, Sequence
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+ExportFormat = Literal["csv", "ndjson"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson"
+}
+
+# Separator for list values (e.g. assignees) in CSV cells
+CSV_LIST_SEPARATOR = "; "
+
+RowBuilder = Callable[[List[dict]], Awaitable[List[Dict[str, Any]]]]
+
+
+def _csv_value(value: Any) -> Any:
+    """Flatten a row value into a CSV cell."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return CSV_LIST_SEPARATOR.join(str(_csv_value(item)) for item in value)
+    return value
+
+
+def encode_csv(rows: List[Dict[str, Any]], columns: Sequence[str], header: bool = False) -> bytes:
+    """
+    Encode rows as CSV lines.
+
+    Args:
+        rows: Row dictionaries
+        columns: Column order
+        header: Whether to start with the header line
+
+    Returns:
+        UTF-8 encoded CSV
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_csv_value(row.get(column)) for column in columns])
+    return buffer.getvalue().encode("utf-8")
+
+
+def encode_ndjson(rows: List[Dict[str, Any]]) -> bytes:
+    """
+    Encode rows as newline-delimited JSON.
+
+    Args:
+        rows: Row dictionaries
+
+    Returns:
+        One JSON document per line
+    """
+    return b"".join(orjson.dumps(row) + b"\n" for row in rows)
+
+
+async def stream_export(
+    request: Request,
+    cursor,
+    build_rows: RowBuilder,
+    export_format: ExportFormat,
+    columns: Sequence[str],
+    batch_size: int
+) -> AsyncIterator[bytes]:
+    """
+    Encode a cursor batch by batch until it is exhausted or the client leaves.
+
+    Args:
+        request: Incoming request, polled for disconnects between batches
+        cursor: Motor find or aggregation cursor
+        build_rows: Coroutine shaping one batch of documents into rows
+        export_format: "csv" or "ndjson"
+        columns: Column order (CSV header and cell order)
+        batch_size: Documents fetched and encoded per batch
+
+    Yields:
+        Encoded chunks, one per batch (plus the CSV header)
+    """
+    try:
+        if export_format == "csv":
+            yield encode_csv([], columns, header=True)
+
+        while True:
+            if await request.is_disconnected():
+                break
+            documents = await cursor.to_list(length=batch_size)
+            if not documents:
+                break
+            rows = await build_rows(documents)
+            if export_format == "csv":
+                yield encode_csv(rows, columns)
+            else:
+                yield encode_ndjson(rows)
+    finally:
+        # Release the server-side cursor if the stream ended early
+        await cursor.close()
+
+
+def export_response(
+    request: Request,
+    cursor,
+    build_rows: RowBuilder,
+    export_format: ExportFormat,
+    columns: Sequence[str],
+    name: str,
+    batch_size: int
+) -> StreamingResponse:
+    """
+    Build a streaming download of an export.
+
+    Args:
+        request: Incoming request
+        cursor: Motor find or aggregation cursor
+        build_rows: Coroutine shaping one batch of documents into rows
+        export_format: "csv" or "ndjson"
+        columns: Column order
+        name: Download file name without extension
+        batch_size: Documents fetched and encoded per batch
+
+    Returns:
+        StreamingResponse with an attachment Content-Disposition
+    """
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+    return StreamingResponse(
+        stream_export(request, cursor, build_rows, export_format, columns, batch_size),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,281 @@
+"""
+Stored file helpers: streamed uploads with size limits and checksums,
+reads and deletes, on whichever storage backend is configured.
+"""
+import hashlib
+from typing import Dict, Optional, Tuple
+from bson import ObjectId
+from fastapi import HTTPException, UploadFile, status
+from app.config import settings
+from app.database import get_storage
+from app.storage.base import StorageBackend, StoredFile
+
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+
+def upload_size_limit(content_type: str) -> int:
+    """
+    Get the maximum upload size for a MIME type.
+
+    Args:
+        content_type: MIME content type
+
+    Returns:
+        Limit in bytes: the exact type's, else its "major/*" entry's, else
+        the default
+    """
+    limits = settings.upload_max_bytes_by_type
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    major = content_type.split("/", 1)[0]
+    return limits.get(content_type, limits.get(f"{major}/*", settings.upload_max_bytes))
+
+
+def _too_large(limit: int, content_type: str) -> HTTPException:
+    """413 error for an upload over its size limit."""
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the {limit} byte limit for {content_type} uploads"
+    )
+
+
+async def digest_upload(upload: UploadFile) -> Tuple[int, str]:
+    """
+    Compute an upload's size and SHA-256 without storing it.
+
+    The upload (already spooled locally by the server) is read in
+    fixed-size chunks and rewound afterwards, so it can be looked up by
+    content before anything is written to storage.
+
+    Args:
+        upload: Uploaded file
+
+    Returns:
+        Tuple of (size in bytes, hex SHA-256)
+
+    Raises:
+        HTTPException: 413 if the file exceeds the limit for its type
+    """
+    content_type = upload.content_type or DEFAULT_CONTENT_TYPE
+    limit = upload_size_limit(content_type)
+    if upload.size is not None and upload.size > limit:
+        raise _too_large(limit, content_type)
+
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = await upload.read(settings.upload_chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > limit:
+            raise _too_large(limit, content_type)
+        digest.update(chunk)
+
+    await upload.seek(0)
+    return size, digest.hexdigest()
+
+
+async def stream_upload(upload: UploadFile, metadata: Optional[dict] = None) -> dict:
+    """
+    Stream an uploaded file into storage in fixed-size chunks.
+
+    The size and SHA-256 are computed while streaming, so at most one
+    chunk of the upload is held in memory. If the file turns out to be
+    over its size limit, the partial file is removed.
+
+    Args:
+        upload: Uploaded file
+        metadata: Optional metadata dictionary
+
+    Returns:
+        Dictionary with file_id, filename, content_type, file_size and sha256
+
+    Raises:
+        HTTPException: 413 if the file exceeds the limit for its type
+    """
+    content_type = upload.content_type or DEFAULT_CONTENT_TYPE
+    limit = upload_size_limit(content_type)
+    # Reject early when the multipart part declared its size
+    if upload.size is not None and upload.size > limit:
+        raise _too_large(limit, content_type)
+
+    writer = get_storage().open_writer(upload.filename, content_type, metadata)
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(settings.upload_chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > limit:
+                raise _too_large(limit, content_type)
+            digest.update(chunk)
+            await writer.write(chunk)
+    except BaseException:
+        await writer.abort()
+        raise
+
+    sha256 = digest.hexdigest()
+    await writer.close(sha256)
+
+    return {
+        "file_id": writer.file_id,
+        "filename": upload.filename,
+        "content_type": content_type,
+        "file_size": size,
+        "sha256": sha256
+    }
+
+
+async def save_file(
+    file_data: bytes,
+    filename: str,
+    content_type: str,
+    metadata: Optional[dict] = None
+) -> ObjectId:
+    """
+    Store a small in-memory file.
+
+    Args:
+        file_data: File contents
+        filename: Original filename
+        content_type: MIME content type
+        metadata: Optional metadata dictionary
+
+    Returns:
+        ObjectId of the stored file
+    """
+    writer = get_storage().open_writer(filename, content_type, metadata)
+    try:
+        await writer.write(file_data)
+    except BaseException:
+        await writer.abort()
+        raise
+    await writer.close(hashlib.sha256(file_data).hexdigest())
+    return writer.file_id
+
+
+async def open_stored_file(file_id: ObjectId) -> Optional[StoredFile]:
+    """
+    Open a stored file for streaming without reading its contents.
+
+    Args:
+        file_id: ObjectId of the file
+
+    Returns:
+        Open file, or None if the file does not exist
+    """
+    return await get_storage().open(file_id)
+
+
+async def stored_file_exists(file_id: ObjectId) -> bool:
+    """
+    Check whether a stored file exists without opening it.
+
+    Args:
+        file_id: ObjectId of the file
+
+    Returns:
+        True if the file exists
+    """
+    return await get_storage().exists(file_id)
+
+
+async def delete_stored_file(file_id: ObjectId) -> bool:
+    """
+    Delete a stored file.
+
+    Args:
+        file_id: ObjectId of the file
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        return await get_storage().delete(file_id)
+    except Exception:
+        return False
+
+
+async def copy_stored_file(source: StoredFile, target: StorageBackend) -> int:
+    """
+    Copy an open file to another backend under the same ID.
+
+    Args:
+        source: Open file on the source backend
+        target: Backend to copy to
+
+    Returns:
+        Number of bytes copied
+    """
+    writer = target.open_writer(
+        source.filename,
+        source.content_type or DEFAULT_CONTENT_TYPE,
+        {key: value for key, value in source.metadata.items() if key != "content_type"},
+        file_id=source.file_id,
+        upload_date=source.upload_date
+    )
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async for chunk in source.iter_range():
+            digest.update(chunk)
+            size += len(chunk)
+            await writer.write(chunk)
+    except BaseException:
+        await writer.abort()
+        raise
+    await writer.close(digest.hexdigest())
+    return size
+
+
+async def migrate_files(
+    source: StorageBackend,
+    target: StorageBackend,
+    delete_source: bool = False,
+    dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    Copy every file from one backend to another, keeping its ID.
+
+    Files already present on the target are skipped, so an interrupted
+    migration can simply be run again. References to files need no
+    rewriting because IDs are preserved.
+
+    Args:
+        source: Backend to copy from
+        target: Backend to copy to
+        delete_source: Delete each file from the source once it is on the target
+        dry_run: Only count what would be copied
+
+    Returns:
+        Dictionary with files scanned, copied, skipped, failed and deleted,
+        and bytes copied
+    """
+    report = {"scanned": 0, "copied": 0, "skipped": 0, "failed": 0, "deleted": 0, "bytes": 0}
+
+    async for file_id in source.file_ids():
+        report["scanned"] += 1
+        if await target.exists(file_id):
+            report["skipped"] += 1
+        elif dry_run:
+            report["copied"] += 1
+            continue
+        else:
+            stored = await source.open(file_id)
+            if stored is None:
+                continue
+            try:
+                report["bytes"] += await copy_stored_file(stored, target)
+                report["copied"] += 1
+            except Exception as exc:
+                report["failed"] += 1
+                print(f"⚠️ Could not copy file {file_id}: {exc}")
+                continue
+
+        if delete_source and not dry_run and await source.delete(file_id):
+            report["deleted"] += 1
+
+    return report
@@ -0,0 +1,262 @@
+"""
+HTTP helpers for serving stored files: validators, headers and byte ranges.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+from urllib.parse import quote
+from bson import ObjectId
+from fastapi import HTTPException, Response, status
+
+# Stored files never change, so browsers may reuse them without revalidating
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# For responses that may later be replaced at the same URL
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def file_etag(file_id) -> str:
+    """
+    Build the strong ETag of a stored file.
+
+    Stored files are never modified in place, so the file ID identifies
+    its exact bytes.
+
+    Args:
+        file_id: File ObjectId or ID string
+
+    Returns:
+        Quoted ETag value
+    """
+    return f'"{file_id}"'
+
+
+def file_last_modified(file_id) -> datetime:
+    """
+    Get the Last-Modified time of a stored file from its ID alone.
+
+    Stored files are never modified, so the time their ObjectId was
+    generated is a valid validator and needs no storage read.
+
+    Args:
+        file_id: File ObjectId or ID string
+
+    Returns:
+        Timezone-aware UTC datetime
+    """
+    return ObjectId(file_id).generation_time
+
+
+def http_date(value: Optional[datetime]) -> Optional[str]:
+    """
+    Format a datetime as an HTTP date.
+
+    Args:
+        value: Datetime (naive values are taken as UTC, as stored by MongoDB)
+
+    Returns:
+        IMF-fixdate string, or None if value is None
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an HTTP date header.
+
+    Args:
+        value: Header value, if any
+
+    Returns:
+        Timezone-aware datetime, or None if absent or invalid
+    """
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+
+    Uses weak comparison, as RFC 9110 requires for If-None-Match, and
+    accepts ``*`` and comma-separated lists.
+
+    Args:
+        if_none_match: If-None-Match header value
+        etag: Current ETag
+
+    Returns:
+        True if any listed tag matches
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == opaque_tag:
+            return True
+    return False
+
+
+def is_not_modified(
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+    etag: str,
+    last_modified: datetime
+) -> bool:
+    """
+    Check whether a conditional GET can be answered with 304 Not Modified.
+
+    If-Modified-Since is only considered when there is no If-None-Match.
+
+    Args:
+        if_none_match: If-None-Match header value, if any
+        if_modified_since: If-Modified-Since header value, if any
+        etag: Current ETag
+        last_modified: Current modification time (timezone-aware)
+
+    Returns:
+        True if the client's cached copy is still current
+    """
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    since = parse_http_date(if_modified_since)
+    # HTTP dates have one-second resolution
+    return since is not None and last_modified.replace(microsecond=0) <= since
+
+
+def not_modified_response(etag: str, last_modified: Optional[str], cache_control: str) -> Response:
+    """
+    Build a 304 Not Modified response.
+
+    Args:
+        etag: Current ETag
+        last_modified: Current Last-Modified header value, if any
+        cache_control: Cache-Control header value
+
+    Returns:
+        Empty 304 response carrying the validators
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def content_disposition(disposition: str, filename: str) -> str:
+    """
+    Build a Content-Disposition header value for any filename.
+
+    Older clients read the quoted ASCII fallback, in which other characters
+    are replaced and quotes escaped; the rest use the exact UTF-8 name
+    (RFC 6266 / RFC 5987).
+
+    Args:
+        disposition: "attachment" or "inline"
+        filename: Name to offer the client
+
+    Returns:
+        Header value
+    """
+    fallback = "".join(char if " " <= char <= "~" else "_" for char in filename)
+    fallback = fallback.replace("\\", "\\\\").replace('"', '\\"')
+    encoded = quote(filename, safe="")
+    return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{encoded}"
+
+
+def if_range_matches(if_range: Optional[str], etag: str, last_modified: Optional[str]) -> bool:
+    """
+    Check whether a Range request may be served partially.
+
+    An If-Range entity tag must match exactly (strong comparison); a date
+    must equal Last-Modified exactly.
+
+    Args:
+        if_range: If-Range header value, if any
+        etag: Current ETag
+        last_modified: Current Last-Modified header value, if any
+
+    Returns:
+        True if there is no If-Range header or it still matches
+    """
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    return last_modified is not None and if_range == last_modified
+
+
+def _unsatisfiable(length: int) -> HTTPException:
+    """416 error advertising the full length."""
+    return HTTPException(
+        status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        detail="Requested range not satisfiable",
+        headers={"Content-Range": f"bytes */{length}", "Accept-Ranges": "bytes"}
+    )
+
+
+def parse_range(header: Optional[str], length: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range request.
+
+    Headers that are absent, use another unit or are malformed are ignored
+    (the full file is served), as RFC 9110 allows.
+
+    Args:
+        header: Range header value, if any
+        length: File length in bytes
+
+    Returns:
+        Inclusive (start, end) byte positions, or None to serve the full file
+
+    Raises:
+        HTTPException: 416 if several ranges are requested or the range is
+            outside the file
+    """
+    if not header:
+        return None
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or not ranges.strip():
+        return None
+
+    specs = [spec.strip() for spec in ranges.split(",") if spec.strip()]
+    if len(specs) != 1:
+        # multipart/byteranges responses are not supported
+        raise _unsatisfiable(length)
+
+    first, dash, last = specs[0].partition("-")
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else None
+            if end is not None and end < start:
+                return None
+        else:
+            # Suffix range: the last N bytes
+            suffix = int(last)
+            if suffix <= 0:
+                raise _unsatisfiable(length)
+            start = max(0, length - suffix)
+            end = length - 1
+    except ValueError:
+        return None
+
+    if start < 0 or start >= length:
+        raise _unsatisfiable(length)
+    return start, length - 1 if end is None else min(end, length - 1)
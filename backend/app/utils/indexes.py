@@ -0,0 +1,162 @@
+"""
+Declarative index manifest for every collection the routers query.
+
+``ensure_indexes`` is applied at startup and is idempotent: indexes that
+already exist with the same specification are left untouched.
+"""
+from typing import Dict, List
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+# Collection name -> index specifications (keys plus IndexModel options)
+INDEX_MANIFEST: Dict[str, List[dict]] = {
+    "users": [
+        # Login and registration lookups; also enforces one account per email
+        {"keys": [("email", 1)], "name": "email_unique", "unique": True},
+        # Keyset pagination
+        {"keys": [("created_at", -1), ("_id", -1)], "name": "created_at_id_desc"},
+    ],
+    "projects": [
+        # Keyset pagination sort and analytics date-range counts/timelines
+        {"keys": [("created_at", -1), ("_id", -1)], "name": "created_at_id_desc"},
+        # Calendar deadline window
+        {"keys": [("expected_completion_date", 1)], "name": "expected_completion_date"},
+        # Most-rejected projects in the stage report
+        {"keys": [("rejection_count", -1)], "name": "rejection_count_desc"},
+    ],
+    "uploads": [
+        # Latest version per project and version history listing
+        {"keys": [("project_id", 1), ("version", -1)], "name": "project_version"},
+        # Current upload lookup when adding remarks/approvals
+        {"keys": [("project_id", 1), ("is_current", 1)], "name": "project_is_current"},
+        # Download filename of a (possibly shared) stored file
+        {"keys": [("file_id", 1)], "name": "file_id"},
+    ],
+    "blobs": [
+        # Reference release by stored file
+        {"keys": [("file_id", 1)], "name": "file_id_unique", "unique": True},
+    ],
+    "derivatives": [
+        # One derivative per original file and size; also claims generation
+        {"keys": [("source_file_id", 1), ("size", 1)], "name": "source_file_size_unique", "unique": True},
+    ],
+    "tasks": [
+        # Running timers per assignee (timer exclusivity) and assignee listing
+        {"keys": [("assigned_to", 1), ("is_timer_running", 1)], "name": "assigned_to_timer"},
+        # Due-date windows (calendar, filtered listings) per visibility branch
+        {"keys": [("due_date", 1)], "name": "due_date"},
+        {"keys": [("assigned_to", 1), ("due_date", 1)], "name": "assigned_to_due_date"},
+        {"keys": [("created_by", 1), ("due_date", 1)], "name": "created_by_due_date"},
+        {"keys": [("project_id", 1), ("due_date", 1)], "name": "project_due_date"},
+        # Status filter, analytics status counts and overdue range counts
+        {"keys": [("status", 1), ("due_date", 1)], "name": "status_due_date"},
+        # Keyset pagination and created-tasks timeline
+        {"keys": [("created_at", -1), ("_id", -1)], "name": "created_at_id_desc"},
+        # Completed-tasks timeline
+        {"keys": [("completed_at", 1)], "name": "completed_at"},
+        # Download filename of a (possibly shared) stored file
+        {"keys": [("file_id", 1)], "name": "file_id"},
+    ],
+    "remarks": [
+        # Per-project listing in keyset order
+        {"keys": [("project_id", 1), ("created_at", 1), ("_id", 1)], "name": "project_created_at_id"},
+    ],
+    "approvals": [
+        {"keys": [("project_id", 1), ("created_at", 1)], "name": "project_created_at"},
+    ],
+    "time_entries": [
+        {"keys": [("user_id", 1), ("started_at", 1)], "name": "user_started_at"},
+        {"keys": [("task_id", 1), ("started_at", 1)], "name": "task_started_at"},
+    ],
+    "time_daily": [
+        # One rollup per (user, project, day); upserted by the timer
+        {"keys": [("user_id", 1), ("project_id", 1), ("day", 1)], "name": "user_project_day_unique", "unique": True},
+        # Date-range reports across all users
+        {"keys": [("day", 1)], "name": "day"},
+    ],
+    "used_refresh_tokens": [
+        # Forget used refresh tokens once they would have expired anyway
+        {"keys": [("expires_at", 1)], "name": "expires_at_ttl", "expireAfterSeconds": 0},
+    ],
+    "login_buckets": [
+        # Drop idle login rate-limit buckets once they would be full again
+        {"keys": [("expires_at", 1)], "name": "expires_at_ttl", "expireAfterSeconds": 0},
+    ],
+}
+
+
+def _index_model(spec: dict) -> IndexModel:
+    """Build an IndexModel from a manifest entry."""
+    options = {key: value for key, value in spec.items() if key != "keys"}
+    return IndexModel(spec["keys"], **options)
+
+
+async def ensure_indexes(db) -> List[str]:
+    """
+    Create every index in the manifest that does not exist yet.
+
+    A failing index (for example a unique index over duplicate data) is
+    reported and skipped so the application can still start.
+
+    Args:
+        db: Database instance
+
+    Returns:
+        List of error messages for indexes that could not be created
+    """
+    errors = []
+
+    for collection_name, specs in INDEX_MANIFEST.items():
+        collection = db[collection_name]
+        for spec in specs:
+            try:
+                await collection.create_indexes([_index_model(spec)])
+            except OperationFailure as exc:
+                message = f"{collection_name}.{spec['name']}: {exc}"
+                errors.append(message)
+                print(f"⚠️ Could not create index {message}")
+
+    return errors
+
+
+async def check_indexes(db) -> Dict[str, List[dict]]:
+    """
+    Compare the manifest with the indexes present in the database.
+
+    Args:
+        db: Database instance
+
+    Returns:
+        Dictionary with "missing" manifest indexes, "unused" indexes with no
+        recorded accesses in $indexStats (counters reset when mongod
+        restarts), and "unmanaged" indexes that are not in the manifest
+    """
+    report: Dict[str, List[dict]] = {"missing": [], "unused": [], "unmanaged": []}
+    existing_collections = set(await db.list_collection_names())
+
+    for collection_name, specs in INDEX_MANIFEST.items():
+        collection = db[collection_name]
+        existing = {}
+        usage = {}
+
+        if collection_name in existing_collections:
+            existing = await collection.index_information()
+            async for stats in collection.aggregate([{"$indexStats": {}}]):
+                usage[stats["name"]] = stats["accesses"]["ops"]
+
+        manifest_keys = {tuple(spec["keys"]): spec["name"] for spec in specs}
+        existing_keys = {tuple(info["key"]): name for name, info in existing.items()}
+
+        for keys, name in manifest_keys.items():
+            if keys not in existing_keys:
+                report["missing"].append({"collection": collection_name, "name": name, "keys": list(keys)})
+
+        for keys, name in existing_keys.items():
+            if name == "_id_":
+                continue
+            if keys not in manifest_keys:
+                report["unmanaged"].append({"collection": collection_name, "name": name, "keys": list(keys)})
+            if usage.get(name, 0) == 0:
+                report["unused"].append({"collection": collection_name, "name": name, "keys": list(keys)})
+
+    return report
@@ -0,0 +1,154 @@
+"""
+Opaque keyset (cursor) pagination keyed on (created_at, _id).
+
+A cursor encodes the sort key of the last item on a page; the next page
+is everything strictly after it in sort order, so deep pages cost the
+same as the first one. Ranked listings use (rank, key) cursors instead.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: Optional[datetime], item_id: Any) -> str:
+    """
+    Encode the sort key of the last item on a page.
+
+    Args:
+        created_at: Item creation time (None for legacy documents without one)
+        item_id: Item ObjectId or ID string
+
+    Returns:
+        Opaque URL-safe cursor string
+    """
+    return _encode_payload({
+        "t": created_at.isoformat() if created_at else None,
+        "id": str(item_id)
+    })
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], ObjectId]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Opaque cursor string
+
+    Returns:
+        Tuple of (created_at, ObjectId)
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        data = _decode_payload(cursor)
+        created_at = datetime.fromisoformat(data["t"]) if data["t"] else None
+        return created_at, ObjectId(data["id"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def encode_rank_cursor(rank: int, key: str) -> str:
+    """
+    Encode the position of the last item in a ranked listing.
+
+    Args:
+        rank: Value the listing is sorted on (descending)
+        key: Tie-breaking key (ascending)
+
+    Returns:
+        Opaque URL-safe cursor string
+    """
+    return _encode_payload({"r": rank, "k": key})
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[int, str]:
+    """
+    Decode a cursor produced by encode_rank_cursor.
+
+    Args:
+        cursor: Opaque cursor string
+
+    Returns:
+        Tuple of (rank, key)
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        data = _decode_payload(cursor)
+        return int(data["r"]), str(data["k"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _encode_payload(data: dict) -> str:
+    """Encode a cursor payload as unpadded URL-safe base64 JSON."""
+    raw = json.dumps(data)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_payload(cursor: str) -> dict:
+    """Decode a cursor payload produced by _encode_payload."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def keyset_sort(descending: bool = True) -> List[Tuple[str, int]]:
+    """
+    Get the sort specification matching keyset_query.
+
+    Args:
+        descending: Newest first when True
+
+    Returns:
+        List of (field, direction) pairs
+    """
+    direction = -1 if descending else 1
+    return [("created_at", direction), ("_id", direction)]
+
+
+def keyset_query(query: dict, cursor: Optional[str], descending: bool = True) -> dict:
+    """
+    Restrict a query to the items after a cursor.
+
+    Documents without created_at sort as null (after all dates when
+    descending, before them when ascending) and are still paged through.
+
+    Args:
+        query: Base filter
+        cursor: Cursor from the previous page, or None for the first page
+        descending: Newest first when True
+
+    Returns:
+        Filter combining the base query with the keyset condition
+    """
+    if not cursor:
+        return query
+
+    created_at, last_id = decode_cursor(cursor)
+    id_op = "$lt" if descending else "$gt"
+
+    if created_at is None:
+        after = [{"created_at": None, "_id": {id_op: last_id}}]
+        if not descending:
+            after.append({"created_at": {"$ne": None}})
+    else:
+        after = [
+            {"created_at": {id_op: created_at}},
+            {"created_at": created_at, "_id": {id_op: last_id}}
+        ]
+        if descending:
+            after.append({"created_at": None})
+
+    condition = {"$or": after}
+    return {"$and": [query, condition]} if query else condition
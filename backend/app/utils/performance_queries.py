@@ -0,0 +1,133 @@
+"""
+Aggregation query builders for the team performance leaderboard.
+
+Task counts for every assignee come from one ``$unwind``/``$group`` over
+``tasks.assigned_to``, ranked and paged on the server; names are joined
+with ``$lookup`` for the returned page only.
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+from app.models.analytics import TaskStatusCounts, UserPerformance
+from app.utils.pagination import decode_rank_cursor, encode_rank_cursor
+from app.utils.serialization import build_model
+
+OPEN_STATUSES = ["pending", "in_progress"]
+
+
+def _count_if(condition: dict) -> dict:
+    """$sum accumulator counting documents matching an expression."""
+    return {"$sum": {"$cond": [condition, 1, 0]}}
+
+
+def performance_pipeline(
+    match: dict,
+    now: datetime,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+) -> List[dict]:
+    """
+    Build the per-assignee task counts aggregation.
+
+    Rows are ranked by completed tasks (descending), then user ID.
+
+    Args:
+        match: Filter applied to tasks before grouping
+        now: Reference time for overdue tasks
+        cursor: Rank cursor from the previous page
+        limit: Optional maximum number of rows
+
+    Returns:
+        Aggregation pipeline producing UserPerformance-shaped documents
+    """
+    pipeline: List[dict] = [
+        {"$match": match},
+        {"$project": {"assigned_to": 1, "status": 1, "due_date": 1}},
+        # Legacy single-assignee strings unwind as one element
+        {"$unwind": "$assigned_to"},
+        {"$group": {
+            "_id": "$assigned_to",
+            "total": {"$sum": 1},
+            "completed": _count_if({"$eq": ["$status", "completed"]}),
+            "pending": _count_if({"$eq": ["$status", "pending"]}),
+            "in_progress": _count_if({"$eq": ["$status", "in_progress"]}),
+            "overdue": _count_if({"$and": [
+                {"$in": ["$status", OPEN_STATUSES]},
+                {"$gt": ["$due_date", None]},
+                {"$lt": ["$due_date", now]}
+            ]})
+        }},
+        {"$sort": {"completed": -1, "_id": 1}}
+    ]
+
+    if cursor:
+        completed, user_id = decode_rank_cursor(cursor)
+        pipeline.append({"$match": {"$or": [
+            {"completed": {"$lt": completed}},
+            {"completed": completed, "_id": {"$gt": user_id}}
+        ]}})
+    if limit:
+        pipeline.append({"$limit": limit})
+
+    # Join after paging so only returned users are looked up
+    pipeline.extend([
+        # Assignees are stored as ID strings; invalid ones simply find no user
+        {"$addFields": {"user_oid": {"$convert": {
+            "input": "$_id", "to": "objectId", "onError": None, "onNull": None
+        }}}},
+        {"$lookup": {
+            "from": "users",
+            "localField": "user_oid",
+            "foreignField": "_id",
+            "as": "user"
+        }},
+        {"$project": {
+            "_id": 0,
+            "user_id": "$_id",
+            "name": {"$ifNull": [{"$arrayElemAt": ["$user.name", 0]}, "Unknown"]},
+            "role": {"$ifNull": [{"$arrayElemAt": ["$user.role", 0]}, None]},
+            "tasks": {
+                "total": "$total",
+                "completed": "$completed",
+                "pending": "$pending",
+                "in_progress": "$in_progress",
+                "overdue": "$overdue"
+            }
+        }}
+    ])
+
+    return pipeline
+
+
+async def find_user_performance(
+    db,
+    match: dict,
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[UserPerformance], Optional[str]]:
+    """
+    Fetch one page of the performance leaderboard.
+
+    Users without tasks matching the filter are not listed.
+
+    Args:
+        db: Database instance
+        match: Filter applied to tasks before grouping
+        cursor: Rank cursor from the previous page
+        limit: Page size
+
+    Returns:
+        Tuple of (rows, cursor for the next page or None)
+    """
+    # Fetch one extra row to know whether another page exists
+    pipeline = performance_pipeline(match, datetime.now(), cursor, limit + 1)
+    rows = await db.tasks.aggregate(pipeline).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_rank_cursor(rows[-1]["tasks"]["completed"], rows[-1]["user_id"])
+
+    return [
+        build_model(UserPerformance, **{**row, "tasks": build_model(TaskStatusCounts, **row["tasks"])})
+        for row in rows
+    ], next_cursor
@@ -4,6 +4,17 @@ Role-based permission utilities and workflow logic.
 from typing import Optional
 from fastapi import HTTPException, status
 
+# Approval workflow stages in order
+WORKFLOW_SEQUENCE = [
+    "digital_marketer",
+    "designer",
+    "frontend_developer",
+    "manager",
+    "admin",
+    "client",
+    "completed"
+]
+
 
 def get_next_stage(current_stage: str, action: str) -> Optional[str]:
     """
@@ -16,29 +27,19 @@ def get_next_stage(current_stage: str, action: str) -> Optional[str]:
     Returns:
         Next stage or None if workflow is complete
     """
-    workflow_sequence = [
-        "digital_marketer",
-        "designer",
-        "frontend_developer",
-        "manager",
-        "admin",
-        "client",
-        "completed"
-    ]
-
     if action == "reject":
         # Rejection always returns to designer stage
         return "designer"
 
     # Find current stage index
     try:
-        current_index = workflow_sequence.index(current_stage)
+        current_index = WORKFLOW_SEQUENCE.index(current_stage)
     except ValueError:
         return None
 
     # Move to next stage
-    if current_index < len(workflow_sequence) - 1:
-        return workflow_sequence[current_index + 1]
+    if current_index < len(WORKFLOW_SEQUENCE) - 1:
+        return WORKFLOW_SEQUENCE[current_index + 1]
 
     return None
 
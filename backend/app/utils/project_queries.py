@@ -0,0 +1,104 @@
+"""
+Aggregation query builders for project responses.
+
+Projects are joined to their digital marketer with ``$lookup`` and shaped
+into exactly the ``ProjectResponse`` fields on the server, so listing N
+projects is one round trip instead of N + 1.
+"""
+from typing import List, Optional, Sequence, Tuple
+from bson import ObjectId
+from app.models.project import ProjectResponse
+from app.utils.serialization import build_model
+
+# $project stage producing the ProjectResponse fields
+PROJECT_RESPONSE_PROJECTION = {
+    "_id": 0,
+    "id": {"$toString": "$_id"},
+    "project_name": 1,
+    "digital_marketer_id": {"$toString": "$digital_marketer_id"},
+    "digital_marketer_name": {
+        "$ifNull": [{"$arrayElemAt": ["$digital_marketer.name", 0]}, "Unknown"]
+    },
+    "content_description": 1,
+    "expected_completion_date": 1,
+    "actual_completion_date": 1,
+    "current_stage": 1,
+    "design_type": 1,
+    "posted": {"$ifNull": ["$posted", False]},
+    "created_at": 1,
+    "updated_at": 1
+}
+
+
+def project_response_pipeline(
+    match: dict,
+    sort: Optional[Sequence[Tuple[str, int]]] = None,
+    limit: Optional[int] = None
+) -> List[dict]:
+    """
+    Build an aggregation pipeline returning ProjectResponse-shaped documents.
+
+    Args:
+        match: Filter applied to the projects collection
+        sort: Optional list of (field, direction) pairs
+        limit: Optional maximum number of projects
+
+    Returns:
+        Aggregation pipeline
+    """
+    pipeline: List[dict] = [{"$match": match}]
+
+    if sort:
+        pipeline.append({"$sort": dict(sort)})
+    if limit:
+        pipeline.append({"$limit": limit})
+
+    # Join after sort/limit so only returned projects are looked up
+    pipeline.extend([
+        {"$lookup": {
+            "from": "users",
+            "localField": "digital_marketer_id",
+            "foreignField": "_id",
+            "as": "digital_marketer"
+        }},
+        {"$project": PROJECT_RESPONSE_PROJECTION}
+    ])
+
+    return pipeline
+
+
+async def find_project_responses(
+    db,
+    match: dict,
+    sort: Optional[Sequence[Tuple[str, int]]] = None,
+    limit: Optional[int] = None
+) -> List[ProjectResponse]:
+    """
+    Fetch projects with marketer names in one aggregation.
+
+    Args:
+        db: Database instance
+        match: Filter applied to the projects collection
+        sort: Optional list of (field, direction) pairs
+        limit: Optional maximum number of projects
+
+    Returns:
+        List of ProjectResponse objects
+    """
+    cursor = db.projects.aggregate(project_response_pipeline(match, sort, limit))
+    return [build_model(ProjectResponse, **project) async for project in cursor]
+
+
+async def find_project_response(db, project_id: ObjectId) -> Optional[ProjectResponse]:
+    """
+    Fetch one project with its marketer name.
+
+    Args:
+        db: Database instance
+        project_id: Project ObjectId
+
+    Returns:
+        ProjectResponse or None if the project does not exist
+    """
+    projects = await find_project_responses(db, {"_id": project_id}, limit=1)
+    return projects[0] if projects else None
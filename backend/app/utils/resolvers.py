@@ -0,0 +1,85 @@
+"""
+Request-scoped batch resolvers for display names.
+
+Collect every referenced ID first, then resolve them with a single
+``$in`` query per collection instead of one ``find_one`` per reference.
+"""
+from typing import Any, Dict, Iterable, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+class BatchResolver:
+    """Resolve documents of one collection by ID in batches."""
+
+    def __init__(self, collection, fields: Iterable[str]):
+        """
+        Args:
+            collection: Motor collection to query
+            fields: Document fields to load
+        """
+        self.collection = collection
+        self.projection = {field: 1 for field in fields}
+        self._pending = set()
+        self._documents: Dict[str, dict] = {}
+
+    def add(self, *ids: Any) -> None:
+        """
+        Register IDs to resolve on the next load().
+
+        Args:
+            ids: ObjectIds or ID strings (empty values are ignored)
+        """
+        for id_value in ids:
+            if id_value:
+                key = str(id_value)
+                if key not in self._documents:
+                    self._pending.add(key)
+
+    async def load(self) -> None:
+        """Fetch all pending IDs with one query."""
+        object_ids = []
+        for key in self._pending:
+            try:
+                object_ids.append(ObjectId(key))
+            except (InvalidId, TypeError):
+                continue
+        self._pending = set()
+
+        if not object_ids:
+            return
+
+        cursor = self.collection.find({"_id": {"$in": object_ids}}, self.projection)
+        async for document in cursor:
+            self._documents[str(document["_id"])] = document
+
+    def get(self, id_value: Any) -> Optional[dict]:
+        """
+        Get a resolved document.
+
+        Args:
+            id_value: ObjectId or ID string
+
+        Returns:
+            Document with the loaded fields, or None if it does not exist
+        """
+        if not id_value:
+            return None
+        return self._documents.get(str(id_value))
+
+    def value(self, id_value: Any, field: str, default: Any = None) -> Any:
+        """
+        Get one field of a resolved document.
+
+        Args:
+            id_value: ObjectId or ID string
+            field: Field name
+            default: Value returned if the document or field is missing
+
+        Returns:
+            Field value or default
+        """
+        document = self.get(id_value)
+        if document is None:
+            return default
+        return document.get(field, default)
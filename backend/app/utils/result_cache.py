@@ -0,0 +1,182 @@
+"""
+Single-flight TTL cache for computed analytics results.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+from app.config import settings
+
+
+class ResultCache:
+    """
+    In-process cache of computed results keyed by endpoint and parameters.
+
+    Concurrent misses for the same key share one computation. Once an entry
+    is older than the TTL it is still served for the stale window while a
+    single background task recomputes it. Keys are tuples whose first item
+    names the endpoint, so one endpoint can be purged on its own.
+    """
+
+    def __init__(self, ttl_seconds: float, stale_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        # key -> (fresh until, stale until, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        # Bumped by purges: everything, and per endpoint
+        self._generation = 0
+        self._endpoint_generations: Dict[Hashable, int] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refresh_errors = 0
+
+    async def get_or_compute(self, key: Tuple[Hashable, ...], compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get a cached result, computing it at most once per key at a time.
+
+        Args:
+            key: Cache key, starting with the endpoint name
+            compute: Coroutine function producing the result
+
+        Returns:
+            Cached or freshly computed result
+        """
+        if self.ttl_seconds <= 0:
+            return await compute()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            fresh_until, stale_until, value = entry
+            now = time.monotonic()
+            if now < fresh_until:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if now < stale_until:
+                self.stale_hits += 1
+                self._refresh_in_background(key, compute)
+                return value
+            del self._entries[key]
+
+        if key in self._inflight:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+
+        # Shielded so a disconnecting client does not cancel a shared computation
+        return await asyncio.shield(self._start(key, compute))
+
+    def _start(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Get the in-flight computation for a key, starting one if needed."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, compute, self._generation_of(key)))
+            self._inflight[key] = task
+        return task
+
+    def _generation_of(self, key: Tuple[Hashable, ...]) -> Tuple[int, int]:
+        """Purge generation a key's computation starts in."""
+        return self._generation, self._endpoint_generations.get(key[0], 0)
+
+    async def _compute(
+        self,
+        key: Tuple[Hashable, ...],
+        compute: Callable[[], Awaitable[Any]],
+        generation: Tuple[int, int]
+    ) -> Any:
+        """Run a computation and store its result unless its endpoint was purged meanwhile."""
+        try:
+            value = await compute()
+        finally:
+            # A purge may already have replaced this computation with a newer one
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+        if generation == self._generation_of(key):
+            now = time.monotonic()
+            self._entries[key] = (now + self.ttl_seconds, now + self.ttl_seconds + self.stale_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def _refresh_in_background(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> None:
+        """Recompute a stale entry without blocking the caller."""
+        if key in self._inflight:
+            return
+
+        task = self._start(key, compute)
+        self._background.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        """Report a failed background refresh; the stale value stays in place."""
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_errors += 1
+            print(f"⚠️ Analytics cache refresh failed: {task.exception()}")
+
+    def purge(self, endpoint: Optional[str] = None) -> int:
+        """
+        Drop cached results.
+
+        Computations already running for the purged keys do not store their
+        results, and later callers start new ones instead of joining them.
+        Other endpoints are unaffected.
+
+        Args:
+            endpoint: Only drop keys for this endpoint (all keys when None)
+
+        Returns:
+            Number of entries dropped
+        """
+        if endpoint is None:
+            self._generation += 1
+            self._inflight.clear()
+            purged = len(self._entries)
+            self._entries.clear()
+            return purged
+
+        self._endpoint_generations[endpoint] = self._endpoint_generations.get(endpoint, 0) + 1
+        for key in [key for key in self._inflight if key[0] == endpoint]:
+            del self._inflight[key]
+        keys = [key for key in self._entries if key[0] == endpoint]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache counters for sizing.
+
+        Returns:
+            Dictionary with size, settings, hit/miss counters and hit ratio
+        """
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refresh_errors": self.refresh_errors,
+            "hit_ratio": round((self.hits + self.stale_hits + self.coalesced) / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global analytics result cache instance
+analytics_cache = ResultCache(
+    ttl_seconds=settings.analytics_cache_ttl_seconds,
+    stale_seconds=settings.analytics_cache_stale_seconds,
+    max_entries=settings.analytics_cache_max_entries
+)
@@ -0,0 +1,68 @@
+"""
+Fast serialization path for list responses built from database documents.
+
+In trusted mode, response models are created with ``model_construct``
+(no validation) and encoded with orjson, instead of being validated once
+when built and again by FastAPI's ``response_model`` handling.
+"""
+from typing import Any, Type, TypeVar
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from app.config import settings
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def build_model(model_cls: Type[ModelT], **fields: Any) -> ModelT:
+    """
+    Build a response model from database-sourced fields.
+
+    Args:
+        model_cls: Pydantic model class
+        fields: Field values
+
+    Returns:
+        Model instance, unvalidated in trusted mode
+    """
+    if settings.trusted_serialization:
+        return model_cls.model_construct(**fields)
+    return model_cls(**fields)
+
+
+def _encode_model(value: Any) -> Any:
+    """
+    orjson fallback for values it cannot encode natively.
+
+    Response models here declare no aliases or custom serializers, so a
+    model's field values can be read straight from its instance dictionary.
+    """
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class TrustedJSONResponse(ORJSONResponse):
+    """ORJSONResponse that encodes pydantic models without re-validating them."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_encode_model)
+
+
+def list_response(payload: Any) -> Any:
+    """
+    Encode a list endpoint's result.
+
+    In trusted mode the payload is returned as a TrustedJSONResponse, which
+    bypasses response_model re-validation; otherwise it is returned
+    unchanged for FastAPI to validate and serialize.
+
+    Args:
+        payload: Model, list of models or Page
+
+    Returns:
+        TrustedJSONResponse or the original payload
+    """
+    if not settings.trusted_serialization:
+        return payload
+    return TrustedJSONResponse(payload)
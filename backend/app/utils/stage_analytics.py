@@ -0,0 +1,252 @@
+"""
+Stage dwell-time analytics built from the approvals event stream.
+
+Every approval or rejection records how long the project sat in the
+reviewed stage (``dwell_ms``) and increments a per-stage histogram in the
+``stage_dwell`` collection, so the median/p90 report reads one small
+document per stage regardless of history length. ``rebuild_stage_dwell``
+recomputes everything from the approvals collection.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pymongo import UpdateOne
+from app.utils.permissions import WORKFLOW_SEQUENCE
+
+MS_PER_HOUR = 60 * 60 * 1000
+
+# Histogram bucket upper bounds; one extra bucket holds longer dwell times
+DWELL_BUCKET_BOUNDS_HOURS = [1, 2, 4, 8, 12, 24, 48, 72, 120, 168, 336, 504, 720, 1440, 2160, 4320, 8760]
+DWELL_BUCKET_BOUNDS_MS = [hours * MS_PER_HOUR for hours in DWELL_BUCKET_BOUNDS_HOURS]
+
+TOP_REJECTED_PROJECTS = 10
+BULK_WRITE_BATCH = 1000
+
+
+def dwell_bucket(dwell_ms: int) -> int:
+    """Index of the histogram bucket holding a dwell time."""
+    return bisect_left(DWELL_BUCKET_BOUNDS_MS, dwell_ms)
+
+
+def stage_entry_time(project: dict) -> Optional[datetime]:
+    """When a project entered its current stage (estimated for legacy projects)."""
+    return project.get("stage_entered_at") or project.get("updated_at") or project.get("created_at")
+
+
+def dwell_ms_between(entered_at: Optional[datetime], left_at: Optional[datetime]) -> Optional[int]:
+    """Milliseconds between entering and leaving a stage, or None if unknown."""
+    if not entered_at or not left_at:
+        return None
+    return max(0, int((left_at - entered_at).total_seconds() * 1000))
+
+
+def _stage_increment(approved: bool, dwell_ms: int) -> Dict[str, int]:
+    """$inc document adding one review to a stage histogram."""
+    return {
+        "count": 1,
+        "approved" if approved else "rejected": 1,
+        "total_ms": dwell_ms,
+        f"buckets.{dwell_bucket(dwell_ms)}": 1
+    }
+
+
+async def record_stage_dwell(db, stage: str, approved: bool, dwell_ms: Optional[int]) -> None:
+    """
+    Add one review to the stage histogram.
+
+    Args:
+        db: Database instance
+        stage: Stage that was reviewed
+        approved: Whether the review approved the stage
+        dwell_ms: Time the project spent in the stage
+    """
+    if dwell_ms is None:
+        return
+
+    await db.stage_dwell.update_one(
+        {"_id": stage},
+        {"$inc": _stage_increment(approved, dwell_ms)},
+        upsert=True
+    )
+
+
+def _percentile_hours(buckets: Dict[str, int], count: int, quantile: float) -> Optional[float]:
+    """Approximate a percentile by interpolating inside its histogram bucket."""
+    if not count:
+        return None
+
+    target = quantile * count
+    seen = 0
+    for index in range(len(DWELL_BUCKET_BOUNDS_HOURS) + 1):
+        in_bucket = buckets.get(str(index), 0)
+        if in_bucket and seen + in_bucket >= target:
+            lower = DWELL_BUCKET_BOUNDS_HOURS[index - 1] if index else 0
+            if index == len(DWELL_BUCKET_BOUNDS_HOURS):
+                # Open-ended bucket: report its lower bound
+                return float(lower)
+            upper = DWELL_BUCKET_BOUNDS_HOURS[index]
+            return round(lower + (target - seen) / in_bucket * (upper - lower), 1)
+        seen += in_bucket
+    return None
+
+
+def _stage_order(stage: str) -> tuple:
+    """Sort stages in workflow order, unknown stages last."""
+    if stage in WORKFLOW_SEQUENCE:
+        return (WORKFLOW_SEQUENCE.index(stage), stage)
+    return (len(WORKFLOW_SEQUENCE), stage)
+
+
+async def stage_report(db) -> Dict[str, Any]:
+    """
+    Build the stage dwell and rejection loop report.
+
+    Args:
+        db: Database instance
+
+    Returns:
+        Dictionary with per-stage dwell statistics (hours) and rejection loops
+    """
+    stages = []
+    async for doc in db.stage_dwell.find():
+        count = doc.get("count", 0)
+        buckets = doc.get("buckets", {})
+        stages.append({
+            "stage": doc["_id"],
+            "reviews": count,
+            "approved": doc.get("approved", 0),
+            "rejected": doc.get("rejected", 0),
+            "mean_hours": round(doc.get("total_ms", 0) / count / MS_PER_HOUR, 1) if count else None,
+            "median_hours": _percentile_hours(buckets, count, 0.5),
+            "p90_hours": _percentile_hours(buckets, count, 0.9)
+        })
+    stages.sort(key=lambda row: _stage_order(row["stage"]))
+
+    # Most-rejected projects straight from the rejection_count index
+    top_projects = await db.projects.find(
+        {"rejection_count": {"$gt": 0}},
+        {"project_name": 1, "rejection_count": 1, "current_stage": 1}
+    ).sort("rejection_count", -1).limit(TOP_REJECTED_PROJECTS).to_list(length=TOP_REJECTED_PROJECTS)
+
+    total_rejections = sum(row["rejected"] for row in stages)
+    rejected_projects = await db.projects.count_documents({"rejection_count": {"$gt": 0}})
+
+    return {
+        "stages": stages,
+        "rejection_loops": {
+            "total_rejections": total_rejections,
+            "projects_with_rejections": rejected_projects,
+            "average_per_rejected_project": round(total_rejections / rejected_projects, 2) if rejected_projects else 0,
+            "top_projects": [
+                {
+                    "project_id": str(project["_id"]),
+                    "project_name": project.get("project_name"),
+                    "current_stage": project.get("current_stage"),
+                    "rejection_count": project["rejection_count"]
+                }
+                for project in top_projects
+            ]
+        }
+    }
+
+
+async def _bulk_write(collection, operations: List[UpdateOne]) -> int:
+    """Apply update operations in bounded batches and return the number modified."""
+    modified = 0
+    for start in range(0, len(operations), BULK_WRITE_BATCH):
+        result = await collection.bulk_write(operations[start:start + BULK_WRITE_BATCH], ordered=False)
+        modified += result.modified_count
+    return modified
+
+
+async def rebuild_stage_dwell(db) -> Dict[str, int]:
+    """
+    Recompute stage histograms and rejection counts from the approvals.
+
+    Approvals recorded before dwell times were tracked get a ``dwell_ms``
+    derived from the previous stage entry of the same project: its last
+    approval or upload, or its creation. Reviews recorded while the rebuild
+    runs may be lost; run it when the system is quiet.
+
+    Args:
+        db: Database instance
+
+    Returns:
+        Dictionary with the number of approvals scanned and backfilled, stages
+        rebuilt and projects whose rejection count changed
+    """
+    project_created = {
+        project["_id"]: project.get("created_at")
+        async for project in db.projects.find({}, {"created_at": 1})
+    }
+    upload_times = defaultdict(list)
+    async for upload in db.uploads.find({}, {"project_id": 1, "uploaded_at": 1}):
+        if upload.get("uploaded_at"):
+            upload_times[upload["project_id"]].append(upload["uploaded_at"])
+
+    stages: Dict[str, Dict[str, Any]] = {}
+    rejections: Dict[Any, int] = defaultdict(int)
+    backfill = []
+    scanned = 0
+    current_project = None
+    entered_at = None
+
+    cursor = db.approvals.find(
+        {}, {"project_id": 1, "stage": 1, "status": 1, "created_at": 1, "dwell_ms": 1}
+    ).sort([("project_id", 1), ("created_at", 1)])
+
+    async for approval in cursor:
+        scanned += 1
+        project_id = approval.get("project_id")
+        reviewed_at = approval.get("created_at")
+        if project_id != current_project:
+            current_project = project_id
+            entered_at = project_created.get(project_id)
+
+        dwell_ms = approval.get("dwell_ms")
+        if dwell_ms is None and reviewed_at:
+            entries = [entered_at] + [time for time in upload_times.get(project_id, []) if time <= reviewed_at]
+            dwell_ms = dwell_ms_between(max((time for time in entries if time), default=None), reviewed_at)
+            if dwell_ms is not None:
+                backfill.append(UpdateOne({"_id": approval["_id"]}, {"$set": {"dwell_ms": dwell_ms}}))
+        entered_at = reviewed_at or entered_at
+
+        approved = approval.get("status") == "approved"
+        if not approved:
+            rejections[project_id] += 1
+        if dwell_ms is not None:
+            stage = stages.setdefault(
+                approval["stage"],
+                {"count": 0, "approved": 0, "rejected": 0, "total_ms": 0, "buckets": {}}
+            )
+            for field, delta in _stage_increment(approved, dwell_ms).items():
+                if field.startswith("buckets."):
+                    bucket = field.split(".", 1)[1]
+                    stage["buckets"][bucket] = stage["buckets"].get(bucket, 0) + delta
+                else:
+                    stage[field] += delta
+
+    await _bulk_write(db.approvals, backfill)
+
+    await db.stage_dwell.delete_many({})
+    if stages:
+        await db.stage_dwell.insert_many([{"_id": name, **values} for name, values in stages.items()])
+
+    # Only touch projects whose stored count differs
+    changed = [
+        UpdateOne({"_id": project_id, "rejection_count": {"$ne": count}}, {"$set": {"rejection_count": count}})
+        for project_id, count in rejections.items()
+    ]
+    updated = await _bulk_write(db.projects, changed)
+    cleared = await db.projects.update_many(
+        {"_id": {"$nin": list(rejections)}, "rejection_count": {"$nin": [0, None]}},
+        {"$set": {"rejection_count": 0}}
+    )
+
+    return {
+        "approvals_scanned": scanned,
+        "approvals_backfilled": len(backfill),
+        "stages": len(stages),
+        "projects_updated": updated + cleared.modified_count
+    }
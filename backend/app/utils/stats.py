@@ -0,0 +1,238 @@
+"""
+Incrementally maintained analytics rollup.
+
+A single ``stats`` document holds the dashboard counters. Routes that change
+project stages, task statuses or user roles apply atomic ``$inc`` deltas to
+it, so reading the dashboard no longer scans the collections. Time-relative
+figures (recent projects, overdue tasks) cannot be kept as counters and are
+still counted from indexed queries.
+
+Every update also increments the document's ``version``. ``reconcile_stats``
+recounts everything from scratch, reports drift and writes the recounted
+values only if the version is unchanged since it read the document, so a
+delta written concurrently is never overwritten or counted twice; on a
+conflict it recounts again.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+from app.utils.analytics_queries import (
+    compute_collection_summaries,
+    dashboard_response,
+    summaries_to_counters
+)
+
+STATS_ID = "dashboard"
+
+# Recounts attempted by reconcile_stats before giving up on concurrent writes
+RECONCILE_ATTEMPTS = 5
+
+# (counter path, delta) pair, e.g. ("projects.by_status.designer", 1)
+Change = Tuple[str, int]
+
+
+def _encode_key(value: str) -> str:
+    """Escape characters MongoDB does not allow in field names."""
+    return str(value).replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+
+def _decode_key(key: str) -> str:
+    """Reverse _encode_key."""
+    return key.replace("%24", "$").replace("%2E", ".").replace("%25", "%")
+
+
+def counter(*parts: Any) -> str:
+    """
+    Build a counter path with escaped bucket names.
+
+    Args:
+        parts: Path components, e.g. ("tasks", "by_status", "pending")
+
+    Returns:
+        Dotted field path inside the stats document
+    """
+    return ".".join(_encode_key(part) for part in parts)
+
+
+def transition(group: str, bucket: str, old: Optional[str], new: Optional[str]) -> Iterable[Change]:
+    """
+    Changes moving one document between buckets.
+
+    Args:
+        group: Collection group ("projects", "tasks", "users")
+        bucket: Bucket map name (e.g. "by_status")
+        old: Previous value, or None if the document was not counted
+        new: New value, or None if the document is no longer counted
+
+    Returns:
+        Counter changes (empty when the value is unchanged)
+    """
+    if old == new:
+        return []
+    changes = []
+    if old is not None:
+        changes.append((counter(group, bucket, old), -1))
+    if new is not None:
+        changes.append((counter(group, bucket, new), 1))
+    return changes
+
+
+def design_type_bucket(design_type: Optional[str]) -> Optional[str]:
+    """Design type as counted in projects.by_type (None if not counted)."""
+    if not design_type or design_type == "Not specified":
+        return None
+    return design_type
+
+
+def approval_days(project: dict) -> int:
+    """Whole days from creation to completion for a completed project."""
+    completed_at = project.get("actual_completion_date") or project.get("updated_at")
+    if not project.get("created_at") or not completed_at:
+        return 0
+    return (completed_at - project["created_at"]).days
+
+
+async def record(db, *changes: Change) -> None:
+    """
+    Apply counter changes to the rollup document in one atomic update.
+
+    Nothing is written before the rollup has been seeded (see ensure_stats),
+    so a partial document is never mistaken for complete counters.
+
+    Args:
+        db: Database instance
+        changes: (counter path, delta) pairs
+    """
+    deltas: Dict[str, int] = {}
+    for path, delta in changes:
+        deltas[path] = deltas.get(path, 0) + delta
+    deltas = {path: delta for path, delta in deltas.items() if delta}
+
+    if deltas:
+        await db.stats.update_one(
+            {"_id": STATS_ID},
+            {"$inc": {**deltas, "version": 1}, "$set": {"updated_at": datetime.utcnow()}}
+        )
+
+
+def _flatten(counters: Dict[str, Any], prefix: Tuple[str, ...] = ()) -> Dict[str, int]:
+    """Flatten nested counters into encoded dotted paths."""
+    flat = {}
+    for key, value in counters.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, prefix + (key,)))
+        elif value:
+            flat[counter(*prefix, key)] = value
+    return flat
+
+
+def _unflatten(flat: Dict[str, int]) -> Dict[str, Any]:
+    """Expand dotted counter paths into a nested document."""
+    nested: Dict[str, Any] = {}
+    for path, value in flat.items():
+        target = nested
+        *parents, leaf = path.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = value
+    return nested
+
+
+def _counters_from_document(document: dict) -> Dict[str, dict]:
+    """Decode the stored rollup document into nested counters."""
+    def section(name: str, buckets: Iterable[str], scalars: Iterable[str]) -> dict:
+        stored = document.get(name, {})
+        result = {scalar: stored.get(scalar, 0) for scalar in scalars}
+        for bucket in buckets:
+            result[bucket] = {
+                _decode_key(key): value for key, value in stored.get(bucket, {}).items()
+            }
+        return result
+
+    return {
+        "projects": section("projects", ["by_status", "by_type"], ["total", "posted", "approval_days_total"]),
+        "tasks": section("tasks", ["by_status"], ["total"]),
+        "users": section("users", ["by_role"], ["total"])
+    }
+
+
+async def reconcile_stats(db, apply: bool = True) -> Dict[str, Any]:
+    """
+    Recount the rollup from the collections and report drift.
+
+    Args:
+        db: Database instance
+        apply: Correct the stored counters when True
+
+    Returns:
+        Dictionary with "seeded" (no rollup existed), "drift" mapping each
+        differing counter path to its stored and actual value, and "applied"
+        (False if not requested, or if counters kept changing during every
+        recount)
+    """
+    for _ in range(RECONCILE_ATTEMPTS):
+        stored = await db.stats.find_one({"_id": STATS_ID}) or {}
+        summaries = await compute_collection_summaries(db, datetime.now())
+        actual = _flatten(summaries_to_counters(summaries))
+        current = _flatten(_counters_from_document(stored)) if stored else {}
+
+        drift = {}
+        for path in sorted(set(actual) | set(current)):
+            if actual.get(path, 0) != current.get(path, 0):
+                drift[path] = {"stored": current.get(path, 0), "actual": actual.get(path, 0)}
+
+        if not apply or (stored and not drift):
+            return {"seeded": not stored, "drift": drift, "applied": apply}
+
+        version = stored.get("version", 0)
+        document = {**_unflatten(actual), "version": version + 1, "updated_at": datetime.utcnow()}
+        if not stored:
+            # Nothing is recorded before seeding, so there is nothing to lose
+            await db.stats.replace_one({"_id": STATS_ID}, document, upsert=True)
+            return {"seeded": True, "drift": drift, "applied": True}
+
+        # Absolute values, written only if no delta landed since the read
+        version_filter = version if "version" in stored else {"$exists": False}
+        result = await db.stats.replace_one({"_id": STATS_ID, "version": version_filter}, document)
+        if result.matched_count:
+            return {"seeded": False, "drift": drift, "applied": True}
+
+    return {"seeded": False, "drift": drift, "applied": False}
+
+
+async def ensure_stats(db) -> None:
+    """
+    Seed the rollup from a full recount if it does not exist yet.
+
+    Args:
+        db: Database instance
+    """
+    if await db.stats.find_one({"_id": STATS_ID}, {"_id": 1}) is None:
+        await reconcile_stats(db, apply=True)
+        print("✅ Seeded analytics rollup counters")
+
+
+async def read_dashboard(db) -> Optional[Dict[str, Any]]:
+    """
+    Build the dashboard response from the rollup counters.
+
+    Args:
+        db: Database instance
+
+    Returns:
+        Dashboard analytics dictionary, or None if the rollup is not seeded
+    """
+    document = await db.stats.find_one({"_id": STATS_ID})
+    if document is None:
+        return None
+
+    now = datetime.now()
+    recent_projects, overdue_tasks = await asyncio.gather(
+        db.projects.count_documents({"created_at": {"$gte": now - timedelta(days=7)}}),
+        db.tasks.count_documents({
+            "status": {"$in": ["pending", "in_progress"]},
+            "due_date": {"$lt": now}
+        })
+    )
+
+    return dashboard_response(_counters_from_document(document), recent_projects, overdue_tasks)
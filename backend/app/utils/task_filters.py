@@ -0,0 +1,91 @@
+"""
+Task query builders shared by the task listing, calendar and export routes.
+"""
+from datetime import datetime
+from typing import Optional
+from app.models.user import UserResponse
+
+
+def task_visibility_query(current_user: UserResponse) -> dict:
+    """
+    Restrict tasks to those the user may see.
+
+    Admin and Manager see all tasks; others see tasks they are assigned
+    to or created.
+
+    Args:
+        current_user: Current authenticated user
+
+    Returns:
+        MongoDB filter
+    """
+    if current_user.role in ["Admin", "Manager"]:
+        return {}
+
+    return {
+        "$or": [
+            {"assigned_to": {"$in": [current_user.id]}},
+            {"created_by": current_user.id}
+        ]
+    }
+
+
+def date_range_query(date_from: Optional[datetime], date_to: Optional[datetime]) -> Optional[dict]:
+    """
+    Build a half-open [date_from, date_to) range condition.
+
+    Args:
+        date_from: Inclusive lower bound
+        date_to: Exclusive upper bound
+
+    Returns:
+        Range condition or None if neither bound is set
+    """
+    condition = {}
+    if date_from:
+        condition["$gte"] = date_from
+    if date_to:
+        condition["$lt"] = date_to
+    return condition or None
+
+
+def build_task_query(
+    current_user: UserResponse,
+    task_status: Optional[str] = None,
+    priority: Optional[str] = None,
+    project_id: Optional[str] = None,
+    assignee: Optional[str] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None
+) -> dict:
+    """
+    Build the filter for a task listing.
+
+    Args:
+        current_user: Current authenticated user
+        task_status: Optional task status
+        priority: Optional task priority
+        project_id: Optional linked project ID
+        assignee: Optional assigned user ID
+        due_from: Optional inclusive lower bound on due_date
+        due_to: Optional exclusive upper bound on due_date
+
+    Returns:
+        MongoDB filter
+    """
+    query = task_visibility_query(current_user)
+
+    if task_status:
+        query["status"] = task_status
+    if priority:
+        query["priority"] = priority
+    if project_id:
+        query["project_id"] = project_id
+    if assignee:
+        query["assigned_to"] = assignee
+
+    due_range = date_range_query(due_from, due_to)
+    if due_range:
+        query["due_date"] = due_range
+
+    return query
@@ -0,0 +1,273 @@
+"""
+Preview derivatives: downscaled thumbnails of images and first-page
+renders of PDFs.
+
+Derivatives are generated after the upload response has been sent, on a
+process pool so decoding never blocks the event loop, and kept in file
+storage. The ``derivatives`` collection links each original file and
+named size to its derivative file and tracks its status (``pending``,
+``ready``, ``failed`` or ``unsupported``). Previews fall back to the
+original until a derivative is ready.
+
+Rendering needs the optional Pillow (images) and PyMuPDF (PDFs)
+packages; without them, previews of those types always fall back to the
+original.
+"""
+import asyncio
+import importlib.util
+import io
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+from fastapi import BackgroundTasks
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.utils.file_storage import delete_stored_file, open_stored_file, save_file
+
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+HAS_PYMUPDF = importlib.util.find_spec("fitz") is not None
+
+PDF_CONTENT_TYPE = "application/pdf"
+
+# Pending derivatives older than this are assumed abandoned and regenerated
+PENDING_TIMEOUT = timedelta(minutes=10)
+
+# Worker pool for rendering (created lazily on first use)
+_executor: Optional[Executor] = None
+
+
+def can_render(content_type: Optional[str]) -> bool:
+    """
+    Check whether previews can be rendered for a MIME type.
+
+    Args:
+        content_type: MIME content type
+
+    Returns:
+        True for images when Pillow is installed and PDFs when PyMuPDF is
+    """
+    content_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if content_type == PDF_CONTENT_TYPE:
+        return HAS_PYMUPDF
+    return HAS_PILLOW and content_type.startswith("image/") and content_type != "image/svg+xml"
+
+
+def _encode_image(image) -> Tuple[bytes, str]:
+    """Encode a Pillow image as WebP, or PNG if WebP is unavailable."""
+    from PIL import features
+
+    output = io.BytesIO()
+    if features.check("webp"):
+        image.save(output, format="WEBP", quality=settings.thumbnail_webp_quality)
+        return output.getvalue(), "image/webp"
+    image.save(output, format="PNG", optimize=True)
+    return output.getvalue(), "image/png"
+
+
+def _render_image(data: bytes, sizes: Dict[str, int]) -> Dict[str, Tuple[bytes, str]]:
+    """Downscale an image to fit each size's bounding square."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        # First frame of animations, upright according to EXIF
+        source.seek(0)
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        rendered = {}
+        for name, pixels in sizes.items():
+            thumbnail = image.copy()
+            thumbnail.thumbnail((pixels, pixels))
+            rendered[name] = _encode_image(thumbnail)
+        return rendered
+
+
+def _render_pdf(data: bytes, sizes: Dict[str, int]) -> Dict[str, Tuple[bytes, str]]:
+    """Render the first page of a PDF to fit each size's bounding square."""
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+
+    with pymupdf.open(stream=data, filetype="pdf") as document:
+        page = document[0]
+        longest_side = max(page.rect.width, page.rect.height)
+        rendered = {}
+        for name, pixels in sizes.items():
+            zoom = pixels / longest_side
+            pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom))
+            rendered[name] = (pixmap.tobytes("png"), "image/png")
+        return rendered
+
+
+def render_derivatives(data: bytes, content_type: str, sizes: Dict[str, int]) -> Dict[str, Tuple[bytes, str]]:
+    """
+    Render preview derivatives of a file (runs in a worker process).
+
+    Args:
+        data: Original file bytes
+        content_type: Original MIME type
+        sizes: Size name -> longest side in pixels
+
+    Returns:
+        Size name -> (derivative bytes, derivative MIME type)
+    """
+    if content_type.split(";", 1)[0].strip().lower() == PDF_CONTENT_TYPE:
+        return _render_pdf(data, sizes)
+    return _render_image(data, sizes)
+
+
+def _get_executor() -> Executor:
+    """Get the rendering worker pool, creating it on first use."""
+    global _executor
+
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.thumbnail_workers)
+
+    return _executor
+
+
+def shutdown_thumbnail_pool() -> None:
+    """Shut down the rendering worker pool."""
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+async def _claim(db, file_id: ObjectId, sizes: List[str], status: str = "pending") -> List[str]:
+    """Create derivative records for the sizes nobody else is generating."""
+    claimed = []
+    now = datetime.utcnow()
+    for size in sizes:
+        try:
+            await db.derivatives.insert_one({
+                "source_file_id": file_id,
+                "size": size,
+                "status": status,
+                "created_at": now,
+                "updated_at": now
+            })
+            claimed.append(size)
+        except DuplicateKeyError:
+            # Take over generation abandoned by a worker that stopped
+            result = await db.derivatives.update_one(
+                {
+                    "source_file_id": file_id,
+                    "size": size,
+                    "status": "pending",
+                    "updated_at": {"$lt": now - PENDING_TIMEOUT}
+                },
+                {"$set": {"status": status, "updated_at": now}}
+            )
+            if result.modified_count:
+                claimed.append(size)
+    return claimed
+
+
+async def _mark(db, file_id: ObjectId, sizes: List[str], fields: dict) -> None:
+    """Update the derivative records of some sizes."""
+    await db.derivatives.update_many(
+        {"source_file_id": file_id, "size": {"$in": sizes}},
+        {"$set": {**fields, "updated_at": datetime.utcnow()}}
+    )
+
+
+async def generate_derivatives(db, file_id: ObjectId) -> None:
+    """
+    Generate every configured preview size of a stored file.
+
+    Sizes that already have a record (generated, failed or in progress)
+    are skipped, so concurrent or repeated calls render each size once.
+
+    Args:
+        db: Database instance
+        file_id: Original file ObjectId
+    """
+    original = await open_stored_file(file_id)
+    if original is None:
+        return
+
+    content_type = original.content_type or ""
+    if not can_render(content_type) or original.length > settings.thumbnail_max_source_bytes:
+        await _claim(db, file_id, list(settings.thumbnail_sizes), status="unsupported")
+        return
+
+    sizes = await _claim(db, file_id, list(settings.thumbnail_sizes))
+    if not sizes:
+        return
+
+    try:
+        data = await original.read()
+        loop = asyncio.get_running_loop()
+        rendered = await loop.run_in_executor(
+            _get_executor(),
+            render_derivatives,
+            data,
+            content_type,
+            {size: settings.thumbnail_sizes[size] for size in sizes}
+        )
+    except Exception as exc:
+        await _mark(db, file_id, sizes, {"status": "failed", "error": str(exc)[:500]})
+        print(f"⚠️ Preview generation failed for {file_id}: {exc}")
+        return
+
+    for size, (derivative, derivative_type) in rendered.items():
+        extension = derivative_type.split("/", 1)[1]
+        derivative_id = await save_file(
+            derivative,
+            f"{original.filename}.{size}.{extension}",
+            derivative_type,
+            metadata={"derivative_of": file_id, "size": size}
+        )
+        await _mark(db, file_id, [size], {
+            "status": "ready",
+            "file_id": derivative_id,
+            "content_type": derivative_type,
+            "length": len(derivative)
+        })
+
+
+def schedule_derivatives(background_tasks: BackgroundTasks, db, file_id: Any, content_type: Optional[str]) -> None:
+    """
+    Queue preview generation to run after the response is sent.
+
+    Args:
+        background_tasks: Request background tasks
+        db: Database instance
+        file_id: Original file ObjectId or ID string
+        content_type: Original MIME type (nothing is queued if it cannot be rendered)
+    """
+    if settings.thumbnails_enabled and can_render(content_type):
+        background_tasks.add_task(generate_derivatives, db, ObjectId(file_id))
+
+
+async def find_derivative(db, file_id: ObjectId, size: str) -> Optional[dict]:
+    """
+    Get the derivative record of one size of a file.
+
+    Args:
+        db: Database instance
+        file_id: Original file ObjectId
+        size: Size name
+
+    Returns:
+        Derivative record, or None if generation was never started
+    """
+    return await db.derivatives.find_one({"source_file_id": file_id, "size": size})
+
+
+async def delete_derivatives(db, file_id: ObjectId) -> None:
+    """
+    Delete every derivative of a file that is being removed.
+
+    Args:
+        db: Database instance
+        file_id: Original file ObjectId
+    """
+    async for derivative in db.derivatives.find({"source_file_id": file_id, "file_id": {"$exists": True}}):
+        await delete_stored_file(derivative["file_id"])
+    await db.derivatives.delete_many({"source_file_id": file_id})
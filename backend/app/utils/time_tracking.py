@@ -0,0 +1,182 @@
+"""
+Time tracking from task timer sessions.
+
+Every paused timer session is appended to ``time_entries`` and added to
+``time_daily`` rollups keyed by (user_id, project_id, day), split at
+midnight UTC. Reports read the rollups, so their cost depends on the number
+of users, projects and days in range rather than on the number of tasks
+or sessions.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from app.utils.resolvers import BatchResolver
+
+MS_PER_HOUR = 60 * 60 * 1000
+
+TimeGrouping = Literal["user", "project", "day", "week"]
+
+
+def split_by_day(started_at: datetime, ended_at: datetime) -> List[Tuple[str, int]]:
+    """
+    Split a session into per-day portions at midnight.
+
+    Args:
+        started_at: Session start
+        ended_at: Session end
+
+    Returns:
+        List of (ISO day, milliseconds) pairs
+    """
+    portions = []
+    current = started_at
+    while current < ended_at:
+        next_midnight = datetime.combine(current.date() + timedelta(days=1), time(), tzinfo=current.tzinfo)
+        portion_end = min(next_midnight, ended_at)
+        portions.append((current.date().isoformat(), int((portion_end - current).total_seconds() * 1000)))
+        current = portion_end
+    return portions
+
+
+async def record_time_entry(
+    db,
+    task: dict,
+    user_id: str,
+    started_at: Optional[datetime],
+    ended_at: datetime
+) -> None:
+    """
+    Append a timer session and add it to the daily rollups.
+
+    Args:
+        db: Database instance
+        task: Task document the timer ran on
+        user_id: User the time is attributed to
+        started_at: Session start (nothing is recorded when unknown)
+        ended_at: Session end
+    """
+    if not started_at or ended_at <= started_at:
+        return
+
+    project_id = task.get("project_id")
+    await db.time_entries.insert_one({
+        "task_id": str(task["_id"]),
+        "project_id": project_id,
+        "user_id": user_id,
+        "started_at": started_at,
+        "ended_at": ended_at,
+        "duration_ms": int((ended_at - started_at).total_seconds() * 1000),
+        "created_at": datetime.utcnow()
+    })
+
+    for day, duration_ms in split_by_day(started_at, ended_at):
+        await db.time_daily.update_one(
+            {"user_id": user_id, "project_id": project_id, "day": day},
+            {"$inc": {"duration_ms": duration_ms, "sessions": 1}},
+            upsert=True
+        )
+
+
+def _week_start(day: str) -> str:
+    """Monday of the ISO week containing an ISO day."""
+    parsed = date.fromisoformat(day)
+    return (parsed - timedelta(days=parsed.weekday())).isoformat()
+
+
+async def _allocated_hours(db, group_by: TimeGrouping, keys: List[Any]) -> Dict[Any, float]:
+    """Total allocated task hours per user or project."""
+    match = {"allocated_hours": {"$gt": 0}}
+    if group_by == "user":
+        pipeline = [
+            {"$match": {**match, "assigned_to": {"$in": keys}}},
+            {"$unwind": "$assigned_to"},
+            {"$match": {"assigned_to": {"$in": keys}}},
+            {"$group": {"_id": "$assigned_to", "hours": {"$sum": "$allocated_hours"}}}
+        ]
+    else:
+        pipeline = [
+            {"$match": {**match, "project_id": {"$in": keys}}},
+            {"$group": {"_id": "$project_id", "hours": {"$sum": "$allocated_hours"}}}
+        ]
+    return {row["_id"]: row["hours"] async for row in db.tasks.aggregate(pipeline)}
+
+
+async def time_report(
+    db,
+    group_by: TimeGrouping,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    user_id: Optional[str] = None,
+    project_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Report tracked hours from the daily rollups.
+
+    Grouped by user or project, each row also carries the total
+    ``allocated_hours`` of that user's (full allocation per assignee) or
+    project's tasks. Allocations are not dated, so utilization is most
+    meaningful without a date range. Sessions spanning midnight count once
+    per day.
+
+    Args:
+        db: Database instance
+        group_by: "user", "project", "day" or "week" (weeks start Monday)
+        date_from: Inclusive first day
+        date_to: Inclusive last day
+        user_id: Only time tracked by this user
+        project_id: Only time tracked on this project
+
+    Returns:
+        List of rows with the group key, tracked hours and sessions
+    """
+    match: Dict[str, Any] = {}
+    day_range = {}
+    if date_from:
+        day_range["$gte"] = date_from.isoformat()
+    if date_to:
+        day_range["$lte"] = date_to.isoformat()
+    if day_range:
+        match["day"] = day_range
+    if user_id:
+        match["user_id"] = user_id
+    if project_id:
+        match["project_id"] = project_id
+
+    group_field = {"user": "$user_id", "project": "$project_id"}.get(group_by, "$day")
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": group_field,
+            "duration_ms": {"$sum": "$duration_ms"},
+            "sessions": {"$sum": "$sessions"}
+        }}
+    ]
+    totals: Dict[Any, Dict[str, int]] = defaultdict(lambda: {"duration_ms": 0, "sessions": 0})
+    async for row in db.time_daily.aggregate(pipeline):
+        key = _week_start(row["_id"]) if group_by == "week" else row["_id"]
+        totals[key]["duration_ms"] += row["duration_ms"]
+        totals[key]["sessions"] += row["sessions"]
+
+    allocated = {}
+    names = None
+    if group_by in ("user", "project"):
+        keys = [key for key in totals if key is not None]
+        allocated = await _allocated_hours(db, group_by, keys)
+        if group_by == "user":
+            names = BatchResolver(db.users, ["name"])
+        else:
+            names = BatchResolver(db.projects, ["project_name"])
+        names.add(*keys)
+        await names.load()
+
+    rows = []
+    for key in sorted(totals, key=lambda value: (value is None, value or "")):
+        tracked_hours = round(totals[key]["duration_ms"] / MS_PER_HOUR, 2)
+        row = {group_by: key, "tracked_hours": tracked_hours, "sessions": totals[key]["sessions"]}
+        if names is not None:
+            row["name"] = names.value(key, "name" if group_by == "user" else "project_name")
+            allocated_hours = allocated.get(key)
+            row["allocated_hours"] = allocated_hours
+            row["utilization"] = round(tracked_hours / allocated_hours, 2) if allocated_hours else None
+        rows.append(row)
+    return rows
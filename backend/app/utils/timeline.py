@@ -0,0 +1,188 @@
+"""
+Server-side bucketed timelines.
+
+Documents are grouped into day, week or month buckets with ``$dateTrunc``
+in the requested timezone, so only one count per bucket leaves MongoDB.
+Empty buckets are filled in from calendar arithmetic on the window bounds,
+without reading any documents. Requires MongoDB 5.0+.
+
+Stored datetimes are naive UTC. Task ``created_at`` and ``completed_at``
+values written before tasks switched to UTC hold server local time and
+are bucketed as if they were UTC, shifted by the server's UTC offset
+(no shift on servers running in UTC).
+"""
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Literal, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from fastapi import HTTPException, status
+
+Granularity = Literal["day", "week", "month"]
+
+# Series name -> (collection, date field, extra filter)
+TIMELINE_SERIES: Dict[str, Tuple[str, str, dict]] = {
+    "projects_created": ("projects", "created_at", {}),
+    "tasks_created": ("tasks", "created_at", {}),
+    "tasks_completed": ("tasks", "completed_at", {"status": "completed"}),
+}
+
+
+def get_timezone(name: str) -> ZoneInfo:
+    """
+    Resolve an IANA timezone name.
+
+    Args:
+        name: Timezone name, e.g. "Europe/Berlin"
+
+    Returns:
+        ZoneInfo instance
+
+    Raises:
+        HTTPException: If the timezone is unknown
+    """
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown timezone: {name}"
+        )
+
+
+def truncate_date(day: date, granularity: Granularity) -> date:
+    """Start of the bucket containing a local date (weeks start on Monday)."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day: date, granularity: Granularity) -> date:
+    """Start of the bucket following the one starting at ``day``."""
+    if granularity == "week":
+        return day + timedelta(days=7)
+    if granularity == "month":
+        return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+    return day + timedelta(days=1)
+
+
+def bucket_keys(first: date, last: date, granularity: Granularity) -> List[str]:
+    """
+    List every bucket between two local dates.
+
+    Args:
+        first: First local date in the window
+        last: Last local date in the window
+        granularity: Bucket size
+
+    Returns:
+        ISO dates of each bucket start, in order
+    """
+    keys = []
+    current = truncate_date(first, granularity)
+    while current <= last:
+        keys.append(current.isoformat())
+        current = next_bucket(current, granularity)
+    return keys
+
+
+def timeline_window(days: int, granularity: Granularity, tz: ZoneInfo) -> Tuple[datetime, List[str]]:
+    """
+    Compute the query start and bucket keys for the last ``days`` days.
+
+    The window is widened to begin at the start of its first bucket so every
+    bucket is complete.
+
+    Args:
+        days: Number of days back from now
+        granularity: Bucket size
+        tz: Timezone buckets are aligned to
+
+    Returns:
+        Tuple of (naive UTC start for the query, bucket keys)
+    """
+    now_local = datetime.now(timezone.utc).astimezone(tz)
+    first = truncate_date((now_local - timedelta(days=days)).date(), granularity)
+    start = datetime.combine(first, time(), tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+    return start, bucket_keys(first, now_local.date(), granularity)
+
+
+def timeline_pipeline(field: str, match: dict, start: datetime, granularity: Granularity, tz_name: str) -> List[dict]:
+    """
+    Build an aggregation counting documents per time bucket.
+
+    Args:
+        field: Date field to bucket on
+        match: Extra filter
+        start: Naive UTC lower bound for the date field
+        granularity: Bucket size
+        tz_name: Timezone name buckets are aligned to
+
+    Returns:
+        Aggregation pipeline producing {_id: "YYYY-MM-DD", count} documents
+    """
+    truncate = {"date": f"${field}", "unit": granularity, "timezone": tz_name}
+    if granularity == "week":
+        truncate["startOfWeek"] = "monday"
+    bucket_start = {"$dateTrunc": truncate}
+    return [
+        {"$match": {**match, field: {"$gte": start}}},
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": bucket_start, "timezone": tz_name}},
+            "count": {"$sum": 1}
+        }}
+    ]
+
+
+async def bucket_counts(db, series: str, start: datetime, granularity: Granularity, tz_name: str) -> Dict[str, int]:
+    """
+    Count one series per bucket.
+
+    Args:
+        db: Database instance
+        series: Key of TIMELINE_SERIES
+        start: Naive UTC lower bound
+        granularity: Bucket size
+        tz_name: Timezone name
+
+    Returns:
+        Dictionary of bucket key to count (empty buckets omitted)
+    """
+    collection, field, match = TIMELINE_SERIES[series]
+    cursor = db[collection].aggregate(timeline_pipeline(field, match, start, granularity, tz_name))
+    return {bucket["_id"]: bucket["count"] async for bucket in cursor}
+
+
+async def build_timeline(
+    db,
+    series: List[str],
+    days: int,
+    granularity: Granularity,
+    tz_name: str
+) -> List[Dict[str, object]]:
+    """
+    Build a zero-filled timeline for several series.
+
+    Args:
+        db: Database instance
+        series: Keys of TIMELINE_SERIES to include
+        days: Number of days back from now
+        granularity: Bucket size
+        tz_name: Timezone name
+
+    Returns:
+        One {"date", <series>: count, ...} entry per bucket, oldest first
+
+    Raises:
+        HTTPException: If the timezone is unknown
+    """
+    start, keys = timeline_window(days, granularity, get_timezone(tz_name))
+    counts = await asyncio.gather(*(
+        bucket_counts(db, name, start, granularity, tz_name) for name in series
+    ))
+
+    return [
+        {"date": key, **{name: series_counts.get(key, 0) for name, series_counts in zip(series, counts)}}
+        for key in keys
+    ]
@@ -0,0 +1,77 @@
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+from pydantic import TypeAdapter
+from app.models.task import Checkpoint, TaskResponse
+from app.utils.serialization import TrustedJSONResponse
+
+TASK_COUNT = 5000
+ROUNDS = 5
+
+def make_task_fields(i):
+    now = datetime(2024, 1, 1) + timedelta(minutes=i)
+    return {
+        "id": str(ObjectId()),
+        "title": f"Task {i}",
+        "description": "Prepare the campaign assets",
+        "assigned_to": [str(ObjectId()), str(ObjectId())],
+        "assigned_to_names": ["Designer One", "Designer Two"],
+        "project_id": str(ObjectId()),
+        "project_name": "Spring Campaign",
+        "due_date": now + timedelta(days=7),
+        "priority": "medium",
+        "status": "in_progress",
+        "created_by": str(ObjectId()),
+        "created_by_name": "Manager",
+        "created_at": now,
+        "updated_at": now,
+        "design_type": "poster",
+        "checkpoints": [{"title": "Draft", "completed": True}, {"title": "Final", "completed": False}],
+        "allocated_hours": 4.5,
+        "start_time": now,
+        "time_spent_ms": 120000,
+        "is_timer_running": False,
+        "file_id": None,
+        "filename": None,
+        "uploaded_at": None
+    }
+
+def validated_path(rows):
+    # Model built field by field, then re-validated and encoded like response_model does
+    models = [TaskResponse(**row) for row in rows]
+    adapter = TypeAdapter(List[TaskResponse])
+    content = adapter.validate_python([model.model_dump() for model in models])
+    return json.dumps(adapter.dump_python(content, mode="json")).encode()
+
+def trusted_path(rows):
+    models = [
+        TaskResponse.model_construct(**{
+            **row,
+            "checkpoints": [Checkpoint.model_construct(**cp) for cp in row["checkpoints"]]
+        })
+        for row in rows
+    ]
+    return TrustedJSONResponse(models).body
+
+def best_of(func, rows):
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        body = func(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings), body
+
+if __name__ == "__main__":
+    rows = [make_task_fields(i) for i in range(TASK_COUNT)]
+
+    validated_time, validated_body = best_of(validated_path, rows)
+    trusted_time, trusted_body = best_of(trusted_path, rows)
+
+    assert json.loads(validated_body) == json.loads(trusted_body), "serialized output differs"
+
+    print(f"{TASK_COUNT} tasks, best of {ROUNDS} rounds")
+    print(f"  validated + json : {validated_time * 1000:8.1f} ms")
+    print(f"  trusted + orjson : {trusted_time * 1000:8.1f} ms")
+    print(f"  speedup          : {validated_time / trusted_time:8.1f}x")
@@ -0,0 +1,32 @@
+import argparse
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import settings
+from app.utils.indexes import check_indexes, ensure_indexes
+
+async def main(apply: bool):
+    client = AsyncIOMotorClient(settings.mongodb_uri)
+    db = client[settings.database_name]
+
+    if apply:
+        errors = await ensure_indexes(db)
+        print(f"Applied index manifest ({len(errors)} errors).")
+
+    report = await check_indexes(db)
+
+    print(f"Checked indexes in '{settings.database_name}'.")
+    for section in ("missing", "unused", "unmanaged"):
+        print(f"\n{section.upper()} ({len(report[section])}):")
+        for index in report[section]:
+            print(f"  {index['collection']}.{index['name']} {index['keys']}")
+
+    client.close()
+
+    # Non-zero exit code when the manifest is not fully applied
+    return 1 if report["missing"] else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report missing or unused MongoDB indexes")
+    parser.add_argument("--apply", action="store_true", help="create missing manifest indexes first")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(main(args.apply)))
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import settings
+from app.database import create_storage
+from app.utils.file_storage import migrate_files
+
+async def main(source_name: str, target_name: str, delete_source: bool, dry_run: bool):
+    client = AsyncIOMotorClient(settings.mongodb_uri)
+    db = client[settings.database_name]
+
+    source = create_storage(source_name, db)
+    target = create_storage(target_name, db)
+    report = await migrate_files(source, target, delete_source=delete_source, dry_run=dry_run)
+
+    verb = "Would copy" if dry_run else "Copied"
+    print(f"Migrated files in '{settings.database_name}' from {source.name} to {target.name}.")
+    print(f"  scanned              : {report['scanned']}")
+    print(f"  {verb.lower():<21}: {report['copied']}")
+    print(f"  already on target    : {report['skipped']}")
+    print(f"  failed               : {report['failed']}")
+    print(f"  deleted from source  : {report['deleted']}")
+    print(f"  bytes copied         : {report['bytes']}")
+
+    client.close()
+
+    # Non-zero exit code when any file failed to copy
+    return 1 if report["failed"] else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move stored files between storage backends")
+    parser.add_argument("--from", dest="source", choices=["gridfs", "local"], required=True, help="backend to copy from")
+    parser.add_argument("--to", dest="target", choices=["gridfs", "local"], required=True, help="backend to copy to")
+    parser.add_argument("--delete-source", action="store_true", help="delete each file from the source once copied")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be copied without copying")
+    args = parser.parse_args()
+    if args.source == args.target:
+        parser.error("--from and --to must differ")
+    raise SystemExit(asyncio.run(main(args.source, args.target, args.delete_source, args.dry_run)))
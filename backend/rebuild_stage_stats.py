@@ -0,0 +1,21 @@
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import settings
+from app.utils.stage_analytics import rebuild_stage_dwell
+
+async def main():
+    client = AsyncIOMotorClient(settings.mongodb_uri)
+    db = client[settings.database_name]
+
+    result = await rebuild_stage_dwell(db)
+
+    print(f"Rebuilt stage analytics in '{settings.database_name}'.")
+    print(f"  approvals scanned    : {result['approvals_scanned']}")
+    print(f"  dwell backfilled     : {result['approvals_backfilled']}")
+    print(f"  stages               : {result['stages']}")
+    print(f"  projects updated     : {result['projects_updated']}")
+
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
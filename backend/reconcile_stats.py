@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import settings
+from app.utils.stats import reconcile_stats
+
+async def main(dry_run: bool):
+    client = AsyncIOMotorClient(settings.mongodb_uri)
+    db = client[settings.database_name]
+
+    report = await reconcile_stats(db, apply=not dry_run)
+
+    if report["seeded"]:
+        print(f"No rollup counters in '{settings.database_name}'" + ("." if dry_run else ", seeded them."))
+    print(f"\nDRIFT ({len(report['drift'])}):")
+    for path, values in report["drift"].items():
+        print(f"  {path}: stored={values['stored']} actual={values['actual']}")
+    if report["drift"] and not dry_run:
+        if report["applied"]:
+            print("\nCorrected drifted counters.")
+        else:
+            print("\nCounters kept changing during the recount; nothing was corrected. Run again when quieter.")
+
+    client.close()
+
+    # Non-zero exit code when drift was found
+    return 1 if report["drift"] else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild analytics rollup counters and report drift")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without correcting it")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(main(args.dry_run)))
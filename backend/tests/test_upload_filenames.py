@@ -0,0 +1,134 @@
+"""
+Download filenames of deduplicated files.
+
+Needs the test-only packages pytest, httpx and mongomock-motor.
+"""
+import asyncio
+from datetime import datetime
+from urllib.parse import unquote
+import pytest
+from bson import ObjectId
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from fastapi.testclient import TestClient
+import app.database as database
+from app.auth.dependencies import get_current_user
+from app.config import settings
+from app.main import app
+from app.models.user import UserResponse
+from app.storage.local_backend import LocalStorage
+from app.utils.http_files import content_disposition
+
+CONTENT = b"identical bytes in both uploads"
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+    monkeypatch.setattr(database, "database", db)
+    monkeypatch.setattr(database, "storage", LocalStorage(str(tmp_path), db.stored_files, db.stored_objects))
+    monkeypatch.setattr(settings, "thumbnails_enabled", False)
+    return db
+
+
+@pytest.fixture
+def user():
+    return UserResponse(
+        id=str(ObjectId()),
+        name="Marketer",
+        email="marketer@example.com",
+        role="Digital Marketer",
+        created_at=datetime.utcnow()
+    )
+
+
+@pytest.fixture
+def client(db, user):
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+def _create_project(db, name):
+    result = asyncio.run(db.projects.insert_one({
+        "project_name": name,
+        "digital_marketer_id": ObjectId(),
+        "current_stage": "content",
+        "created_at": datetime.utcnow()
+    }))
+    return str(result.inserted_id)
+
+
+def _upload(client, db, filename):
+    project_id = _create_project(db, filename)
+    response = client.post(
+        f"/projects/{project_id}/upload-content",
+        files={"file": (filename, CONTENT, "text/plain")}
+    )
+    assert response.status_code == 200
+    upload_id = client.get(f"/uploads/project/{project_id}/versions").json()[0]["id"]
+    return response.json()["file_id"], upload_id
+
+
+def _disposition_name(response):
+    return unquote(response.headers["content-disposition"].split("filename*=UTF-8''", 1)[1])
+
+
+def test_deduplicated_downloads_keep_their_own_names(client, db):
+    first_file_id, first_upload_id = _upload(client, db, "first-brief.txt")
+    second_file_id, second_upload_id = _upload(client, db, "second-brief.txt")
+    assert first_file_id == second_file_id
+
+    for upload_id, expected in [(first_upload_id, "first-brief.txt"), (second_upload_id, "second-brief.txt")]:
+        for path in (f"/uploads/{first_file_id}", f"/uploads/preview/{first_file_id}"):
+            response = client.get(path, params={"upload_id": upload_id})
+            assert response.status_code == 200
+            assert response.content == CONTENT
+            assert _disposition_name(response) == expected
+
+
+def test_ambiguous_download_is_named_by_file_id(client, db):
+    file_id, _ = _upload(client, db, "first-brief.txt")
+    assert _disposition_name(client.get(f"/uploads/{file_id}")) == "first-brief.txt"
+
+    _upload(client, db, "second-brief.txt")
+    assert _disposition_name(client.get(f"/uploads/{file_id}")) == f"{file_id}.txt"
+
+
+def test_deduplicated_task_files_keep_their_own_names(client, db, user):
+    task_ids = []
+    for filename in ("first-draft.txt", "second-draft.txt"):
+        result = asyncio.run(db.tasks.insert_one({
+            "title": filename,
+            "assigned_to": [user.id],
+            "created_by": user.id,
+            "status": "pending",
+            "priority": "low",
+            "due_date": datetime.utcnow(),
+            "created_at": datetime.utcnow()
+        }))
+        task_id = str(result.inserted_id)
+        response = client.post(f"/tasks/{task_id}/upload", files={"file": (filename, CONTENT, "text/plain")})
+        assert response.status_code == 200
+        task_ids.append((task_id, filename, response.json()["file_id"]))
+
+    assert task_ids[0][2] == task_ids[1][2]
+    for task_id, expected, file_id in task_ids:
+        response = client.get(f"/uploads/{file_id}", params={"task_id": task_id})
+        assert response.content == CONTENT
+        assert _disposition_name(response) == expected
+
+
+def test_non_latin_1_download_name(client, db):
+    file_id, upload_id = _upload(client, db, "Бриф «final».txt")
+    response = client.get(f"/uploads/{file_id}", params={"upload_id": upload_id})
+    assert response.status_code == 200
+    assert _disposition_name(response) == "Бриф «final».txt"
+    assert 'filename="____ _final_.txt"' in response.headers["content-disposition"]
+
+
+def test_quoted_disposition_name_is_escaped():
+    assert content_disposition("attachment", 'say "hi"\\.txt') == (
+        'attachment; filename="say \\"hi\\"\\\\.txt"; filename*=UTF-8\'\'say%20%22hi%22%5C.txt'
+    )
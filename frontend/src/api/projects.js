@@ -1,7 +1,7 @@
 import axios from './axios';
 
 export const projectsAPI = {
-    getAll: () => axios.get('/projects'),
+    getAll: () => axios.get('/projects', { params: { unpaged: true } }),
     getById: (id) => axios.get(`/projects/${id}`),
     create: (data) => axios.post('/projects', data),
     uploadContent: (projectId, file) => {
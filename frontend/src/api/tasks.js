@@ -12,9 +12,9 @@ const getAuthHeaders = () => {
 };
 
 export const tasksAPI = {
-    // Get all tasks
+    // Get all tasks (unpaged legacy listing)
     getAll: () => {
-        return axios.get(`${API_BASE_URL}/tasks/`, getAuthHeaders());
+        return axios.get(`${API_BASE_URL}/tasks/?unpaged=true`, getAuthHeaders());
     },
 
     // Create a new task
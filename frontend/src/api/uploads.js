@@ -1,7 +1,7 @@
 import axios from './axios';
 
 export const uploadsAPI = {
-    download: (fileId) => axios.get(`/uploads/${fileId}`, { responseType: 'blob' }),
-    preview: (fileId) => axios.get(`/uploads/preview/${fileId}`, { responseType: 'blob' }),
+    download: (fileId, params = {}) => axios.get(`/uploads/${fileId}`, { params, responseType: 'blob' }),
+    preview: (fileId, params = {}) => axios.get(`/uploads/preview/${fileId}`, { params, responseType: 'blob' }),
     getVersions: (projectId) => axios.get(`/uploads/project/${projectId}/versions`)
 };
@@ -12,9 +12,9 @@ const getAuthHeaders = () => {
 };
 
 export const usersAPI = {
-    // Get all users (Admin only)
+    // Get all users (unpaged legacy listing)
     getAll: () => {
-        return axios.get(`${API_BASE_URL}/users/`, getAuthHeaders());
+        return axios.get(`${API_BASE_URL}/users/?unpaged=true`, getAuthHeaders());
     },
 
     // Create a new user (Admin only)
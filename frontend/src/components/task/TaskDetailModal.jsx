@@ -201,7 +201,7 @@ const TaskDetailModal = ({ task, onClose, onUpdate, currentUser }) => {
 
         setDownloading(true);
         try {
-            await downloadFile(task.file_id, task.filename);
+            await downloadFile(task.file_id, task.filename, { task_id: task.id });
         } catch (err) {
             setUploadError('Failed to download file');
         } finally {
@@ -214,7 +214,7 @@ const TaskDetailModal = ({ task, onClose, onUpdate, currentUser }) => {
 
         setPreviewing(true);
         try {
-            await previewFile(task.file_id, task.filename);
+            await previewFile(task.file_id, task.filename, { task_id: task.id });
         } catch (err) {
             setUploadError('Failed to preview file');
         } finally {
@@ -191,10 +191,10 @@ const ProjectDetail = () => {
         setShowTaskDetailModal(true);
     };
 
-    const handleFileDownload = async (fileId, filename) => {
+    const handleFileDownload = async (fileId, filename, uploadId) => {
         setDownloadingFileId(fileId);
         try {
-            await downloadFile(fileId, filename);
+            await downloadFile(fileId, filename, { upload_id: uploadId });
         } catch (err) {
             console.error('Download failed:', err);
         } finally {
@@ -202,10 +202,10 @@ const ProjectDetail = () => {
         }
     };
 
-    const handleFilePreview = async (fileId, filename) => {
+    const handleFilePreview = async (fileId, filename, uploadId) => {
         setPreviewingFileId(fileId);
         try {
-            await previewFile(fileId, filename);
+            await previewFile(fileId, filename, { upload_id: uploadId });
         } catch (err) {
             console.error('Preview failed:', err);
         } finally {
@@ -327,14 +327,14 @@ const ProjectDetail = () => {
                                             </div>
                                             <div className="flex gap-2">
                                                 <button
-                                                    onClick={() => handleFilePreview(version.file_id, version.filename)}
+                                                    onClick={() => handleFilePreview(version.file_id, version.filename, version.id)}
                                                     disabled={previewingFileId === version.file_id}
                                                     className="btn-secondary text-sm"
                                                 >
                                                     {previewingFileId === version.file_id ? 'Opening...' : '👁️ Preview'}
                                                 </button>
                                                 <button
-                                                    onClick={() => handleFileDownload(version.file_id, version.filename)}
+                                                    onClick={() => handleFileDownload(version.file_id, version.filename, version.id)}
                                                     disabled={downloadingFileId === version.file_id}
                                                     className="btn-primary text-sm"
                                                 >
@@ -2,10 +2,14 @@ import axios from '../api/axios';
 
 /**
  * Download file with authentication
+ *
+ * params names the record the file belongs to ({ upload_id } or { task_id })
+ * so the server can name the download after it.
  */
-export const downloadFile = async (fileId, filename) => {
+export const downloadFile = async (fileId, filename, params = {}) => {
     try {
         const response = await axios.get(`/uploads/${fileId}`, {
+            params,
             responseType: 'blob', // Important for file download
         });
 
@@ -27,9 +31,10 @@ export const downloadFile = async (fileId, filename) => {
 /**
  * Preview file in new tab with authentication
  */
-export const previewFile = async (fileId, filename) => {
+export const previewFile = async (fileId, filename, params = {}) => {
     try {
         const response = await axios.get(`/uploads/preview/${fileId}`, {
+            params,
             responseType: 'blob',
         });
 
@@ -53,9 +58,10 @@ export const previewFile = async (fileId, filename) => {
 /**
  * Get file blob URL for embedding (e.g., in iframe or img)
  */
-export const getFileBlobUrl = async (fileId) => {
+export const getFileBlobUrl = async (fileId, params = {}) => {
     try {
         const response = await axios.get(`/uploads/preview/${fileId}`, {
+            params,
             responseType: 'blob',
         });
 